@@ -0,0 +1,409 @@
+# benchmarks/bench.py
+"""
+Benchmark suite for loan_amort.
+
+    python benchmarks/bench.py run [--quick] [--filter TEXT] [-o results.json]
+    python benchmarks/bench.py run --save-baseline [--filter TEXT]
+    python benchmarks/bench.py compare BASELINE.json CURRENT.json [--threshold 0.2]
+
+Baselines live in benchmarks/baselines/<package version>.json; saving
+merges into the existing file. A benchmark without a baseline entry fails
+`compare`, so record one whenever a benchmark is added. Everything runs
+offline; plotting benchmarks use the Agg backend.
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_THRESHOLD = 0.20  # flag runs more than 20% slower than baseline
+
+# name -> (setup returning a zero-argument callable, included in --quick)
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable[[], object]], bool]] = {}
+
+
+def bench(name: str, quick: bool = True):
+    def register(setup):
+        BENCHMARKS[name] = (setup, quick)
+        return setup
+    return register
+
+
+FIRST_DATE = datetime.date(2025, 1, 1)
+
+
+def _random_loans(count: int, seed: int = 0):
+    """
+    Reproducible (principals, rates, years) arrays for portfolio-style benchmarks.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(50_000, 750_000, count),
+            rng.uniform(0.02, 0.09, count),
+            rng.choice([10, 15, 20, 30], count))
+
+
+def _schedule(first_date: datetime.date = FIRST_DATE):
+    """
+    The 30-year monthly schedule most single-schedule benchmarks work on.
+    """
+    from loan_amort.amort import amortize_loan
+    return amortize_loan(250000.0, 0.05, 30, 12, first_date)
+
+# ---------------------------------------------------------------------------
+# single-loan schedules
+
+
+def _single(years: int, per_year: int):
+    from loan_amort.amort import amortize_loan
+    return lambda: amortize_loan(250000.0, 0.05, years, per_year, FIRST_DATE)
+
+
+bench("amortize_loan/12")(lambda: _single(1, 12))
+bench("amortize_loan/360")(lambda: _single(30, 12))
+bench("amortize_loan/480")(lambda: _single(40, 12))
+bench("amortize_loan/1560_weekly")(lambda: _single(30, 52))
+bench("amortize_loan/10950_daily", quick=False)(lambda: _single(30, 365))
+
+
+@bench("amortize_as_of/360_seasoned_20y")
+def _as_of():
+    from loan_amort.seasoned import amortize_as_of
+    return lambda: amortize_as_of(250000.0, 0.05, 30, 12, FIRST_DATE, as_of=datetime.date(2045, 1, 1))
+
+
+@bench("amortize_loan/rollup_year_daily")
+def _rollup():
+    from loan_amort.amort import amortize_loan
+    return lambda: amortize_loan(250000.0, 0.05, 30, 365, FIRST_DATE, rollup="year")
+
+# ---------------------------------------------------------------------------
+# portfolios
+
+
+def _portfolio(count: int):
+    from loan_amort.amort import amortize_portfolio
+
+    principals, rates, years = _random_loans(count)
+    return lambda: amortize_portfolio(principals, rates, years, 12)
+
+
+bench("portfolio/1k")(lambda: _portfolio(1_000))
+bench("portfolio/100k", quick=False)(lambda: _portfolio(100_000))
+
+# ---------------------------------------------------------------------------
+# exact integer-cent mode, to compare with the float paths above
+
+
+@bench("exact/amortize_loan_cents/360")
+def _exact_single():
+    from loan_amort.exact import amortize_loan_cents
+    return lambda: amortize_loan_cents(250000.0, 0.05, 30, 12, FIRST_DATE)
+
+
+def _portfolio_cents(count: int):
+    from loan_amort.exact import amortize_portfolio_cents
+
+    principals, rates, years = _random_loans(count)
+    return lambda: amortize_portfolio_cents(principals, rates, years, 12)
+
+
+bench("exact/portfolio_cents/1k")(lambda: _portfolio_cents(1_000))
+bench("exact/portfolio_cents/100k", quick=False)(lambda: _portfolio_cents(100_000))
+
+# ---------------------------------------------------------------------------
+# sensitivity grids
+
+
+@bench("grid/100x200x10")
+def _grid():
+    import numpy as np
+    from loan_amort.grid import evaluate_grid
+
+    principals = np.linspace(100_000, 1_000_000, 100)
+    rates = np.linspace(0.01, 0.10, 200)
+    years = np.arange(5, 55, 5)
+    return lambda: evaluate_grid(principals, rates, years)
+
+# ---------------------------------------------------------------------------
+# refinance screening
+
+
+@bench("refi/1k_loans_x_200_offers")
+def _refi():
+    import numpy as np
+    from loan_amort.refi import analyze_refi
+
+    balances, rates, _ = _random_loans(1_000)
+    rng = np.random.default_rng(1)
+    remaining = rng.integers(12, 360, 1_000)
+    offer_rates = rng.uniform(0.03, 0.08, 200)
+    offer_years = rng.choice([10, 15, 20, 30], 200)
+    costs = rng.uniform(0, 10_000, 200)
+    return lambda: analyze_refi(balances, rates, remaining, offer_rates, offer_years, costs)
+
+# ---------------------------------------------------------------------------
+# pool cash-flow aggregation
+
+
+def _pool(count: int):
+    import numpy as np
+    from loan_amort.pool import aggregate_tape
+
+    starts = np.datetime64("2025-01") + np.random.default_rng(1).integers(0, 24, count)
+    loans = [
+        {"principal": p, "rate": r, "years": int(y), "per_year": 12,
+         "first_date": s.astype("datetime64[D]").astype(datetime.date)}
+        for p, r, y, s in zip(*_random_loans(count), starts)
+    ]
+    return lambda: aggregate_tape(loans)
+
+
+bench("pool/aggregate_1k")(lambda: _pool(1_000))
+bench("pool/aggregate_100k", quick=False)(lambda: _pool(100_000))
+
+# ---------------------------------------------------------------------------
+# Monte Carlo prepayment/default paths
+
+
+@bench("simulate/1k_paths")
+def _simulate():
+    from loan_amort.simulate import simulate_paths
+    return lambda: simulate_paths(250000.0, 0.05, 30, num_paths=1_000, seed=0)
+
+# ---------------------------------------------------------------------------
+# metrics
+
+
+@bench("metrics/rows_360")
+def _metrics_rows():
+    from loan_amort.metrics import compute_loan_metrics
+
+    schedule = _schedule(None)
+    return lambda: compute_loan_metrics(schedule)
+
+
+@bench("metrics/rows_360_dicts")
+def _metrics_dicts():
+    from loan_amort.metrics import compute_loan_metrics
+
+    rows = _schedule(None).to_dicts()
+    return lambda: compute_loan_metrics(rows)
+
+
+@bench("metrics/closed_form")
+def _metrics_closed():
+    from loan_amort.analytic import loan_metrics_closed_form
+    return lambda: loan_metrics_closed_form(250000.0, 0.05, 30, 12)
+
+# ---------------------------------------------------------------------------
+# export
+
+
+@bench("export/xlsx_360")
+def _export_xlsx():
+    import tempfile
+    from loan_amort.export import write_schedule_xlsx
+
+    schedule = _schedule()
+    path = os.path.join(tempfile.mkdtemp(), "schedule.xlsx")
+    return lambda: write_schedule_xlsx(schedule, path)
+
+
+@bench("export/columnar_read_1k")
+def _columnar_read():
+    import tempfile
+    from loan_amort.columnar import ColumnarFile, write_columnar
+
+    schedule = _schedule()
+    path = os.path.join(tempfile.mkdtemp(), "book.lac")
+    write_columnar(((str(i), schedule) for i in range(1000)), path)
+    book = ColumnarFile(path)
+    return lambda: [book.schedule(str(i)).balance[-1] for i in range(0, 1000, 10)]
+
+# ---------------------------------------------------------------------------
+# plotting: figure construction and save
+
+
+def _plot(chart: str):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from loan_amort.plots import CHARTS
+
+    schedule = _schedule()
+
+    def run():
+        fig = CHARTS[chart](schedule)
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+    return run
+
+
+for _chart in ("balance_line", "interest_line", "interest_stacked", "cumulative_line"):
+    bench(f"plot/{_chart}")(lambda chart=_chart: _plot(chart))
+
+# ---------------------------------------------------------------------------
+# cold CLI startup
+
+
+def _cli(*args: str):
+    cmd = [sys.executable, "-m", "loan_amort.cli"] + list(args)
+    env = dict(os.environ, MPLBACKEND="Agg")
+
+    def run():
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, env=env)
+    return run
+
+
+LOAN_ARGS = ("-P", "250000", "-r", "0.05", "-y", "30", "--first-date", "2025-01-01")
+bench("cli/amortize")(lambda: _cli("amortize", *LOAN_ARGS))
+bench("cli/metrics")(lambda: _cli("metrics", *LOAN_ARGS))
+bench("cli/plot", quick=False)(
+    lambda: _cli("plot", "balance_line", "-o", os.devnull, "--format", "png", *LOAN_ARGS))
+
+# ---------------------------------------------------------------------------
+# runner
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    """
+    Time fn in batches sized to run at least min_time; report per-call seconds.
+    """
+    fn()  # warm up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {"min": min(samples), "median": statistics.median(samples), "number": number}
+
+
+def package_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("loan_amort")
+    except Exception:
+        return "dev"
+
+
+def run(names: List[str], repeat: int, min_time: float) -> Dict[str, object]:
+    results = {}
+    for name in names:
+        fn = BENCHMARKS[name][0]()
+        results[name] = measure(fn, repeat, min_time)
+        r = results[name]
+        print(f"{name:32s} median {r['median'] * 1e3:10.3f} ms   min {r['min'] * 1e3:10.3f} ms",
+              file=sys.stderr)
+    return {
+        "version": package_version(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """
+    Names of benchmarks whose median slowed down by more than threshold,
+    or that have no baseline entry (record one with run --save-baseline).
+    """
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:32s} NO BASELINE", file=sys.stderr)
+            regressions.append(name)
+            continue
+        ratio = cur["median"] / base["median"] if base["median"] else float("inf")
+        flag = ratio > 1 + threshold
+        print(f"{name:32s} {ratio:6.2f}x{'  REGRESSION' if flag else ''}", file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="bench")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="Run benchmarks")
+    p_run.add_argument("--quick", action="store_true", help="Skip the slow benchmarks")
+    p_run.add_argument("--filter", default="", help="Only run benchmarks containing this text")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--min-time", type=float, default=0.2,
+                       help="Minimum seconds per timing sample (default: 0.2)")
+    p_run.add_argument("-o", "--output", help="Write results JSON here")
+    p_run.add_argument("--save-baseline", action="store_true",
+                       help="Write results to baselines/<version>.json")
+    p_run.add_argument("--compare", metavar="BASELINE",
+                       help="Compare against this baseline after running")
+    p_run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="Allowed slowdown as a fraction (default: 0.2)")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    names = [n for n, (_, quick) in BENCHMARKS.items()
+             if args.filter in n and (quick or not args.quick)]
+    results = run(names, args.repeat, args.min_time)
+
+    outputs = []
+    if args.output:
+        outputs.append((args.output, results))
+    if args.save_baseline:
+        # merge into the existing baseline, so recording a newly added
+        # benchmark (run --filter NAME --save-baseline) keeps the others
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{results['version']}.json")
+        baseline = dict(results)
+        if os.path.exists(path):
+            with open(path) as f:
+                baseline["results"] = dict(json.load(f)["results"], **results["results"])
+        outputs.append((path, baseline))
+    for path, data in outputs:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(json.load(f), results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
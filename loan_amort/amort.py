@@ -1,53 +1,36 @@
 # loan_amort/amort.py
 
 import datetime
-from typing import List, Dict, Any
-from dateutil.relativedelta import relativedelta
+from array import array
+from typing import Any, Dict, Iterator, Tuple
+import numpy as np
 
-def amortize_loan(
+from loan_amort.analytic import balance_at, level_payment
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count, span, traced
+from loan_amort.schedule import Schedule
+
+# rollup name -> buckets per year
+ROLLUPS = {"year": 1, "quarter": 4}
+
+
+def _amortization_steps(
     principal: float,
     annual_rate: float,
     years: int,
-    payments_per_year: int = 12,
-    first_payment_date: datetime.date = None
-) -> List[Dict[str, Any]]:
+    payments_per_year: int
+) -> Iterator[Tuple[int, float, float, float, float]]:
     """
-    Generate an amortization schedule, optionally with payment dates.
-
-    Args:
-        principal: initial loan amount
-        annual_rate: annual interest rate (decimal, e.g. 0.05)
-        years: term of loan in years
-        payments_per_year: payments per year (default 12)
-        first_payment_date: date of the first payment (datetime.date), or None
-
-    Returns:
-        List of payment records with keys:
-          period, payment, interest, principal, balance[, date]
+    Yield unrounded (period, payment, interest, principal, balance) tuples.
     """
     # periodic rate and total periods
     r = annual_rate / payments_per_year
     n = years * payments_per_year
 
     # fixed payment formula
-    if r == 0:
-        payment = principal / n
-    else:
-        payment = principal * (r * (1 + r) ** n) / ((1 + r) ** n - 1)
-
-    # build dates list if requested
-    if first_payment_date:
-        months_between = 12 // payments_per_year
-        dates = [
-            first_payment_date + relativedelta(months=months_between * (i - 1))
-            for i in range(1, n + 1)
-        ]
-    else:
-        dates = [None] * n
+    payment = level_payment(principal, annual_rate, years, payments_per_year)
 
     balance = principal
-    schedule: List[Dict[str, Any]] = []
-
     for period in range(1, n + 1):
         interest = balance * r
         principal_paid = payment - interest
@@ -58,7 +41,30 @@ def amortize_loan(
             payment = interest + principal_paid
 
         balance -= principal_paid
+        yield period, payment, interest, principal_paid, balance
+
 
+def iter_amortization(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily generate amortization rows one period at a time.
+
+    Takes the same arguments as amortize_loan and yields the same row dicts,
+    but never holds more than one row in memory.
+    """
+    dates = None
+    if first_payment_date:
+        dates = payment_dates(first_payment_date, payments_per_year,
+                              years * payments_per_year)
+
+    for period, payment, interest, principal_paid, balance in _amortization_steps(
+        principal, annual_rate, years, payments_per_year
+    ):
         row: Dict[str, Any] = {
             "period": period,
             "payment": round(payment, 2),
@@ -66,10 +72,213 @@ def amortize_loan(
             "principal": round(principal_paid, 2),
             "balance": round(max(balance, 0), 2),
         }
-        if dates[period - 1]:
-            row["date"] = dates[period - 1].isoformat()
+        if dates is not None:
+            row["date"] = str(dates[period - 1])
+        yield row
+
+
+@traced("amortize_loan")
+def amortize_loan(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None,
+    rollup: str = None
+) -> Schedule:
+    """
+    Generate an amortization schedule, optionally with payment dates.
+
+    Args:
+        principal: initial loan amount
+        annual_rate: annual interest rate (decimal, e.g. 0.05)
+        years: term of loan in years
+        payments_per_year: payments per year (default 12)
+        first_payment_date: date of the first payment (datetime.date), or None
+        rollup: 'year' or 'quarter' for one row per loan year or quarter
+                instead of one per payment (see rollup_schedule)
+
+    Returns:
+        Schedule with columns period, payment, interest, principal,
+        balance[, dates]. Iterating it yields the legacy row dicts with keys
+          period, payment, interest, principal, balance[, date]
+    """
+    if rollup:
+        return rollup_schedule(principal, annual_rate, years, payments_per_year,
+                               first_payment_date, rollup)
+    n = years * payments_per_year
+    count("amortize_loan.periods", n)
+
+    # build dates column if requested
+    dates = None
+    if first_payment_date:
+        with span("amortize_loan.dates"):
+            dates = payment_dates(first_payment_date, payments_per_year, n)
+
+    with span("amortize_loan.recurrence"):
+        steps = list(_amortization_steps(principal, annual_rate, years, payments_per_year))
+
+    with span("amortize_loan.rounding"):
+        _, payments, interests, principals, balances = zip(*steps) if steps else ((),) * 5
+        payments = array("d", [round(x, 2) for x in payments])
+        interests = array("d", [round(x, 2) for x in interests])
+        principals = array("d", [round(x, 2) for x in principals])
+        balances = array("d", [round(max(x, 0), 2) for x in balances])
+
+    return Schedule(
+        period=np.arange(1, n + 1),
+        payment=np.frombuffer(payments),
+        interest=np.frombuffer(interests),
+        principal=np.frombuffer(principals),
+        balance=np.frombuffer(balances),
+        dates=dates,
+    )
 
-        schedule.append(row)
 
-    return schedule
+@traced("rollup_schedule")
+def rollup_schedule(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None,
+    rollup: str = "year"
+) -> Schedule:
+    """
+    Amortization totals per loan year or quarter.
+
+    Buckets are counted from the first payment: bucket k holds the
+    payments that fall in the k-th year (or quarter) of the loan. The
+    per-period rows are built in one vectorized pass from the closed-form
+    balances in loan_amort.analytic and rounded to cents exactly as
+    amortize_loan prints them, then summed per bucket with np.add.reduceat,
+    so each bucket total is the sum of the printed rows it covers without
+    a per-period Python loop.
 
+    Returns:
+        Schedule with one row per bucket: period is the bucket number,
+        payment/interest/principal are the bucket totals, balance is the
+        balance after the bucket's last payment, and dates (when
+        first_payment_date is given) is the date of that payment.
+    """
+    if rollup not in ROLLUPS:
+        raise ValueError(f"Unknown rollup: {rollup} (expected one of {', '.join(ROLLUPS)})")
+    buckets_per_year = ROLLUPS[rollup]
+    n = years * payments_per_year
+    k = np.arange(1, years * buckets_per_year + 1)
+    # last payment of each bucket: period j is in bucket floor((j - 1) * B / ppy)
+    ends = -(-(k * payments_per_year) // buckets_per_year)
+    starts = np.concatenate(([1], ends[:-1] + 1))
+    keep = ends >= starts   # a bucket can be empty when B > payments_per_year
+    starts, ends = starts[keep], ends[keep]
+    count("rollup_schedule.buckets", len(ends))
+
+    # per-period rows, rounded like amortize_loan's
+    balances = np.atleast_1d(balance_at(np.arange(n + 1), principal, annual_rate, years, payments_per_year))
+    interest = balances[:-1] * (annual_rate / payments_per_year)
+    principal_paid = balances[:-1] - balances[1:]
+    payment = np.full(n, level_payment(principal, annual_rate, years, payments_per_year))
+    if n:
+        # on last payment, absorb rounding error
+        payment[-1] = interest[-1] + principal_paid[-1]
+    rows = np.round(np.stack((payment, interest, principal_paid)), 2)
+    if n:
+        totals = np.round(np.add.reduceat(rows, starts - 1, axis=1), 2)
+    else:
+        totals = np.zeros((3, 0))
+
+    dates = None
+    if first_payment_date:
+        dates = payment_dates(first_payment_date, payments_per_year, n)[ends - 1]
+    return Schedule(
+        period=np.arange(1, len(ends) + 1),
+        payment=totals[0],
+        interest=totals[1],
+        principal=totals[2],
+        balance=np.round(np.maximum(balances[ends], 0), 2),
+        dates=dates,
+    )
+
+
+@traced("amortize_portfolio")
+def amortize_portfolio(
+    principals,
+    rates,
+    years,
+    payments_per_year=12
+) -> Dict[str, np.ndarray]:
+    """
+    Generate amortization schedules for many loans at once.
+
+    Every argument may be a scalar or an array; they are broadcast against
+    each other to one value per loan. The per-period recurrence is the same
+    as in amortize_loan (including the final-payment adjustment), but each
+    step is evaluated for all loans with one NumPy operation, so the Python
+    loop runs over periods rather than over loans.
+
+    Args:
+        principals: initial loan amounts
+        rates: annual interest rates (decimal, e.g. 0.05)
+        years: terms of the loans in years
+        payments_per_year: payments per year (default 12)
+
+    Returns:
+        Dict of 2-D arrays shaped (loans, max periods):
+          payment, interest, principal, balance (rounded to cents),
+          mask (True where the period exists for that loan),
+        plus the 1-D array num_payments. Periods past a loan's term are
+        padded with zeros.
+    """
+    principals, rates, years, payments_per_year = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principals, dtype=float)),
+        np.asarray(rates, dtype=float),
+        np.asarray(years, dtype=np.int64),
+        np.asarray(payments_per_year, dtype=np.int64),
+    )
+
+    # periodic rate and total periods
+    r = rates / payments_per_year
+    n = years * payments_per_year
+    num_loans = principals.shape[0]
+    max_periods = int(n.max()) if num_loans else 0
+
+    # fixed payment formula, shared with amortize_loan
+    level = level_payment(principals, rates, years, payments_per_year)
+
+    shape = (num_loans, max_periods)
+    payment = np.zeros(shape)
+    interest = np.zeros(shape)
+    principal_paid = np.zeros(shape)
+    balance_out = np.zeros(shape)
+    mask = np.arange(1, max_periods + 1) <= n[:, None]
+
+    count("amortize_portfolio.loans", num_loans)
+    balance = principals.copy()
+    with span("amortize_portfolio.recurrence"):
+        for col in range(max_periods):
+            period = col + 1
+            active = mask[:, col]
+            interest_t = balance * r
+            principal_t = level - interest_t
+
+            # on last payment, absorb rounding error
+            last = n == period
+            principal_t = np.where(last, balance, principal_t)
+            payment_t = np.where(last, interest_t + principal_t, level)
+
+            balance = np.where(active, balance - principal_t, balance)
+
+            payment[:, col] = np.where(active, payment_t, 0.0)
+            interest[:, col] = np.where(active, interest_t, 0.0)
+            principal_paid[:, col] = np.where(active, principal_t, 0.0)
+            balance_out[:, col] = np.where(active, np.maximum(balance, 0), 0.0)
+
+    with span("amortize_portfolio.rounding"):
+        return {
+            "payment": np.round(payment, 2),
+            "interest": np.round(interest, 2),
+            "principal": np.round(principal_paid, 2),
+            "balance": np.round(balance_out, 2),
+            "mask": mask,
+            "num_payments": n,
+        }
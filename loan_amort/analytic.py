@@ -0,0 +1,204 @@
+# loan_amort/analytic.py
+
+from typing import Dict
+import numpy as np
+
+from loan_amort.profiling import traced
+
+# Each row of a schedule is rounded to the cent, so a sum over n rows may
+# differ from the exact closed-form total by up to half a cent per row.
+# Unrounded figures must agree to within this much in total.
+CENT_TOLERANCE = 0.005
+
+
+def _out(x):
+    """
+    Return 0-d results as Python scalars and leave arrays untouched.
+    """
+    x = np.asarray(x)
+    return x.item() if x.ndim == 0 else x
+
+
+def periodic_payment(principal, periodic_rate, num_periods):
+    """
+    Payment that amortizes principal over num_periods at periodic_rate.
+
+    The annuity formula P * r(1 + r)^n / ((1 + r)^n - 1), or P / n at a zero
+    rate. Arguments may be scalars or NumPy arrays (broadcast together).
+    """
+    r = np.asarray(periodic_rate, dtype=float)
+    n = np.asarray(num_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (1 + r) ** n
+        payment = np.where(
+            r == 0,
+            principal / n,
+            principal * (r * growth) / (growth - 1),
+        )
+    return _out(payment)
+
+
+def level_payment(
+    principal,
+    annual_rate,
+    years,
+    payments_per_year=12
+):
+    """
+    Fixed periodic payment from the annuity formula.
+
+    All arguments may be scalars or NumPy arrays (broadcast together).
+    """
+    r = np.asarray(annual_rate, dtype=float) / payments_per_year
+    n = np.asarray(years) * payments_per_year
+    return periodic_payment(principal, r, n)
+
+
+def balance_at(
+    k,
+    principal,
+    annual_rate,
+    years,
+    payments_per_year=12
+):
+    """
+    Remaining balance after k payments, without generating rows.
+
+    Uses B_k = P * ((1 + r)^n - (1 + r)^k) / ((1 + r)^n - 1), which is
+    P * (n - k) / n at a zero rate. k is clamped to [0, n].
+    """
+    r = np.asarray(annual_rate, dtype=float) / payments_per_year
+    n = np.asarray(years) * payments_per_year
+    k = np.clip(k, 0, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_n = (1 + r) ** n
+        balance = np.where(
+            r == 0,
+            principal * (n - k) / n,
+            principal * (growth_n - (1 + r) ** k) / (growth_n - 1),
+        )
+    return _out(balance)
+
+
+def principal_between(
+    a,
+    b,
+    principal,
+    annual_rate,
+    years,
+    payments_per_year=12
+):
+    """
+    Principal repaid in periods a through b inclusive (1-based).
+    """
+    start = balance_at(np.asarray(a) - 1, principal, annual_rate, years, payments_per_year)
+    end = balance_at(b, principal, annual_rate, years, payments_per_year)
+    return _out(np.asarray(start) - end)
+
+
+def interest_between(
+    a,
+    b,
+    principal,
+    annual_rate,
+    years,
+    payments_per_year=12
+):
+    """
+    Interest paid in periods a through b inclusive (1-based).
+
+    Every payment is the level payment, so interest is the total paid over
+    the range minus the principal it retired.
+    """
+    n = np.asarray(years) * payments_per_year
+    a = np.clip(a, 1, n + 1)
+    b = np.clip(b, 0, n)
+    count = np.maximum(b - a + 1, 0)
+    payment = level_payment(principal, annual_rate, years, payments_per_year)
+    repaid = principal_between(a, np.maximum(b, a - 1), principal, annual_rate,
+                               years, payments_per_year)
+    return _out(payment * count - repaid)
+
+
+@traced("loan_metrics_closed_form")
+def loan_metrics_closed_form(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12
+) -> Dict[str, float]:
+    """
+    Summary metrics computed in constant time from the annuity formula.
+
+    Returns the same keys as compute_loan_metrics. The figures are exact
+    (unrounded per row), so they can differ from summing a printed schedule
+    by up to CENT_TOLERANCE per payment.
+    """
+    num_payments = years * payments_per_year
+    payment = level_payment(principal, annual_rate, years, payments_per_year)
+    total_payment = payment * num_payments
+
+    return {
+        "num_payments":    num_payments,
+        "total_payment":   round(total_payment, 2),
+        "total_interest":  round(total_payment - principal, 2),
+        "total_principal": round(principal, 2),
+        "average_payment": round(payment, 2),
+    }
+
+
+def cross_check_metrics(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    tolerance: float = CENT_TOLERANCE
+) -> Dict[str, float]:
+    """
+    Compare closed-form metrics with those summed from the full schedule.
+
+    Both sides are unrounded: the annuity totals against sums of the
+    schedule's recurrence before its rows are rounded to cents. They agree
+    to floating-point noise for any term, so the tolerance does not grow
+    with the number of payments and any drift of half a cent or more in
+    total is reported.
+
+    Args:
+        tolerance: allowed absolute difference for each metric
+                   (default CENT_TOLERANCE)
+
+    Returns:
+        Dict mapping each metric to the absolute difference found.
+
+    Raises:
+        ValueError: if any metric differs by more than the tolerance
+    """
+    from loan_amort.amort import _amortization_steps
+
+    num_payments = years * payments_per_year
+    payment = level_payment(principal, annual_rate, years, payments_per_year)
+    closed = {
+        "num_payments":    num_payments,
+        "total_payment":   payment * num_payments,
+        "total_interest":  payment * num_payments - principal,
+        "total_principal": principal,
+        "average_payment": payment,
+    }
+
+    steps = np.array([step[1:4] for step in
+                      _amortization_steps(principal, annual_rate, years, payments_per_year)]).reshape(-1, 3)
+    total_payment, total_interest, total_principal = steps.sum(axis=0)
+    rows = {
+        "num_payments":    len(steps),
+        "total_payment":   total_payment,
+        "total_interest":  total_interest,
+        "total_principal": total_principal,
+        "average_payment": total_payment / len(steps) if len(steps) else 0.0,
+    }
+
+    diffs = {k: float(abs(closed[k] - rows[k])) for k in closed}
+    bad = {k: d for k, d in diffs.items() if d > tolerance}
+    if bad:
+        details = ", ".join(f"{k} off by {d:.4f}" for k, d in bad.items())
+        raise ValueError(f"closed-form metrics disagree with schedule: {details}")
+    return diffs
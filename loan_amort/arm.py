@@ -0,0 +1,257 @@
+# loan_amort/arm.py
+
+import datetime
+from typing import Dict, Sequence, Tuple, Union
+import numpy as np
+
+from loan_amort.analytic import periodic_payment
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count, span, traced
+from loan_amort.schedule import Schedule
+
+Resets = Sequence[Tuple[int, float]]
+
+
+def rate_path_from_resets(resets: Resets, num_periods: int) -> np.ndarray:
+    """
+    Per-period annual rates from (period, rate) resets.
+
+    Each rate applies from its (1-based) period until the next reset; the
+    first reset must be at period 1. Anything that is not a sequence of
+    (period, rate) pairs with distinct integer periods is rejected, so a
+    plain list of per-period rates is never mistaken for resets.
+    """
+    for reset in resets:
+        if (isinstance(reset, (str, bytes)) or np.ndim(reset) != 1 or len(reset) != 2
+                or isinstance(reset[0], (bool, np.bool_))
+                or not isinstance(reset[0], (int, np.integer))):
+            raise ValueError(
+                f"rate resets must be (period, rate) pairs with an integer period, got {reset!r}; "
+                "pass per-period rates as a 1-D NumPy array"
+            )
+    resets = sorted((int(period), float(rate)) for period, rate in resets)
+    if not resets or resets[0][0] != 1:
+        raise ValueError("rate resets must start at period 1")
+    periods = [period for period, _ in resets]
+    if len(set(periods)) != len(periods) or periods[-1] > num_periods:
+        raise ValueError(f"rate reset periods must be distinct and at most {num_periods}")
+    path = np.empty(num_periods)
+    for (period, rate), (next_period, _) in zip(resets, resets[1:] + [(num_periods + 1, None)]):
+        path[period - 1:next_period - 1] = rate
+    return path
+
+
+def arm_rate_paths(
+    num_periods: int,
+    initial_rate,
+    margin,
+    index_path,
+    fixed_periods: int,
+    reset_every: int,
+    initial_cap=None,
+    periodic_cap=None,
+    lifetime_cap=None,
+    floor=None
+) -> np.ndarray:
+    """
+    Rate paths for hybrid ARMs from an index path, margin and caps.
+
+    The initial rate holds for fixed_periods; after that the rate resets
+    every reset_every periods to index + margin, limited to +/- initial_cap
+    at the first reset and +/- periodic_cap afterwards, to at most
+    initial_rate + lifetime_cap, and to at least floor (default 0).
+    E.g. a 5/1 ARM paid monthly is fixed_periods=60, reset_every=12.
+
+    Loan terms (initial_rate, margin, caps, floor) may be arrays with one
+    entry per loan; index_path holds one index value per period and is
+    shared by every loan.
+
+    Returns:
+        Array of annual rates shaped (loans, num_periods), or (num_periods,)
+        when every loan term is a scalar.
+    """
+    index_path = np.asarray(index_path, dtype=float)
+    if index_path.shape[-1] < num_periods:
+        raise ValueError("index_path must cover every period")
+
+    terms = [initial_rate, margin] + [
+        np.nan if v is None else v for v in (initial_cap, periodic_cap, lifetime_cap)
+    ] + [0.0 if floor is None else floor]
+    scalar = all(np.ndim(v) == 0 for v in terms)
+    initial_rate, margin, initial_cap, periodic_cap, lifetime_cap, floor = (
+        np.atleast_1d(v).astype(float)[:, None] for v in np.broadcast_arrays(*terms)
+    )
+
+    rates = np.repeat(initial_rate, num_periods, axis=1)
+    current = initial_rate[:, 0]
+    ceiling = np.where(np.isnan(lifetime_cap), np.inf, initial_rate + lifetime_cap)[:, 0]
+    for i, k in enumerate(range(fixed_periods, num_periods, reset_every)):
+        target = index_path[k] + margin[:, 0]
+        cap = (initial_cap if i == 0 else periodic_cap)[:, 0]
+        target = np.where(np.isnan(cap), target, np.clip(target, current - cap, current + cap))
+        current = np.maximum(np.minimum(target, ceiling), floor[:, 0])
+        rates[:, k:] = current[:, None]
+
+    return rates[0] if scalar else rates
+
+
+@traced("amortize_arm")
+def amortize_arm(
+    principal: float,
+    years: int,
+    rates: Union[Resets, np.ndarray],
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None
+) -> Schedule:
+    """
+    Amortization schedule for an adjustable-rate loan.
+
+    The loan is split into fixed-rate segments. At the start of each one
+    the payment is re-amortized with the annuity formula over the remaining
+    term, and the segment's balances follow in closed form,
+    B_j = B_0 (1 + r)^j - pay ((1 + r)^j - 1) / r, without a per-period loop.
+
+    Args:
+        principal: initial loan amount
+        years: term of loan in years
+        rates: a sequence of (period, annual rate) resets, or a 1-D NumPy
+               array with one annual rate per period (e.g. from
+               arm_rate_paths); other forms raise ValueError
+        payments_per_year: payments per year (default 12)
+        first_payment_date: date of the first payment, or None
+
+    Returns:
+        Schedule with the same columns as amortize_loan.
+    """
+    n = years * payments_per_year
+    if isinstance(rates, np.ndarray):
+        if rates.ndim != 1:
+            raise ValueError("a rate path array must be 1-D; pass resets as (period, rate) pairs")
+        path = rates.astype(float)
+    else:
+        path = rate_path_from_resets(rates, n)
+    if path.shape != (n,):
+        raise ValueError(f"rate path must have one rate per period ({n})")
+    r = path / payments_per_year
+
+    starts = np.flatnonzero(np.diff(r, prepend=np.nan) != 0)
+    ends = np.append(starts[1:], n)
+    count("amortize_arm.segments", len(starts))
+
+    payment = np.empty(n)
+    interest = np.empty(n)
+    balance_out = np.empty(n)
+    balance = principal
+    for s, e in zip(starts, ends):
+        rate = r[s]
+        pay = periodic_payment(balance, rate, n - s)
+        j = np.arange(1, e - s + 1)
+        if rate == 0:
+            closing = balance - pay * j
+        else:
+            growth = (1 + rate) ** j
+            closing = balance * growth - pay * (growth - 1) / rate
+        opening = np.concatenate(([balance], closing[:-1]))
+        interest[s:e] = opening * rate
+        payment[s:e] = pay
+        balance_out[s:e] = closing
+        balance = closing[-1]
+
+    # on last payment, absorb rounding error
+    if n:
+        principal_paid = payment - interest
+        opening_last = balance_out[-2] if n > 1 else principal
+        principal_paid[-1] = opening_last
+        payment[-1] = interest[-1] + opening_last
+        balance_out[-1] = 0.0
+    else:
+        principal_paid = payment
+
+    dates = None
+    if first_payment_date:
+        dates = payment_dates(first_payment_date, payments_per_year, n)
+    return Schedule(
+        period=np.arange(1, n + 1),
+        payment=np.round(payment, 2),
+        interest=np.round(interest, 2),
+        principal=np.round(principal_paid, 2),
+        balance=np.round(np.maximum(balance_out, 0), 2),
+        dates=dates,
+    )
+
+
+@traced("amortize_arm_portfolio")
+def amortize_arm_portfolio(
+    principals,
+    rate_paths,
+    years,
+    payments_per_year=12
+) -> Dict[str, np.ndarray]:
+    """
+    ARM schedules for many loans at once.
+
+    Like amortize_portfolio, but each loan follows its own row of
+    rate_paths (annual rates shaped (loans, periods), e.g. from
+    arm_rate_paths for a book sharing one index path). Whenever a loan's
+    rate changes, its payment is re-amortized over its remaining term.
+
+    Returns:
+        The same dict of padded (loans, max periods) arrays as
+        amortize_portfolio.
+    """
+    rate_paths = np.atleast_2d(np.asarray(rate_paths, dtype=float))
+    num_loans = rate_paths.shape[0]
+    principals = np.broadcast_to(np.asarray(principals, dtype=float), (num_loans,))
+    years = np.broadcast_to(np.asarray(years, dtype=np.int64), (num_loans,))
+    payments_per_year = np.broadcast_to(np.asarray(payments_per_year, dtype=np.int64), (num_loans,))
+    n = years * payments_per_year
+    max_periods = int(n.max()) if num_loans else 0
+    if rate_paths.shape[1] < max_periods:
+        raise ValueError("rate_paths must cover every period of the longest loan")
+    count("amortize_arm_portfolio.loans", num_loans)
+
+    shape = (num_loans, max_periods)
+    payment = np.zeros(shape)
+    interest = np.zeros(shape)
+    principal_paid = np.zeros(shape)
+    balance_out = np.zeros(shape)
+    mask = np.arange(1, max_periods + 1) <= n[:, None]
+
+    balance = principals.copy()
+    level = np.zeros(num_loans)
+    r_prev = np.full(num_loans, np.nan)
+    with span("amortize_arm_portfolio.recurrence"):
+        for col in range(max_periods):
+            period = col + 1
+            active = mask[:, col]
+            r = rate_paths[:, col] / payments_per_year
+
+            # re-amortize over the remaining term wherever the rate reset
+            reset = active & (r != r_prev)
+            if reset.any():
+                level = np.where(reset, periodic_payment(balance, r, n - col), level)
+            r_prev = r
+
+            interest_t = balance * r
+            principal_t = level - interest_t
+
+            # on last payment, absorb rounding error
+            last = n == period
+            principal_t = np.where(last, balance, principal_t)
+            payment_t = np.where(last, interest_t + principal_t, level)
+
+            balance = np.where(active, balance - principal_t, balance)
+
+            payment[:, col] = np.where(active, payment_t, 0.0)
+            interest[:, col] = np.where(active, interest_t, 0.0)
+            principal_paid[:, col] = np.where(active, principal_t, 0.0)
+            balance_out[:, col] = np.where(active, np.maximum(balance, 0), 0.0)
+
+    return {
+        "payment": np.round(payment, 2),
+        "interest": np.round(interest, 2),
+        "principal": np.round(principal_paid, 2),
+        "balance": np.round(balance_out, 2),
+        "mask": mask,
+        "num_payments": n,
+    }
@@ -0,0 +1,315 @@
+# loan_amort/batch.py
+
+import csv
+import datetime
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+import numpy as np
+
+from loan_amort.amort import amortize_loan, iter_amortization
+from loan_amort.analytic import level_payment
+from loan_amort.columnar import ColumnarWriter
+from loan_amort.export import (
+    XlsxWriter, _csv_line, _ndjson_line, schedule_tuples, schedule_xlsx_columns,
+)
+from loan_amort.paydates import supports_frequency
+from loan_amort.schedule import Schedule
+
+MODES = ("metrics", "schedule")
+TEXT_FORMATS = ("csv", "ndjson")
+BINARY_FORMATS = ("xlsx", "columnar")
+FORMATS = TEXT_FORMATS + BINARY_FORMATS
+METRIC_FIELDS = (
+    "num_payments", "total_payment", "total_interest",
+    "total_principal", "average_payment",
+)
+
+
+def _check_loan(loan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reject loans the vectorized engines cannot price (they would come out
+    as nan/inf metrics), so that one bad record never shares a chunk or a
+    micro-batch with good ones.
+    """
+    if not loan["years"] > 0 or not loan["per_year"] > 0:
+        raise ValueError(f"loan {loan['loan_id']}: years and per_year must be positive")
+    if not loan["principal"] >= 0 or not math.isfinite(loan["principal"]):
+        raise ValueError(f"loan {loan['loan_id']}: principal must be a non-negative number")
+    if not math.isfinite(loan["rate"]):
+        raise ValueError(f"loan {loan['loan_id']}: rate must be a finite number")
+    return loan
+
+
+def _parse_loan(rec: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """
+    Normalize and validate one tape record, filling defaults for optional
+    fields.
+    """
+    try:
+        first_date = rec.get("first_date") or None
+        if isinstance(first_date, str):
+            first_date = datetime.datetime.strptime(first_date, "%Y-%m-%d").date()
+        loan = {
+            "loan_id": str(rec.get("loan_id") or index),
+            "principal": float(rec["principal"]),
+            "rate": float(rec["rate"]),
+            "years": int(rec["years"]),
+            "per_year": int(rec.get("per_year") or 12),
+            "first_date": first_date,
+        }
+        if first_date and not supports_frequency(loan["per_year"]):
+            raise ValueError(f"unsupported payment frequency for dates: {loan['per_year']} per year")
+        return _check_loan(loan)
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Bad tape record {index}: {e!r}") from e
+
+
+def read_tape(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read a loan tape from a CSV or JSONL file.
+
+    Each record needs principal, rate and years; per_year (default 12),
+    first_date (YYYY-MM-DD) and loan_id (default: record number) are optional.
+    """
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".ndjson", ".json")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for index, rec in enumerate(records, start=1):
+            yield _parse_loan(rec, index)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _header(mode: str, fmt: str) -> str:
+    if fmt != "csv":
+        return ""
+    if mode == "metrics":
+        return ",".join(("loan_id",) + METRIC_FIELDS) + "\n"
+    return "loan_id,period,date,payment,interest,principal,balance\n"
+
+
+def metrics_records(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Closed-form metrics for a whole chunk in one vectorized pass.
+
+    Returns:
+        One dict per loan: loan_id followed by the METRIC_FIELDS.
+    """
+    principal = np.array([l["principal"] for l in chunk])
+    rate = np.array([l["rate"] for l in chunk])
+    years = np.array([l["years"] for l in chunk])
+    per_year = np.array([l["per_year"] for l in chunk])
+
+    n = years * per_year
+    payment = level_payment(principal, rate, years, per_year)
+    total = np.atleast_1d(payment * n)
+    payment = np.atleast_1d(payment)
+
+    return [
+        {
+            "loan_id": loan["loan_id"],
+            "num_payments": int(n[i]),
+            "total_payment": round(float(total[i]), 2),
+            "total_interest": round(float(total[i] - principal[i]), 2),
+            "total_principal": round(float(principal[i]), 2),
+            "average_payment": round(float(payment[i]), 2),
+        }
+        for i, loan in enumerate(chunk)
+    ]
+
+
+def _metrics_lines(chunk: List[Dict[str, Any]], fmt: str) -> List[str]:
+    records = metrics_records(chunk)
+    if fmt == "csv":
+        return [",".join([m["loan_id"]] + [str(m[k]) for k in METRIC_FIELDS]) + "\n"
+                for m in records]
+    return [json.dumps(m, separators=(",", ":")) + "\n" for m in records]
+
+
+def _schedule_lines(chunk: List[Dict[str, Any]], fmt: str) -> List[str]:
+    lines = []
+    for loan in chunk:
+        rows = iter_amortization(
+            loan["principal"], loan["rate"], loan["years"],
+            loan["per_year"], first_payment_date=loan["first_date"],
+        )
+        if fmt == "csv":
+            prefix = loan["loan_id"] + ","
+            for p in rows:
+                p.setdefault("date", "")
+                lines.append(prefix + _csv_line(p, True))
+        else:
+            for p in rows:
+                lines.append(_ndjson_line({"loan_id": loan["loan_id"], **p}, True))
+    return lines
+
+
+def process_chunk(chunk: List[Dict[str, Any]], mode: str = "metrics", fmt: str = "csv") -> str:
+    """
+    Format the output for one chunk of loans; runs inside pool workers.
+    """
+    if mode == "metrics":
+        return "".join(_metrics_lines(chunk, fmt))
+    return "".join(_schedule_lines(chunk, fmt))
+
+
+def _ordered_map(fn, chunks: Iterable[List], workers: int, *args) -> Iterator[Tuple[Any, int]]:
+    """
+    Yield (fn(chunk, *args), len(chunk)) in chunk order.
+
+    Chunks go to at most `workers` processes with at most 2 * workers in
+    flight, so memory does not grow with the number of chunks; workers=1
+    runs inline.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield fn(chunk, *args), len(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((pool.submit(fn, chunk, *args), len(chunk)))
+            if len(pending) >= 2 * workers:
+                future, size = pending.popleft()
+                yield future.result(), size
+        while pending:
+            future, size = pending.popleft()
+            yield future.result(), size
+
+
+class _Progress:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.done = 0
+        self.start = time.perf_counter()
+
+    def add(self, size: int) -> None:
+        self.done += size
+        if self.enabled:
+            rate = self.done / max(time.perf_counter() - self.start, 1e-9)
+            print(f"processed {self.done} loans ({rate:,.0f} loans/s)", file=sys.stderr)
+
+
+def run_batch(
+    loans: Iterable[Dict[str, Any]],
+    out: TextIO,
+    mode: str = "metrics",
+    fmt: str = "csv",
+    workers: int = None,
+    chunk_size: int = 1000,
+    progress: bool = False
+) -> int:
+    """
+    Process a loan tape in chunks across a process pool.
+
+    Chunks are submitted to at most `workers` processes with a bounded
+    number in flight, and their output is written in submission order, so
+    the result is identical for any worker count and memory does not grow
+    with the tape size.
+
+    Args:
+        loans: iterable of loan dicts (e.g. from read_tape)
+        out: writable text stream
+        mode: 'metrics' for one summary line per loan, 'schedule' for rows
+        fmt: 'csv' or 'ndjson' (see export_batch for xlsx and columnar)
+        workers: number of processes (default: os.cpu_count()); 1 runs inline
+        chunk_size: loans per task
+        progress: report throughput on stderr
+
+    Returns:
+        Number of loans processed.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown batch mode: {mode}")
+    if fmt not in TEXT_FORMATS:
+        raise ValueError(f"Unknown batch format: {fmt}")
+    workers = workers or os.cpu_count() or 1
+
+    out.write(_header(mode, fmt))
+    tracker = _Progress(progress)
+    for text, size in _ordered_map(process_chunk, _chunks(loans, chunk_size), workers, mode, fmt):
+        out.write(text)
+        tracker.add(size)
+
+    out.flush()
+    return tracker.done
+
+
+def schedule_chunk(chunk: List[Dict[str, Any]]) -> List[Tuple[str, Schedule]]:
+    """
+    (loan_id, Schedule) for each loan in a chunk; runs inside pool workers.
+    """
+    return [
+        (loan["loan_id"], amortize_loan(loan["principal"], loan["rate"], loan["years"],
+                                        loan["per_year"], loan["first_date"]))
+        for loan in chunk
+    ]
+
+
+def export_batch(
+    loans: Iterable[Dict[str, Any]],
+    path: str,
+    mode: str = "schedule",
+    fmt: str = "xlsx",
+    workers: int = None,
+    chunk_size: int = 1000,
+    progress: bool = False
+) -> int:
+    """
+    Like run_batch, but writes a binary file: a streaming .xlsx workbook
+    (metrics or schedules) or a memory-mappable columnar .lac file
+    (schedules only).
+
+    Returns:
+        Number of loans processed.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown batch mode: {mode}")
+    if fmt not in BINARY_FORMATS:
+        raise ValueError(f"Unknown batch format: {fmt}")
+    if fmt == "columnar" and mode != "schedule":
+        raise ValueError("the columnar format stores schedules; use --mode schedule")
+    workers = workers or os.cpu_count() or 1
+    tracker = _Progress(progress)
+    chunks = _chunks(loans, chunk_size)
+
+    if fmt == "columnar":
+        with ColumnarWriter(path) as writer:
+            for pairs, size in _ordered_map(schedule_chunk, chunks, workers):
+                for loan_id, schedule in pairs:
+                    writer.add(loan_id, schedule)
+                tracker.add(size)
+        return tracker.done
+
+    if mode == "metrics":
+        columns = ("loan_id",) + METRIC_FIELDS
+        kinds = ("text", "int", "money", "money", "money", "money")
+        with XlsxWriter(path, columns, kinds, sheet_name="Metrics") as xlsx:
+            for records, size in _ordered_map(metrics_records, chunks, workers):
+                xlsx.write_rows([m[c] for c in columns] for m in records)
+                tracker.add(size)
+        return tracker.done
+
+    with XlsxWriter(path, *schedule_xlsx_columns(True, with_loan_id=True)) as xlsx:
+        for pairs, size in _ordered_map(schedule_chunk, chunks, workers):
+            for loan_id, schedule in pairs:
+                xlsx.write_rows(schedule_tuples(schedule, loan_id, with_dates=True))
+            tracker.add(size)
+    return tracker.done
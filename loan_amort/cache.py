@@ -0,0 +1,196 @@
+# loan_amort/cache.py
+
+import datetime
+import hashlib
+import os
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from loan_amort.amort import amortize_loan
+from loan_amort.schedule import Schedule
+
+DEFAULT_MAXSIZE = 128
+CACHE_DIR_ENV = "LOAN_AMORT_CACHE_DIR"
+# bump whenever amortization results change, so that schedules persisted
+# by an older build are recomputed instead of served
+CACHE_VERSION = 2
+_COLUMNS = ("period", "payment", "interest", "principal", "balance")
+
+Key = Tuple[float, float, int, int, Optional[str]]
+
+
+def _freeze(schedule: Schedule) -> Schedule:
+    """
+    Mark a schedule's columns read-only so cached copies cannot be mutated.
+    """
+    for name in _COLUMNS + ("dates",):
+        col = getattr(schedule, name)
+        if col is not None:
+            col.flags.writeable = False
+    return schedule
+
+
+class ScheduleCache:
+    """
+    LRU cache of schedules keyed on the loan terms.
+
+    Keeps up to `maxsize` schedules in memory, evicting the least recently
+    used. With a `cache_dir`, schedules are also persisted as .npz files so
+    they survive across processes; memory misses fall back to disk before
+    recomputing. Cached schedules are read-only and shared between callers.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, cache_dir: Optional[str] = None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[Key, Schedule]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(
+        principal: float,
+        annual_rate: float,
+        years: int,
+        payments_per_year: int = 12,
+        first_payment_date: datetime.date = None
+    ) -> Key:
+        return (
+            float(principal),
+            float(annual_rate),
+            int(years),
+            int(payments_per_year),
+            first_payment_date.isoformat() if first_payment_date else None,
+        )
+
+    def _path(self, key: Key) -> str:
+        digest = hashlib.sha1(repr((CACHE_VERSION,) + key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    def _load(self, key: Key) -> Optional[Schedule]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if "version" not in data.files or int(data["version"]) != CACHE_VERSION:
+                    return None
+                dates = data["dates"] if "dates" in data.files else None
+                return Schedule(*(data[c] for c in _COLUMNS), dates=dates)
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # missing, truncated or corrupt: recompute
+            return None
+
+    def _store(self, key: Key, schedule: Schedule) -> None:
+        columns = {c: getattr(schedule, c) for c in _COLUMNS}
+        columns["version"] = np.array(CACHE_VERSION)
+        if schedule.dates is not None:
+            columns["dates"] = schedule.dates
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp, path)
+
+    def holds(
+        self,
+        principal: float,
+        annual_rate: float,
+        years: int,
+        payments_per_year: int = 12,
+        first_payment_date: datetime.date = None
+    ) -> bool:
+        """
+        Whether the schedule is already cached in memory or on disk.
+        """
+        key = self.key(principal, annual_rate, years, payments_per_year, first_payment_date)
+        if key in self._entries:
+            return True
+        return bool(self.cache_dir) and os.path.exists(self._path(key))
+
+    def get(
+        self,
+        principal: float,
+        annual_rate: float,
+        years: int,
+        payments_per_year: int = 12,
+        first_payment_date: datetime.date = None
+    ) -> Schedule:
+        """
+        Return the schedule for these terms, computing it on a miss.
+        """
+        key = self.key(principal, annual_rate, years, payments_per_year, first_payment_date)
+        schedule = self._entries.get(key)
+        if schedule is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return schedule
+
+        schedule = self._load(key) if self.cache_dir else None
+        if schedule is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            schedule = amortize_loan(principal, annual_rate, years,
+                                     payments_per_year, first_payment_date)
+            if self.cache_dir:
+                self._store(key, schedule)
+
+        self._entries[key] = _freeze(schedule)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return schedule
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self) -> None:
+        """
+        Drop in-memory entries and reset statistics (disk files are kept).
+        """
+        self._entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+
+_default_cache: Optional[ScheduleCache] = None
+
+
+def get_cache() -> ScheduleCache:
+    """
+    Process-wide cache, persisted under $LOAN_AMORT_CACHE_DIR when set.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ScheduleCache(cache_dir=os.environ.get(CACHE_DIR_ENV) or None)
+    return _default_cache
+
+
+def configure_cache(maxsize: int = DEFAULT_MAXSIZE, cache_dir: Optional[str] = None) -> ScheduleCache:
+    """
+    Replace the process-wide cache.
+    """
+    global _default_cache
+    _default_cache = ScheduleCache(maxsize=maxsize, cache_dir=cache_dir)
+    return _default_cache
+
+
+def cached_amortize_loan(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None
+) -> Schedule:
+    """
+    amortize_loan through the process-wide cache.
+    """
+    return get_cache().get(principal, annual_rate, years, payments_per_year, first_payment_date)
@@ -1,18 +1,55 @@
 # loan_amort/cli.py
 
 import argparse
+import math
+import os
 import sys
 import datetime
-import matplotlib
 
-from loan_amort.amort import amortize_loan
+import numpy as np
+
+from loan_amort.amort import ROLLUPS, amortize_loan, iter_amortization
+from loan_amort.analytic import balance_at, loan_metrics_closed_form, cross_check_metrics
+from loan_amort.cache import cached_amortize_loan, configure_cache, get_cache, CACHE_DIR_ENV, DEFAULT_MAXSIZE
+from loan_amort.export import FILE_FORMATS, FORMATS, export_schedule, format_for_path, write_schedule
 from loan_amort.metrics import compute_loan_metrics
-from loan_amort.plots import (
-    plot_balance_line,
-    plot_interest_principal_line,
-    plot_interest_principal_stacked,
-    plot_cumulative_line,
-)
+from loan_amort.paydates import supports_frequency
+from loan_amort import profiling
+
+# Modules behind the other subcommands (batch, exact, grid, pool, prepay,
+# refi, seasoned, simulate, solve, ...) are imported inside their cmd_*
+# functions, so amortize and metrics start without loading them. The
+# choices their parsers need are mirrored here; tests/test_startup.py
+# checks that they stay in sync.
+BATCH_MODES = ("metrics", "schedule")
+BATCH_FORMATS = ("csv", "ndjson", "xlsx", "columnar")
+BATCH_BINARY_FORMATS = ("xlsx", "columnar")
+ROUNDING_MODES = ("half_even", "half_up")
+GRID_METRICS = ("payment", "total_payment", "total_interest", "first_year_interest", "interest_ratio")
+
+# kept here rather than imported from loan_amort.plots to avoid loading
+# matplotlib when building the parser
+PLOT_CHOICES = [
+    "balance_line",
+    "interest_line",
+    "interest_stacked",
+    "cumulative_line",
+]
+IMAGE_FORMATS = ["png", "svg", "pdf"]
+
+def add_exact_args(p):
+    p.add_argument("--exact", action="store_true",
+                   help="Compute the schedule exactly in integer cents")
+    p.add_argument("--rounding", choices=ROUNDING_MODES, default="half_even",
+                   help="Cent rounding rule for --exact (default: half_even)")
+
+def add_as_of_args(p):
+    p.add_argument("--as-of", type=str,
+                   help="Start from this date (YYYY-MM-DD; needs --first-date): "
+                        "payments due before it are treated as made")
+    p.add_argument("--current-balance", type=float,
+                   help="Outstanding balance at --as-of, re-amortized over the remaining term "
+                        "(default: scheduled balance)")
 
 def add_common_args(p):
     p.add_argument("-P", "--principal", type=float, required=True,
@@ -26,12 +63,15 @@ def add_common_args(p):
     p.add_argument("--first-date", type=str,
                    help="Date of first payment (YYYY-MM-DD)")
 
-def cmd_amortize(args):
+def _load_schedule(args):
+    """
+    Schedule for the loan described by args, via the schedule cache.
+    """
     first_date = None
     if args.first_date:
         first_date = datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date()
 
-    schedule = amortize_loan(
+    return cached_amortize_loan(
         principal=args.principal,
         annual_rate=args.rate,
         years=args.years,
@@ -39,66 +79,224 @@ def cmd_amortize(args):
         first_payment_date=first_date
     )
 
-    # Header
-    header = f"{'Period':>6} "
-    if first_date:
-        header += f"{'Date':>12} "
-    header += f"{'Payment':>10} {'Interest':>10} {'Principal':>10} {'Balance':>12}"
-    print(header)
-
-    # Rows
-    for p in schedule:
-        line = f"{p['period']:6d} "
-        if first_date:
-            line += f"{p['date']:12s} "
-        line += (f"{p['payment']:10.2f} {p['interest']:10.2f} "
-                 f"{p['principal']:10.2f} {p['balance']:12.2f}")
-        print(line)
+def _first_date(args):
+    if not args.first_date:
+        return None
+    return datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date()
+
+def _schedule_is_cached(args):
+    """
+    Whether materializing through the cache pays off: it persists to disk
+    or already holds this schedule.
+    """
+    cache = get_cache()
+    return bool(cache.cache_dir) or cache.holds(
+        args.principal, args.rate, args.years, args.per_year, _first_date(args))
+
+def _load_exact_schedule(args):
+    from loan_amort.exact import amortize_loan_cents
 
-def cmd_metrics(args):
     first_date = None
     if args.first_date:
         first_date = datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date()
 
-    schedule = amortize_loan(
-        principal=args.principal,
-        annual_rate=args.rate,
-        years=args.years,
-        payments_per_year=args.per_year,
-        first_payment_date=first_date
+    return amortize_loan_cents(
+        args.principal, args.rate, args.years, args.per_year, first_date,
+        rounding=args.rounding,
     )
-    m = compute_loan_metrics(schedule)
+
+def _as_of_loan(args, conflicts):
+    """
+    amortize_as_of/remaining_metrics arguments for --as-of, or None.
+    """
+    as_of = getattr(args, "as_of", None)
+    current_balance = getattr(args, "current_balance", None)
+    if as_of is None and current_balance is None:
+        return None
+    used = [flag for flag, on in conflicts if on]
+    if as_of is None or not args.first_date or used:
+        problem = f"cannot be combined with {', '.join(used)}" if used else "needs --as-of and --first-date"
+        print(f"--as-of/--current-balance {problem}", file=sys.stderr)
+        sys.exit(2)
+    return {
+        "principal": args.principal,
+        "annual_rate": args.rate,
+        "years": args.years,
+        "payments_per_year": args.per_year,
+        "first_payment_date": datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date(),
+        "as_of": datetime.datetime.strptime(as_of, "%Y-%m-%d").date(),
+        "current_balance": current_balance,
+    }
+
+def _parse_lump_sum(text):
+    try:
+        period, amount = text.split(":")
+        return int(period), float(amount)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PERIOD:AMOUNT, got {text!r}")
+
+def _parse_offer(text):
+    try:
+        parts = text.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError
+        return {"rate": float(parts[0]), "years": float(parts[1]),
+                "closing_costs": float(parts[2]) if len(parts) == 3 else 0.0}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected RATE:YEARS[:COSTS], got {text!r}")
+
+def _parse_axis(text, kind=float):
+    """
+    Grid axis from 'START:STOP:COUNT' (evenly spaced, inclusive) or 'A,B,C'.
+    """
+    try:
+        if ":" in text:
+            start, stop, num = text.split(":")
+            values = [kind(v) for v in np.linspace(float(start), float(stop), int(num))]
+        else:
+            values = [kind(v) for v in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:STOP:COUNT or A,B,C, got {text!r}")
+    return sorted(set(values))
+
+def _parse_years_axis(text):
+    return _parse_axis(text, lambda v: int(round(float(v))))
+
+def cmd_amortize(args):
+    extra = getattr(args, "extra", 0.0)
+    lump_sums = getattr(args, "lump_sum", None)
+    rollup = getattr(args, "rollup", None)
+    seasoned = _as_of_loan(args, [
+        ("--exact", getattr(args, "exact", False)),
+        ("--extra", bool(extra)),
+        ("--lump-sum", bool(lump_sums)),
+        ("--rollup", bool(rollup)),
+    ])
+    if seasoned:
+        from loan_amort.seasoned import amortize_as_of
+
+        try:
+            schedule = amortize_as_of(**seasoned)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+    elif rollup and (extra or lump_sums or getattr(args, "exact", False)):
+        print("--rollup cannot be combined with --exact, --extra or --lump-sum", file=sys.stderr)
+        sys.exit(2)
+    elif getattr(args, "exact", False) and (extra or lump_sums):
+        print("--exact cannot be combined with --extra or --lump-sum", file=sys.stderr)
+        sys.exit(2)
+    elif rollup:
+        first_date = None
+        if args.first_date:
+            first_date = datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date()
+        schedule = amortize_loan(args.principal, args.rate, args.years, args.per_year,
+                                 first_date, rollup=rollup)
+    elif getattr(args, "exact", False):
+        schedule = _load_exact_schedule(args)
+    elif extra or lump_sums:
+        from loan_amort.prepay import amortize_with_extra
+
+        first_date = None
+        if args.first_date:
+            first_date = datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date()
+        try:
+            schedule = amortize_with_extra(
+                args.principal, args.rate, args.years, args.per_year, first_date,
+                recurring=extra, start=args.extra_start, lump_sums=dict(lump_sums or []),
+            )
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+    elif not getattr(args, "output", None) and not _schedule_is_cached(args):
+        # nothing to reuse or persist: stream rows in constant memory
+        fmt = getattr(args, "format", None)
+        if fmt not in (None,) + FORMATS:
+            print(f"--format {fmt} needs -o/--output", file=sys.stderr)
+            sys.exit(2)
+        first_date = _first_date(args)
+        rows = iter_amortization(args.principal, args.rate, args.years, args.per_year, first_date)
+        write_schedule(rows, sys.stdout, fmt=fmt or "table", with_dates=first_date is not None)
+        return
+    else:
+        schedule = _load_schedule(args)
+    fmt = getattr(args, "format", None)
+    output = getattr(args, "output", None)
+    if output:
+        export_schedule(schedule, output, fmt or format_for_path(output, "csv"))
+        return
+    if fmt not in (None,) + FORMATS:
+        print(f"--format {fmt} needs -o/--output", file=sys.stderr)
+        sys.exit(2)
+    write_schedule(schedule, sys.stdout, fmt=fmt or "table",
+                   with_dates=schedule.dates is not None)
+
+def cmd_metrics(args):
+    seasoned = _as_of_loan(args, [
+        ("--exact", getattr(args, "exact", False)),
+        ("--cross-check", getattr(args, "cross_check", False)),
+    ])
+    if seasoned:
+        from loan_amort.seasoned import amortize_as_of, remaining_metrics
+
+        try:
+            if getattr(args, "rows", False):
+                m = compute_loan_metrics(amortize_as_of(**seasoned))
+            else:
+                m = remaining_metrics(**seasoned)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+        for k, v in m.items():
+            print(f"{k:15s}: {v}")
+        return
+
+    if getattr(args, "cross_check", False):
+        try:
+            cross_check_metrics(args.principal, args.rate, args.years, args.per_year)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+
+    if getattr(args, "exact", False):
+        m = compute_loan_metrics(_load_exact_schedule(args))
+    elif getattr(args, "rows", False):
+        m = compute_loan_metrics(_load_schedule(args))
+    else:
+        m = loan_metrics_closed_form(args.principal, args.rate, args.years, args.per_year)
     for k, v in m.items():
         print(f"{k:15s}: {v}")
 
 def cmd_plot(args):
-    first_date = None
-    if args.first_date:
-        first_date = datetime.datetime.strptime(args.first_date, "%Y-%m-%d").date()
+    if not args.first_date:
+        # every chart is drawn against payment dates
+        print("plot needs --first-date", file=sys.stderr)
+        sys.exit(2)
+    # plotting stack is imported lazily so other subcommands start fast
+    import matplotlib
+    output = getattr(args, "output", None)
+    if output:
+        # rendering straight to a file never needs a GUI backend
+        matplotlib.use("Agg")
+    from loan_amort.plots import CHARTS
 
-    schedule = amortize_loan(
-        principal=args.principal,
-        annual_rate=args.rate,
-        years=args.years,
-        payments_per_year=args.per_year,
-        first_payment_date=first_date
-    )
+    schedule = _load_schedule(args)
 
     key = args.which
-    if key == "balance_line":
-        fig = plot_balance_line(schedule)
-    elif key == "interest_line":
-        fig = plot_interest_principal_line(schedule)
-    elif key == "interest_stacked":
-        fig = plot_interest_principal_stacked(schedule)
-    elif key == "cumulative_line":
-        fig = plot_cumulative_line(schedule)
-    else:
+    if key not in CHARTS:
         print("Unknown plot type:", key, file=sys.stderr)
         sys.exit(1)
+    max_points = getattr(args, "max_points", None)
+    if key == "interest_stacked":
+        fig = CHARTS[key](schedule)
+    else:
+        fig = CHARTS[key](schedule, max_points=max_points)
 
     # Show or save
-    if matplotlib.get_backend().lower() == "agg":
+    if output:
+        with profiling.span("plot.save"):
+            fig.savefig(output, format=getattr(args, "format", None))
+    elif matplotlib.get_backend().lower() == "agg":
         defaults = {
             "balance_line":   "balance_line.png",
             "interest_line":  "interest_line.png",
@@ -112,6 +310,274 @@ def cmd_plot(args):
     else:
         fig.show()
 
+def cmd_render(args):
+    from loan_amort.batch import read_tape
+    from loan_amort.render import render_charts
+
+    try:
+        render_charts(
+            read_tape(args.tape),
+            args.out_dir,
+            charts=args.charts or None,
+            fmt=args.format,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+def cmd_solve(args):
+    from loan_amort.solve import solve_principal, solve_rate, solve_term
+
+    need = {
+        "rate": ("payment", "principal", "years"),
+        "principal": ("payment", "rate", "years"),
+        "term": ("payment", "principal", "rate"),
+    }[args.target]
+    missing = [name for name in need if getattr(args, name) is None]
+    if missing:
+        flags = ", ".join("--" + name for name in missing)
+        print(f"solve {args.target} requires {flags}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.target == "rate":
+        rate = solve_rate(args.payment, args.principal, args.years, args.per_year, args.fees)
+        if math.isnan(rate):
+            print("No solution: no non-negative rate gives this payment "
+                  "(the payments repay less than the amount financed).", file=sys.stderr)
+            sys.exit(1)
+        label = "apr" if args.fees else "rate"
+        print(f"{label:15s}: {rate:.6f}")
+    elif args.target == "principal":
+        principal = solve_principal(args.payment, args.rate, args.years, args.per_year)
+        print(f"{'principal':15s}: {principal:.2f}")
+    else:
+        periods = solve_term(args.payment, args.principal, args.rate, args.per_year)
+        if periods == float("inf"):
+            print("Payment does not cover the periodic interest; the loan never amortizes.",
+                  file=sys.stderr)
+            sys.exit(1)
+        print(f"{'num_payments':15s}: {math.ceil(periods - 1e-9)}")
+        print(f"{'years':15s}: {periods / args.per_year:.2f}")
+
+def cmd_pool(args):
+    from loan_amort.batch import read_tape
+    from loan_amort.pool import aggregate_tape
+
+    try:
+        pool = aggregate_tape(read_tape(args.tape), chunk_size=args.chunk_size)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    for k, v in pool.metrics(args.yield_rate).items():
+        print(f"{k:18s}: {v}")
+
+    if args.cash_flows:
+        with open(args.cash_flows, "w", newline="") as out:
+            write_schedule(pool.to_schedule(), out, fmt="csv", with_dates=True)
+    if args.plot:
+        import matplotlib
+        matplotlib.use("Agg")
+        from loan_amort.plots import plot_pool_cash_flows
+
+        fig = plot_pool_cash_flows(pool.to_schedule())
+        with profiling.span("plot.save"):
+            fig.savefig(args.plot)
+
+def cmd_simulate(args):
+    from loan_amort.batch import read_tape
+    from loan_amort.simulate import simulate_paths, summarize
+
+    if args.paths < 1:
+        print("--paths must be at least 1", file=sys.stderr)
+        sys.exit(2)
+    if args.tape:
+        try:
+            loans = list(read_tape(args.tape))
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+        if not loans:
+            print(f"simulate: no loans in {args.tape}", file=sys.stderr)
+            sys.exit(2)
+        if len({l["per_year"] for l in loans}) > 1:
+            print("simulate needs one payment frequency across the tape", file=sys.stderr)
+            sys.exit(2)
+        principals = [l["principal"] for l in loans]
+        rates = [l["rate"] for l in loans]
+        years = [l["years"] for l in loans]
+        per_year = loans[0]["per_year"]
+    else:
+        missing = [name for name in ("principal", "rate", "years") if getattr(args, name) is None]
+        if missing:
+            flags = ", ".join("--" + name for name in missing)
+            print(f"simulate requires --tape or {flags}", file=sys.stderr)
+            sys.exit(2)
+        principals, rates, years, per_year = args.principal, args.rate, args.years, args.per_year
+
+    paths = simulate_paths(
+        principals, rates, years, per_year,
+        num_paths=args.paths,
+        cpr=args.cpr,
+        cdr=args.cdr,
+        severity=args.severity,
+        cpr_vol=args.cpr_vol,
+        cdr_vol=args.cdr_vol,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    stats = summarize(paths)
+    columns = list(next(iter(stats.values())))
+    print(f"{'':15s}" + "".join(f"{c:>14s}" for c in columns))
+    for name, row in stats.items():
+        print(f"{name:15s}" + "".join(f"{row[c]:14.2f}" for c in columns))
+
+def cmd_refi(args):
+    from loan_amort.batch import read_tape
+    from loan_amort.refi import NEVER, analyze_refi, rank_offers, read_offers
+
+    offers = read_offers(args.offers) if args.offers else []
+    for i, offer in enumerate(args.offer or [], start=len(offers) + 1):
+        offers.append(dict(offer, offer_id=str(i)))
+    if not offers:
+        print("refi needs --offer or --offers", file=sys.stderr)
+        sys.exit(2)
+
+    if args.tape:
+        # tape loans are read as outstanding today: principal is the
+        # current balance and years the remaining term
+        loans = list(read_tape(args.tape))
+        loan_ids = [l["loan_id"] for l in loans]
+        balances = np.array([l["principal"] for l in loans])
+        rates = np.array([l["rate"] for l in loans])
+        per_year = np.array([l["per_year"] for l in loans])
+        remaining = np.array([l["years"] for l in loans]) * per_year
+    else:
+        missing = [name for name in ("principal", "rate", "years") if getattr(args, name) is None]
+        if missing:
+            flags = ", ".join("--" + name for name in missing)
+            print(f"refi requires --tape or {flags}", file=sys.stderr)
+            sys.exit(2)
+        num_payments = args.years * args.per_year
+        if not 0 <= args.paid < num_payments:
+            print(f"--paid must be between 0 and {num_payments - 1}", file=sys.stderr)
+            sys.exit(2)
+        loan_ids = ["1"]
+        balances = balance_at(args.paid, args.principal, args.rate, args.years, args.per_year)
+        rates, per_year = args.rate, args.per_year
+        remaining = num_payments - args.paid
+
+    analysis = analyze_refi(
+        balances, rates, remaining,
+        [o["rate"] for o in offers],
+        [o["years"] for o in offers],
+        [o["closing_costs"] for o in offers],
+        per_year,
+    )
+    records = rank_offers(analysis, loan_ids, [o["offer_id"] for o in offers], top=args.top)
+
+    fields = ("new_payment", "periodic_savings", "interest_saved", "net_savings")
+    if args.format == "csv":
+        print("loan_id,rank,offer_id,payment," + ",".join(fields) + ",break_even")
+        for rec in records:
+            print(f"{rec['loan_id']},{rec['rank']},{rec['offer_id']},{rec['payment']:.2f},"
+                  + ",".join(f"{rec[f]:.2f}" for f in fields) + f",{rec['break_even']}")
+        return
+    print(f"{'Loan':>8s} {'Rank':>4s} {'Offer':>8s} {'Payment':>11s} {'New pmt':>11s} "
+          f"{'Saves/pmt':>11s} {'Int saved':>13s} {'Net saved':>13s} {'Break-even':>10s}")
+    for rec in records:
+        be = "never" if rec["break_even"] == NEVER else str(rec["break_even"])
+        print(f"{rec['loan_id']:>8s} {rec['rank']:4d} {rec['offer_id']:>8s} {rec['payment']:11.2f} "
+              f"{rec['new_payment']:11.2f} {rec['periodic_savings']:11.2f} "
+              f"{rec['interest_saved']:13.2f} {rec['net_savings']:13.2f} {be:>10s}")
+
+def cmd_serve(args):
+    from loan_amort.serve import serve
+
+    serve(args.host, args.port, workers=args.workers,
+          max_batch=args.max_batch, max_delay=args.max_delay_ms / 1e3)
+
+def cmd_loadgen(args):
+    from loan_amort.loadgen import run_load
+
+    result = run_load(args.host, args.port, endpoint=args.endpoint,
+                      requests=args.requests, concurrency=args.concurrency)
+    for k, v in result.items():
+        print(f"{k:15s}: {v}")
+
+def cmd_grid(args):
+    from loan_amort.grid import evaluate_grid, write_grid_csv
+
+    # check everything before writing any output
+    problem = None
+    if min(args.years) <= 0 or args.per_year <= 0:
+        problem = "grid terms and --per-year must be positive"
+    elif args.heatmap and args.metric not in GRID_METRICS:
+        problem = f"--metric must be one of {', '.join(GRID_METRICS)}"
+    elif args.heatmap and args.heatmap_years is not None and args.heatmap_years not in args.years:
+        problem = f"--heatmap-years {args.heatmap_years} is not in the grid (have {args.years})"
+    if problem:
+        print(problem, file=sys.stderr)
+        sys.exit(2)
+
+    grid = evaluate_grid(args.principal, args.rate, args.years, args.per_year)
+    if args.output:
+        with open(args.output, "w", newline="") as out:
+            write_grid_csv(grid, out)
+    else:
+        write_grid_csv(grid, sys.stdout)
+
+    if args.heatmap:
+        import matplotlib
+        matplotlib.use("Agg")
+        from loan_amort.plots import plot_grid_heatmap
+
+        fig = plot_grid_heatmap(grid, args.metric, args.heatmap_years)
+        with profiling.span("plot.save"):
+            fig.savefig(args.heatmap)
+
+def cmd_batch(args):
+    from loan_amort.batch import export_batch, read_tape, run_batch
+
+    fmt = args.format or (format_for_path(args.output, "csv") if args.output else "csv")
+    if fmt in BATCH_BINARY_FORMATS:
+        if not args.output:
+            print(f"--format {fmt} needs -o/--output", file=sys.stderr)
+            sys.exit(2)
+        try:
+            export_batch(
+                read_tape(args.tape),
+                args.output,
+                mode=args.mode,
+                fmt=fmt,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                progress=args.progress,
+            )
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+        return
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        run_batch(
+            read_tape(args.tape),
+            out,
+            mode=args.mode,
+            fmt=fmt,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            progress=args.progress,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
 def cmd_interactive(args):
     # Gather inputs once
     principal = float(input("What is the loan principal? "))
@@ -122,8 +588,8 @@ def cmd_interactive(args):
     first_date_str = input("What is the date of the first payment? (YYYY-MM-DD)? ").strip()
     first_date = datetime.datetime.strptime(first_date_str, "%Y-%m-%d").date()
 
-    # Precompute schedule
-    schedule = amortize_loan(
+    # Precompute schedule; the menu commands below reuse it from the cache
+    cached_amortize_loan(
         principal,
         rate,
         years,
@@ -189,31 +655,221 @@ Which plot would you like?
 def main():
     parser = argparse.ArgumentParser(prog="loan_amort")
     parser.set_defaults(func=cmd_interactive)
+    parser.add_argument("--cache-dir",
+                        help="Persist computed schedules in this directory "
+                             "(default: $LOAN_AMORT_CACHE_DIR)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAXSIZE,
+                        help=f"Schedules kept in memory (default: {DEFAULT_MAXSIZE})")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="Print schedule cache statistics on exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage timing breakdown on exit")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="Also write a Chrome trace JSON file (implies --profile)")
     sub = parser.add_subparsers(dest="cmd")
 
     p_am = sub.add_parser("amortize", help="Print full amortization schedule")
     add_common_args(p_am)
+    p_am.add_argument("--format", choices=FILE_FORMATS, default=None,
+                      help="Output format (default: table, or from the --output extension)")
+    p_am.add_argument("-o", "--output",
+                      help="Write to this file (.csv, .ndjson, .xlsx or .lac) instead of stdout")
+    add_exact_args(p_am)
+    add_as_of_args(p_am)
+    p_am.add_argument("--extra", type=float, default=0.0,
+                      help="Extra principal paid every period from --extra-start")
+    p_am.add_argument("--extra-start", type=int, default=1,
+                      help="First period of the recurring extra payment (default: 1)")
+    p_am.add_argument("--lump-sum", type=_parse_lump_sum, action="append",
+                      metavar="PERIOD:AMOUNT", help="One-off prepayment (repeatable)")
+    p_am.add_argument("--rollup", choices=list(ROLLUPS),
+                      help="One row per loan year or quarter (totals and closing balance)")
     p_am.set_defaults(func=cmd_amortize)
 
     p_me = sub.add_parser("metrics", help="Print loan summary metrics")
     add_common_args(p_me)
+    p_me.add_argument("--rows", action="store_true",
+                      help="Sum the full schedule instead of using closed-form totals")
+    add_exact_args(p_me)
+    add_as_of_args(p_me)
+    p_me.add_argument("--cross-check", action="store_true",
+                      help="Verify closed-form totals against the full schedule")
     p_me.set_defaults(func=cmd_metrics)
 
     p_pl = sub.add_parser("plot", help="Plot schedule components")
     add_common_args(p_pl)
-    p_pl.add_argument("which", choices=[
-        "balance_line",
-        "interest_line",
-        "interest_stacked",
-        "cumulative_line",
-    ], help="Which plot to draw")
+    p_pl.add_argument("which", choices=PLOT_CHOICES, help="Which plot to draw")
+    p_pl.add_argument("--max-points", type=int,
+                      help="Downsample line charts to about this many points (LTTB)")
+    p_pl.add_argument("-o", "--output",
+                      help="Render to this file without prompting or opening a window")
+    p_pl.add_argument("--format", choices=IMAGE_FORMATS,
+                      help="Image format for --output (default: from the file extension)")
     p_pl.set_defaults(func=cmd_plot)
 
+    p_re = sub.add_parser("render", help="Render chart packs for a loan tape")
+    p_re.add_argument("tape", help="Loan tape (.csv or .jsonl); loans need first_date")
+    p_re.add_argument("--out-dir", required=True, help="Directory for the rendered files")
+    p_re.add_argument("--format", choices=IMAGE_FORMATS, default="png",
+                      help="Image format (default: png)")
+    p_re.add_argument("--charts", nargs="+", choices=PLOT_CHOICES,
+                      help="Charts per loan (default: all)")
+    p_re.add_argument("-j", "--workers", type=int, default=None,
+                      help="Worker processes (default: all cores)")
+    p_re.add_argument("--chunk-size", type=int, default=50,
+                      help="Loans per worker task (default: 50)")
+    p_re.set_defaults(func=cmd_render)
+
+    p_so = sub.add_parser("solve", help="Solve for rate/APR, principal or term")
+    p_so.add_argument("target", choices=["rate", "principal", "term"],
+                      help="Quantity to solve for")
+    p_so.add_argument("-p", "--payment", type=float, help="Level periodic payment")
+    p_so.add_argument("-P", "--principal", type=float, help="Loan principal")
+    p_so.add_argument("-r", "--rate", type=float, help="Annual rate as decimal")
+    p_so.add_argument("-y", "--years", type=int, help="Term in years")
+    p_so.add_argument("-k", "--per-year", type=int, default=12,
+                      help="Payments per year (default: 12)")
+    p_so.add_argument("--fees", type=float, default=0.0,
+                      help="Up-front fees; solving for rate then gives the APR")
+    p_so.set_defaults(func=cmd_solve)
+
+    p_gr = sub.add_parser("grid", help="Evaluate a principal x rate x term grid")
+    p_gr.add_argument("-P", "--principal", type=_parse_axis, required=True,
+                      help="Principals: START:STOP:COUNT or A,B,C")
+    p_gr.add_argument("-r", "--rate", type=_parse_axis, required=True,
+                      help="Annual rates as decimals: START:STOP:COUNT or A,B,C")
+    p_gr.add_argument("-y", "--years", type=_parse_years_axis, required=True,
+                      help="Terms in years: START:STOP:COUNT or A,B,C")
+    p_gr.add_argument("-k", "--per-year", type=int, default=12,
+                      help="Payments per year (default: 12)")
+    p_gr.add_argument("-o", "--output", help="CSV file (default: stdout)")
+    p_gr.add_argument("--heatmap", metavar="PATH",
+                      help="Save a rate x principal heatmap (format from the extension)")
+    p_gr.add_argument("--metric", choices=GRID_METRICS, default="payment",
+                      help="Metric for the heatmap (default: payment)")
+    p_gr.add_argument("--heatmap-years", type=int, default=None,
+                      help="Term shown in the heatmap (default: the shortest)")
+    p_gr.set_defaults(func=cmd_grid)
+
+    p_po = sub.add_parser("pool", help="Aggregate a loan tape into pool cash flows")
+    p_po.add_argument("tape", help="Loan tape (.csv or .jsonl); loans need first_date")
+    p_po.add_argument("--yield", dest="yield_rate", type=float, default=None,
+                      help="Annual yield for duration (default: the pool WAC)")
+    p_po.add_argument("--cash-flows", metavar="PATH",
+                      help="Write monthly pool cash flows as CSV")
+    p_po.add_argument("--plot", metavar="PATH",
+                      help="Save a pool cash-flow chart (format from the extension)")
+    p_po.add_argument("--chunk-size", type=int, default=1000,
+                      help="Loans amortized per vectorized pass (default: 1000)")
+    p_po.set_defaults(func=cmd_pool)
+
+    p_si = sub.add_parser("simulate", help="Monte Carlo prepayment/default paths")
+    p_si.add_argument("--tape", help="Simulate a pool from a loan tape instead of one loan")
+    p_si.add_argument("-P", "--principal", type=float, help="Loan principal")
+    p_si.add_argument("-r", "--rate", type=float, help="Annual rate as decimal")
+    p_si.add_argument("-y", "--years", type=int, help="Term in years")
+    p_si.add_argument("-k", "--per-year", type=int, default=12,
+                      help="Payments per year (default: 12)")
+    p_si.add_argument("-n", "--paths", type=int, default=1000,
+                      help="Number of simulated paths (default: 1000)")
+    p_si.add_argument("--cpr", type=float, default=0.06,
+                      help="Base annual prepayment rate (default: 0.06)")
+    p_si.add_argument("--cdr", type=float, default=0.005,
+                      help="Base annual default rate (default: 0.005)")
+    p_si.add_argument("--severity", type=float, default=0.35,
+                      help="Loss as a fraction of defaulted balance (default: 0.35)")
+    p_si.add_argument("--cpr-vol", type=float, default=0.3,
+                      help="Annual volatility of the CPR multiplier (default: 0.3)")
+    p_si.add_argument("--cdr-vol", type=float, default=0.3,
+                      help="Annual volatility of the CDR multiplier (default: 0.3)")
+    p_si.add_argument("--seed", type=int, default=None,
+                      help="Random seed for reproducible paths")
+    p_si.add_argument("-j", "--workers", type=int, default=1,
+                      help="Worker processes (default: 1; 0 for all cores)")
+    p_si.set_defaults(func=cmd_simulate)
+
+    p_rf = sub.add_parser("refi", help="Rank refinance offers by savings and break-even")
+    p_rf.add_argument("--tape", help="Loan tape of outstanding loans (principal = current balance, "
+                                     "years = remaining term)")
+    p_rf.add_argument("-P", "--principal", type=float, help="Original loan principal")
+    p_rf.add_argument("-r", "--rate", type=float, help="Annual rate as decimal")
+    p_rf.add_argument("-y", "--years", type=int, help="Original term in years")
+    p_rf.add_argument("-k", "--per-year", type=int, default=12,
+                      help="Payments per year (default: 12)")
+    p_rf.add_argument("--paid", type=int, default=0,
+                      help="Payments already made on the loan (default: 0)")
+    p_rf.add_argument("--offer", type=_parse_offer, action="append", metavar="RATE:YEARS[:COSTS]",
+                      help="Refinance offer (repeatable)")
+    p_rf.add_argument("--offers", help="CSV/JSONL of offers: rate, years[, closing_costs, offer_id]")
+    p_rf.add_argument("--top", type=int, default=5,
+                      help="Offers listed per loan (default: 5)")
+    p_rf.add_argument("--format", choices=["table", "csv"], default="table",
+                      help="Output format (default: table)")
+    p_rf.set_defaults(func=cmd_refi)
+
+    p_sv = sub.add_parser("serve", help="Run the local HTTP/JSON pricing service")
+    p_sv.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    p_sv.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    p_sv.add_argument("-j", "--workers", type=int, default=1,
+                      help="Worker processes for batch evaluation (default: 1)")
+    p_sv.add_argument("--max-batch", type=int, default=256,
+                      help="Most loans per micro-batch (default: 256)")
+    p_sv.add_argument("--max-delay-ms", type=float, default=2.0,
+                      help="Longest a micro-batch waits to fill, in ms (default: 2)")
+    p_sv.set_defaults(func=cmd_serve)
+
+    p_lg = sub.add_parser("loadgen", help="Load-test a running serve instance")
+    p_lg.add_argument("--host", default="127.0.0.1", help="Server address (default: 127.0.0.1)")
+    p_lg.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    p_lg.add_argument("--endpoint", choices=["metrics", "amortize"], default="metrics",
+                      help="Endpoint to call (default: metrics)")
+    p_lg.add_argument("-n", "--requests", type=int, default=10000,
+                      help="Total requests (default: 10000)")
+    p_lg.add_argument("-c", "--concurrency", type=int, default=64,
+                      help="Concurrent connections (default: 64)")
+    p_lg.set_defaults(func=cmd_loadgen)
+
+    p_ba = sub.add_parser("batch", help="Process a CSV/JSONL loan tape")
+    p_ba.add_argument("tape", help="Loan tape (.csv or .jsonl) with principal, rate, years"
+                                   "[, per_year, first_date, loan_id]")
+    p_ba.add_argument("-o", "--output", help="Output file (default: stdout)")
+    p_ba.add_argument("--mode", choices=BATCH_MODES, default="metrics",
+                      help="Per-loan metrics or full schedules (default: metrics)")
+    p_ba.add_argument("--format", choices=BATCH_FORMATS, default=None,
+                      help="Output format (default: csv, or from the --output extension; "
+                           "xlsx and columnar need --output)")
+    p_ba.add_argument("-j", "--workers", type=int, default=None,
+                      help="Worker processes (default: all cores)")
+    p_ba.add_argument("--chunk-size", type=int, default=1000,
+                      help="Loans per worker task (default: 1000)")
+    p_ba.add_argument("--progress", action="store_true",
+                      help="Report progress on stderr")
+    p_ba.set_defaults(func=cmd_batch)
+
     p_int = sub.add_parser("interactive", help="(optional) interactive mode")
     p_int.set_defaults(func=cmd_interactive)
 
     args = parser.parse_args()
-    args.func(args)
+    per_year = getattr(args, "per_year", 12)
+    if getattr(args, "first_date", None) and not supports_frequency(per_year):
+        print(f"--first-date does not support {per_year} payments per year "
+              "(use a divisor of 12, 24, 26, 52 or 365)", file=sys.stderr)
+        sys.exit(2)
+    configure_cache(maxsize=args.cache_size,
+                    cache_dir=args.cache_dir or os.environ.get(CACHE_DIR_ENV) or None)
+    if args.profile or args.profile_trace:
+        profiling.enable()
+    try:
+        with profiling.span(f"cli.{args.cmd or 'interactive'}"):
+            args.func(args)
+    finally:
+        if args.cache_stats:
+            stats = get_cache().stats()
+            print(", ".join(f"{k}={v}" for k, v in stats.items()), file=sys.stderr)
+        if profiling.is_enabled():
+            print(profiling.report(), file=sys.stderr)
+            if args.profile_trace:
+                profiling.export_chrome_trace(args.profile_trace)
 
 if __name__ == "__main__":
     main()
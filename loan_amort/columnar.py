@@ -0,0 +1,147 @@
+# loan_amort/columnar.py
+"""
+Compact binary columnar format for many schedules (.lac files).
+
+Layout (little-endian):
+
+    header   64 bytes: MAGIC, index offset (uint64), index length (uint64)
+    blocks   one per loan, each column stored contiguously as 8-byte
+             values: period (int64), payment, interest, principal,
+             balance (float64), then dates (datetime64[D]) if present
+    index    UTF-8 JSON: {"version", "columns", "loans": [{"loan_id",
+             "offset", "rows", "dates"}, ...]}
+
+The header points at the index, which is written last so that loans can
+be streamed in without knowing the portfolio size up front. Readers
+memory-map the file, parse only the index, and return each loan's columns
+as views into the mapping, so reading one schedule copies nothing and
+touches only that loan's pages.
+"""
+
+import json
+import struct
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from loan_amort.schedule import Schedule
+
+MAGIC = b"LAMCOL\x00\x01"
+VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sQQ")
+COLUMNS = (
+    ("period", "<i8"),
+    ("payment", "<f8"),
+    ("interest", "<f8"),
+    ("principal", "<f8"),
+    ("balance", "<f8"),
+)
+DATES = ("dates", "<M8[D]")
+
+
+class ColumnarWriter:
+    """
+    Append schedules to a .lac file one loan at a time.
+
+    Only the index entries (a few numbers per loan) are held in memory.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._file.write(b"\0" * HEADER_SIZE)
+        self._loans: List[Dict] = []
+        self._offset = HEADER_SIZE
+
+    def add(self, loan_id: str, schedule: Schedule) -> None:
+        rows = len(schedule)
+        columns = [(getattr(schedule, name), dtype) for name, dtype in COLUMNS]
+        if schedule.dates is not None:
+            columns.append((schedule.dates, DATES[1]))
+        for values, dtype in columns:
+            self._file.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self._loans.append({
+            "loan_id": str(loan_id),
+            "offset": self._offset,
+            "rows": rows,
+            "dates": schedule.dates is not None,
+        })
+        self._offset += 8 * rows * len(columns)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        index = json.dumps({
+            "version": VERSION,
+            "columns": [name for name, _ in COLUMNS + (DATES,)],
+            "loans": self._loans,
+        }, separators=(",", ":")).encode()
+        self._file.write(index)
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, self._offset, len(index)))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ColumnarFile:
+    """
+    Memory-mapped reader for .lac files.
+
+    schedule(loan_id) returns a Schedule whose columns are read-only views
+    into the mapped file.
+    """
+
+    def __init__(self, path: str):
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, offset, length = _HEADER.unpack(self._map[:_HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a loan_amort columnar file")
+        index = json.loads(self._map[offset:offset + length].tobytes())
+        if index["version"] != VERSION:
+            raise ValueError(f"Unsupported columnar file version {index['version']}")
+        self._loans = {loan["loan_id"]: loan for loan in index["loans"]}
+
+    @property
+    def loan_ids(self) -> List[str]:
+        return list(self._loans)
+
+    def __len__(self) -> int:
+        return len(self._loans)
+
+    def __contains__(self, loan_id: str) -> bool:
+        return loan_id in self._loans
+
+    def _column(self, start: int, rows: int, dtype: str) -> np.ndarray:
+        return self._map[start:start + 8 * rows].view(dtype)
+
+    def schedule(self, loan_id: str) -> Schedule:
+        loan = self._loans[loan_id]
+        rows, start = loan["rows"], loan["offset"]
+        columns = {}
+        for name, dtype in COLUMNS:
+            columns[name] = self._column(start, rows, dtype)
+            start += 8 * rows
+        dates = self._column(start, rows, DATES[1]) if loan["dates"] else None
+        return Schedule(dates=dates, **columns)
+
+    def __iter__(self) -> Iterator[Tuple[str, Schedule]]:
+        for loan_id in self._loans:
+            yield loan_id, self.schedule(loan_id)
+
+
+def write_columnar(schedules, path: str) -> int:
+    """
+    Write (loan_id, Schedule) pairs to a .lac file; returns the loan count.
+    """
+    count = 0
+    with ColumnarWriter(path) as writer:
+        for loan_id, schedule in schedules:
+            writer.add(loan_id, schedule)
+            count += 1
+    return count
@@ -0,0 +1,188 @@
+# loan_amort/exact.py
+
+import datetime
+from typing import Dict
+import numpy as np
+
+from loan_amort.analytic import level_payment
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count, span, traced
+from loan_amort.schedule import Schedule
+
+ROUNDING_MODES = ("half_even", "half_up")
+# annual rates are fixed-point integers with 7 decimal places (0.0499 ->
+# 499000); balance * rate must stay within int64
+RATE_SCALE = 10 ** 7
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def div_round(num, den, rounding: str = "half_even"):
+    """
+    num / den rounded to an integer, for non-negative ints or int arrays.
+
+    'half_even' rounds ties to the even neighbour (banker's rounding);
+    'half_up' rounds ties away from zero.
+    """
+    q = num // den
+    twice_rem = 2 * (num - q * den)
+    if rounding == "half_up":
+        return q + (twice_rem >= den) * 1
+    if rounding == "half_even":
+        return q + ((twice_rem > den) | ((twice_rem == den) & (q % 2 == 1))) * 1
+    raise ValueError(f"Unknown rounding mode: {rounding}")
+
+
+def to_cents(amount, rounding: str = "half_even"):
+    """
+    Dollar amounts (float or array) as integer cents.
+    """
+    scaled = np.asarray(amount, dtype=float) * 100
+    cents = np.rint(scaled) if rounding == "half_even" else np.floor(scaled + 0.5)
+    cents = cents.astype(np.int64)
+    return cents.item() if cents.ndim == 0 else cents
+
+
+def rate_units(annual_rate):
+    """
+    Annual rates as integers in units of 1 / RATE_SCALE.
+    """
+    units = np.rint(np.asarray(annual_rate, dtype=float) * RATE_SCALE).astype(np.int64)
+    return units.item() if units.ndim == 0 else units
+
+
+def _check_range(principal_cents, units) -> None:
+    if np.any(np.asarray(principal_cents) * np.asarray(units, dtype=float) >= _INT64_MAX):
+        raise ValueError("principal * rate is too large for exact int64 arithmetic")
+
+
+@traced("amortize_loan_cents")
+def amortize_loan_cents(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None,
+    rounding: str = "half_even"
+) -> Schedule:
+    """
+    Amortization schedule computed exactly in integer cents.
+
+    The level payment is the annuity payment rounded to the cent; each
+    period's interest is balance * rate / payments_per_year rounded to the
+    cent with the given rule ('half_even' or 'half_up'), principal is the
+    payment minus interest, and the final payment retires the remaining
+    balance. Every column is therefore a whole number of cents, each
+    balance equals the previous balance minus the printed principal, and
+    the principal column sums to the original principal exactly.
+
+    Returns:
+        Schedule in dollars (cents / 100) with the same columns as
+        amortize_loan.
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode: {rounding}")
+    n = years * payments_per_year
+    count("amortize_loan_cents.periods", n)
+    balance = to_cents(principal, rounding)
+    units = rate_units(annual_rate)
+    _check_range(balance, units)
+    den = payments_per_year * RATE_SCALE
+    payment = to_cents(level_payment(principal, annual_rate, years, payments_per_year), rounding)
+
+    payments, interests, principals, balances = [], [], [], []
+    with span("amortize_loan_cents.recurrence"):
+        for period in range(1, n + 1):
+            interest = div_round(balance * units, den, rounding)
+            principal_paid = min(payment - interest, balance)
+            # on last payment, retire whatever is left
+            if period == n:
+                principal_paid = balance
+            balance -= principal_paid
+
+            payments.append(interest + principal_paid)
+            interests.append(interest)
+            principals.append(principal_paid)
+            balances.append(balance)
+
+    dates = None
+    if first_payment_date:
+        dates = payment_dates(first_payment_date, payments_per_year, n)
+    return Schedule(
+        period=np.arange(1, n + 1),
+        payment=np.array(payments, dtype=np.int64) / 100,
+        interest=np.array(interests, dtype=np.int64) / 100,
+        principal=np.array(principals, dtype=np.int64) / 100,
+        balance=np.array(balances, dtype=np.int64) / 100,
+        dates=dates,
+    )
+
+
+@traced("amortize_portfolio_cents")
+def amortize_portfolio_cents(
+    principals,
+    rates,
+    years,
+    payments_per_year=12,
+    rounding: str = "half_even"
+) -> Dict[str, np.ndarray]:
+    """
+    Exact integer-cent schedules for many loans at once.
+
+    Same rules as amortize_loan_cents, evaluated for all loans per period
+    with int64 NumPy operations.
+
+    Returns:
+        Dict of int64 arrays in cents shaped (loans, max periods):
+          payment, interest, principal, balance,
+        plus mask and num_payments as in amortize_portfolio.
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode: {rounding}")
+    principals, rates, years, payments_per_year = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principals, dtype=float)),
+        np.asarray(rates, dtype=float),
+        np.asarray(years, dtype=np.int64),
+        np.asarray(payments_per_year, dtype=np.int64),
+    )
+    n = years * payments_per_year
+    num_loans = principals.shape[0]
+    max_periods = int(n.max()) if num_loans else 0
+    count("amortize_portfolio_cents.loans", num_loans)
+
+    balance = np.atleast_1d(to_cents(principals, rounding))
+    units = np.atleast_1d(rate_units(rates))
+    _check_range(balance, units)
+    den = payments_per_year * RATE_SCALE
+    level = np.atleast_1d(to_cents(level_payment(principals, rates, years, payments_per_year), rounding))
+
+    shape = (num_loans, max_periods)
+    payment = np.zeros(shape, dtype=np.int64)
+    interest = np.zeros(shape, dtype=np.int64)
+    principal_paid = np.zeros(shape, dtype=np.int64)
+    balance_out = np.zeros(shape, dtype=np.int64)
+    mask = np.arange(1, max_periods + 1) <= n[:, None]
+
+    with span("amortize_portfolio_cents.recurrence"):
+        for col in range(max_periods):
+            active = mask[:, col]
+            interest_t = div_round(balance * units, den, rounding)
+            principal_t = np.minimum(level - interest_t, balance)
+            # on last payment, retire whatever is left
+            principal_t = np.where(n == col + 1, balance, principal_t)
+            principal_t = np.where(active, principal_t, 0)
+            interest_t = np.where(active, interest_t, 0)
+            balance = balance - principal_t
+
+            payment[:, col] = interest_t + principal_t
+            interest[:, col] = interest_t
+            principal_paid[:, col] = principal_t
+            balance_out[:, col] = np.where(active, balance, 0)
+
+    return {
+        "payment": payment,
+        "interest": interest,
+        "principal": principal_paid,
+        "balance": balance_out,
+        "mask": mask,
+        "num_payments": n,
+    }
@@ -0,0 +1,392 @@
+# loan_amort/export.py
+
+import datetime
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO
+
+import numpy as np
+
+from loan_amort.schedule import Schedule
+
+FORMATS = ("table", "csv", "ndjson")
+FILE_FORMATS = FORMATS + ("xlsx", "columnar")
+CHUNK_ROWS = 4096  # rows formatted per write() call
+FIELDS = ("period", "payment", "interest", "principal", "balance")
+# output formats by file extension, for --output paths
+EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".xlsx": "xlsx",
+    ".lac": "columnar",
+}
+
+
+def _escape(text: str) -> str:
+    """
+    Escape &, < and > for XML text (as xml.sax.saxutils.escape, which
+    pulls in urllib on import).
+    """
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _table_header(with_dates: bool) -> str:
+    header = f"{'Period':>6} "
+    if with_dates:
+        header += f"{'Date':>12} "
+    header += f"{'Payment':>10} {'Interest':>10} {'Principal':>10} {'Balance':>12}"
+    return header + "\n"
+
+
+def _table_line(p: Dict[str, Any], with_dates: bool) -> str:
+    line = f"{p['period']:6d} "
+    if with_dates:
+        line += f"{p['date']:12s} "
+    line += (f"{p['payment']:10.2f} {p['interest']:10.2f} "
+             f"{p['principal']:10.2f} {p['balance']:12.2f}")
+    return line + "\n"
+
+
+def _csv_header(with_dates: bool) -> str:
+    fields = list(FIELDS)
+    if with_dates:
+        fields.insert(1, "date")
+    return ",".join(fields) + "\n"
+
+
+def _csv_line(p: Dict[str, Any], with_dates: bool) -> str:
+    line = f"{p['period']},"
+    if with_dates:
+        line += f"{p['date']},"
+    line += f"{p['payment']:.2f},{p['interest']:.2f},{p['principal']:.2f},{p['balance']:.2f}"
+    return line + "\n"
+
+
+def _ndjson_line(p: Dict[str, Any], with_dates: bool) -> str:
+    return json.dumps(p, separators=(",", ":")) + "\n"
+
+
+_WRITERS = {
+    "table": (_table_header, _table_line),
+    "csv": (_csv_header, _csv_line),
+    "ndjson": (None, _ndjson_line),
+}
+
+
+def write_schedule(
+    rows: Iterable[Dict[str, Any]],
+    out: TextIO,
+    fmt: str = "table",
+    with_dates: bool = False
+) -> int:
+    """
+    Stream schedule rows to a text stream in the given format.
+
+    Rows are consumed lazily and formatted in chunks of CHUNK_ROWS, each
+    written with a single write() call, so memory stays constant no matter
+    how long the schedule is.
+
+    Args:
+        rows: iterable of row dicts (e.g. from iter_amortization)
+        out: writable text stream
+        fmt: one of FORMATS
+        with_dates: whether the rows carry a 'date' field
+
+    Returns:
+        Number of rows written.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    header, line = _WRITERS[fmt]
+
+    if header:
+        out.write(header(with_dates))
+
+    count = 0
+    chunk = []
+    for p in rows:
+        chunk.append(line(p, with_dates))
+        if len(chunk) == CHUNK_ROWS:
+            out.write("".join(chunk))
+            count += len(chunk)
+            chunk.clear()
+    if chunk:
+        out.write("".join(chunk))
+        count += len(chunk)
+    out.flush()
+    return count
+
+
+def format_for_path(path: str, default: Optional[str] = None) -> str:
+    """
+    Output format implied by a file name's extension.
+    """
+    for ext, fmt in EXTENSIONS.items():
+        if path.lower().endswith(ext):
+            return fmt
+    if default is None:
+        raise ValueError(f"Cannot infer an output format from {path!r}; "
+                         f"use one of {', '.join(EXTENSIONS)}")
+    return default
+
+
+# ---------------------------------------------------------------------------
+# streaming XLSX
+
+XLSX_MAX_ROWS = 1048576   # Excel's row limit per sheet, header included
+XLSX_KINDS = ("text", "int", "money", "date")
+_EXCEL_EPOCH = datetime.date(1899, 12, 30)
+_STYLE = {"money": ' s="1"', "date": ' s="2"'}
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\
+<Default Extension="xml" ContentType="application/xml"/>\
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>\
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>\
+{sheets}</Types>"""
+_SHEET_TYPE = ('<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+               'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>\
+</Relationships>"""
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" \
+xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">\
+<sheets>{sheets}</sheets></workbook>"""
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\
+{sheets}<Relationship Id="rIdStyles" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>\
+</Relationships>"""
+# cell styles: 0 general, 1 money (#,##0.00), 2 date (built-in format 14)
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">\
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>\
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>\
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>\
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>\
+<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>\
+<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>\
+<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>\
+</styleSheet>"""
+_SHEET_HEAD = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+               '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+               '<sheetData>')
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _column_letters(i: int) -> str:
+    letters = ""
+    i += 1
+    while i:
+        i, rem = divmod(i - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+class XlsxWriter:
+    """
+    Write-only XLSX workbook streamed straight into the zip archive.
+
+    Rows are formatted into sheet XML and compressed as they arrive, so
+    memory stays constant however many rows are written. Strings are
+    stored inline (no shared-string table to hold in memory), and when a
+    sheet reaches Excel's row limit the writer continues on a new sheet
+    with the header repeated.
+
+    Args:
+        path: output file
+        columns: header names
+        kinds: one of XLSX_KINDS per column ('text', 'int', 'money' for
+               numbers shown with two decimals, 'date' for dates or
+               datetime64 values stored as Excel dates)
+        sheet_name: base name of the sheets
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], kinds: Sequence[str],
+                 sheet_name: str = "Schedule"):
+        if len(columns) != len(kinds) or not set(kinds) <= set(XLSX_KINDS):
+            raise ValueError(f"need one kind from {XLSX_KINDS} per column")
+        self.columns = list(columns)
+        self.kinds = list(kinds)
+        self.sheet_name = sheet_name
+        self.rows_written = 0
+        # sheet XML is highly repetitive, so the fastest deflate level costs
+        # little in size
+        import zipfile   # only workbook output needs it; keeps the CLI start-up light
+
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, allowZip64=True,
+                                    compresslevel=1)
+        self._letters = [_column_letters(i) for i in range(len(columns))]
+        self._sheets = 0
+        self._sheet = None
+        self._row = 0
+
+    def _open_sheet(self) -> None:
+        if self._sheet is not None:
+            self._sheet.write(_SHEET_TAIL.encode())
+            self._sheet.close()
+        self._sheets += 1
+        self._sheet = self._zip.open(f"xl/worksheets/sheet{self._sheets}.xml", "w", force_zip64=True)
+        self._sheet.write(_SHEET_HEAD.encode())
+        self._row = 0
+        self._write([self.columns], ["text"] * len(self.columns))
+
+    def _cell_template(self, i: int, kind: str) -> str:
+        ref = self._letters[i] + "{0}"
+        if kind == "text":
+            return f'<c r="{ref}" t="inlineStr"><is><t>{{{i + 1}}}</t></is></c>'
+        return f'<c r="{ref}"{_STYLE.get(kind, "")}><v>{{{i + 1}}}</v></c>'
+
+    @staticmethod
+    def _converter(kind: str):
+        if kind == "text":
+            return lambda v: _escape(str(v))
+        if kind == "date":
+            def serial(v):
+                if not isinstance(v, datetime.date):
+                    v = np.datetime64(v, "D").astype(datetime.date)
+                return (v - _EXCEL_EPOCH).days
+            return serial
+        return repr
+
+    def _write(self, rows: List[Sequence[Any]], kinds: Sequence[str]) -> None:
+        # one str.format per row; rows with empty (None) cells take the slow path
+        cells = [self._cell_template(i, k) for i, k in enumerate(kinds)]
+        template = '<row r="{0}">' + "".join(cells) + "</row>"
+        converters = [self._converter(k) for k in kinds]
+        parts = []
+        for values in rows:
+            self._row += 1
+            r = self._row
+            if None in values:
+                parts.append(f'<row r="{r}">' + "".join(
+                    cell.format(r, *([""] * i), f(v))
+                    for i, (cell, f, v) in enumerate(zip(cells, converters, values))
+                    if v is not None
+                ) + "</row>")
+            else:
+                parts.append(template.format(r, *[f(v) for f, v in zip(converters, values)]))
+        self._sheet.write("".join(parts).encode())
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        """
+        Append rows (sequences in column order); returns the number written.
+        """
+        count = 0
+        chunk = []
+        for values in rows:
+            if self._sheet is None or self._row + len(chunk) >= XLSX_MAX_ROWS:
+                if chunk:
+                    self._write(chunk, self.kinds)
+                    chunk = []
+                self._open_sheet()
+            chunk.append(values)
+            count += 1
+            if len(chunk) == CHUNK_ROWS:
+                self._write(chunk, self.kinds)
+                chunk = []
+        if chunk:
+            self._write(chunk, self.kinds)
+        self.rows_written += count
+        return count
+
+    def close(self) -> None:
+        """
+        Finish the last sheet and write the workbook parts.
+        """
+        if self._zip is None:
+            return
+        if self._sheet is None:
+            self._open_sheet()
+        self._sheet.write(_SHEET_TAIL.encode())
+        self._sheet.close()
+
+        indices = range(1, self._sheets + 1)
+        names = [self.sheet_name if i == 1 else f"{self.sheet_name} {i}" for i in indices]
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES.format(
+            sheets="".join(_SHEET_TYPE.format(i=i) for i in indices)))
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            f'<sheet name="{_escape(n)}" sheetId="{i}" r:id="rId{i}"/>' for i, n in zip(indices, names))))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(sheets="".join(
+            f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/'
+            f'2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>' for i in indices)))
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+        self._zip = None
+
+    def __enter__(self) -> "XlsxWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def schedule_xlsx_columns(with_dates: bool, with_loan_id: bool = False):
+    """
+    (columns, kinds) of a schedule sheet.
+    """
+    columns = list(FIELDS)
+    kinds = ["int", "money", "money", "money", "money"]
+    if with_dates:
+        columns.insert(1, "date")
+        kinds.insert(1, "date")
+    if with_loan_id:
+        columns.insert(0, "loan_id")
+        kinds.insert(0, "text")
+    return columns, kinds
+
+
+def schedule_tuples(
+    schedule: Schedule,
+    loan_id: Optional[str] = None,
+    with_dates: Optional[bool] = None
+) -> Iterable[tuple]:
+    """
+    Rows of a Schedule as tuples in schedule_xlsx_columns order.
+
+    with_dates forces a date column (empty for undated schedules); by
+    default there is one only if the schedule has dates.
+    """
+    if with_dates is None:
+        with_dates = schedule.dates is not None
+    columns = [schedule.period.tolist()]
+    if with_dates:
+        if schedule.dates is None:
+            columns.append([None] * len(schedule))
+        else:
+            columns.append(schedule.dates.astype(datetime.date).tolist())
+    columns += [getattr(schedule, f).tolist() for f in FIELDS[1:]]
+    rows = zip(*columns)
+    if loan_id is None:
+        return rows
+    return ((loan_id,) + row for row in rows)
+
+
+def write_schedule_xlsx(schedule: Schedule, path: str) -> int:
+    """
+    Write one schedule to an .xlsx workbook; returns the number of rows.
+    """
+    with XlsxWriter(path, *schedule_xlsx_columns(schedule.dates is not None)) as xlsx:
+        return xlsx.write_rows(schedule_tuples(schedule))
+
+
+def export_schedule(schedule: Schedule, path: str, fmt: Optional[str] = None) -> int:
+    """
+    Write a schedule to a file in any of FILE_FORMATS (default: from the
+    extension); a columnar file holds it as loan "1". Returns rows written.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt == "xlsx":
+        return write_schedule_xlsx(schedule, path)
+    if fmt == "columnar":
+        from loan_amort.columnar import write_columnar
+
+        write_columnar([("1", schedule)], path)
+        return len(schedule)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    with open(path, "w", newline="") as out:
+        return write_schedule(schedule, out, fmt, with_dates=schedule.dates is not None)
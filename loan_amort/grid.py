@@ -0,0 +1,90 @@
+# loan_amort/grid.py
+
+from typing import Dict, TextIO
+import numpy as np
+
+from loan_amort.analytic import interest_between, level_payment
+from loan_amort.export import CHUNK_ROWS
+from loan_amort.profiling import count, traced
+
+AXES = ("principal", "rate", "years")
+GRID_METRICS = (
+    "payment", "total_payment", "total_interest", "first_year_interest", "interest_ratio",
+)
+
+
+@traced("evaluate_grid")
+def evaluate_grid(
+    principals,
+    rates,
+    years,
+    payments_per_year: int = 12
+) -> Dict[str, np.ndarray]:
+    """
+    Loan metrics for every principal x rate x term combination at once.
+
+    The three axes are broadcast against each other into a (principals,
+    rates, years) grid and every metric comes from the annuity formula in
+    one NumPy pass; no schedule rows are generated.
+
+    Returns:
+        Dict with the 1-D axes principal, rate, years and 3-D arrays:
+          - payment: level periodic payment
+          - total_payment, total_interest: over the full term
+          - first_year_interest: interest paid in the first year
+          - interest_ratio: total_interest / principal
+
+    Raises:
+        ValueError: if a term or payments_per_year is not positive
+    """
+    principals = np.atleast_1d(np.asarray(principals, dtype=float))
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    years = np.atleast_1d(np.asarray(years, dtype=np.int64))
+    if (years <= 0).any() or payments_per_year <= 0:
+        raise ValueError("terms and payments_per_year must be positive")
+    p = principals[:, None, None]
+    r = rates[None, :, None]
+    y = years[None, None, :]
+    count("evaluate_grid.cells", principals.size * rates.size * years.size)
+
+    n = y * payments_per_year
+    payment = np.broadcast_to(level_payment(p, r, y, payments_per_year), (p.size, r.size, y.size))
+    total_payment = payment * n
+    total_interest = total_payment - p
+    return {
+        "principal": principals,
+        "rate": rates,
+        "years": years,
+        "payment": payment,
+        "total_payment": total_payment,
+        "total_interest": total_interest,
+        "first_year_interest": np.broadcast_to(
+            interest_between(1, payments_per_year, p, r, y, payments_per_year), payment.shape),
+        "interest_ratio": total_interest / p,
+    }
+
+
+def write_grid_csv(grid: Dict[str, np.ndarray], out: TextIO) -> int:
+    """
+    Stream a grid as CSV, one row per cell (principal varies slowest).
+
+    Returns:
+        Number of rows written.
+    """
+    out.write(",".join(AXES + GRID_METRICS) + "\n")
+    shape = grid["payment"].shape
+    p, r, y = (a.ravel() for a in np.meshgrid(grid["principal"], grid["rate"], grid["years"],
+                                               indexing="ij"))
+    metrics = [np.asarray(grid[m]).reshape(-1) for m in GRID_METRICS]
+    total = int(np.prod(shape))
+    for start in range(0, total, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, total)
+        lines = [
+            f"{pi:.2f},{ri:.6g},{yi},{pay:.2f},{tp:.2f},{ti:.2f},{fy:.2f},{ratio:.6f}\n"
+            for pi, ri, yi, pay, tp, ti, fy, ratio in zip(
+                p[start:stop].tolist(), r[start:stop].tolist(), y[start:stop].tolist(),
+                *(m[start:stop].tolist() for m in metrics))
+        ]
+        out.write("".join(lines))
+    out.flush()
+    return total
@@ -0,0 +1,103 @@
+# loan_amort/loadgen.py
+
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from loan_amort.serve import DEFAULT_HOST, DEFAULT_PORT
+
+
+def _payloads(count: int, seed: int = 0) -> List[bytes]:
+    """
+    Request bodies for random single-loan requests.
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        json.dumps({
+            "principal": round(float(p), 2),
+            "rate": round(float(r), 4),
+            "years": int(y),
+            "first_date": "2025-01-01",
+        }).encode()
+        for p, r, y in zip(rng.uniform(50_000, 750_000, count),
+                           rng.uniform(0.02, 0.09, count),
+                           rng.choice([10, 15, 20, 30], count))
+    ]
+
+
+async def _client(host: str, port: int, path: str, bodies: List[bytes],
+                  latencies: List[float], errors: List[int]) -> None:
+    """
+    One keep-alive connection sending its share of the requests in turn.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def run_load(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    endpoint: str = "metrics",
+    requests: int = 10000,
+    concurrency: int = 64,
+    seed: int = 0
+) -> Dict[str, float]:
+    """
+    Drive a running `loan_amort serve` with concurrent single-loan requests.
+
+    Returns:
+        A dict with requests, errors, seconds, requests_per_s and latency
+        percentiles p50_ms, p90_ms, p99_ms, max_ms.
+    """
+    bodies = _payloads(requests, seed)
+    latencies: List[float] = []
+    errors: List[int] = []
+
+    async def main():
+        await asyncio.gather(*(
+            _client(host, port, "/" + endpoint, bodies[i::concurrency], latencies, errors)
+            for i in range(min(concurrency, requests))
+        ))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1e3
+    p50, p90, p99 = np.percentile(lat, (50, 90, 99)) if len(lat) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(lat.max()), 3) if len(lat) else 0.0,
+    }
@@ -1,13 +1,15 @@
-from typing import List, Dict
+from typing import Dict
 
-def compute_loan_metrics(
-    schedule: List[Dict[str, float]]
-) -> Dict[str, float]:
+from loan_amort.profiling import traced
+from loan_amort.schedule import as_schedule
+
+@traced("compute_loan_metrics")
+def compute_loan_metrics(schedule) -> Dict[str, float]:
     """
     Compute summary metrics from an amortization schedule.
 
     Args:
-        schedule: list of payment records, each with keys
+        schedule: a Schedule, or a list of payment records each with keys
                   'period', 'payment', 'interest', 'principal', 'balance'
 
     Returns:
@@ -18,10 +20,11 @@ def compute_loan_metrics(
           - total_principal: sum of all principal repaid
           - average_payment: total_payment / num_payments
     """
+    schedule = as_schedule(schedule)
     num_payments = len(schedule)
-    total_interest = sum(p['interest']   for p in schedule)
-    total_principal = sum(p['principal'] for p in schedule)
-    total_payment = sum(p['payment']     for p in schedule)
+    total_interest = float(schedule.interest.sum())
+    total_principal = float(schedule.principal.sum())
+    total_payment = float(schedule.payment.sum())
     average_payment = total_payment / num_payments if num_payments else 0.0
 
     return {
@@ -31,4 +34,3 @@ def compute_loan_metrics(
         "total_principal": round(total_principal, 2),
         "average_payment": round(average_payment, 2),
     }
-
@@ -0,0 +1,83 @@
+# loan_amort/paydates.py
+
+import datetime
+from functools import lru_cache
+import numpy as np
+
+# frequencies that step by a fixed number of days
+DAY_STEPS = {
+    26: 14,   # bi-weekly
+    52: 7,    # weekly
+    365: 1,   # daily
+}
+SEMI_MONTHLY = 24
+CALENDAR_CACHE_SIZE = 1024
+
+
+def supports_frequency(payments_per_year: int) -> bool:
+    """
+    Whether payment_dates can build a calendar for this frequency.
+    """
+    return (
+        payments_per_year in DAY_STEPS
+        or payments_per_year == SEMI_MONTHLY
+        or (payments_per_year > 0 and 12 % payments_per_year == 0)
+    )
+
+
+def _add_months(first: np.datetime64, offsets: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """
+    Dates on the given day of the month `offsets` months after `first`,
+    clamped to the last day of shorter months.
+    """
+    months = first.astype("datetime64[M]") + offsets
+    starts = months.astype("datetime64[D]")
+    month_len = ((months + 1).astype("datetime64[D]") - starts).astype(np.int64)
+    return starts + (np.minimum(days, month_len) - 1)
+
+
+def _build_dates(first_date: datetime.date, payments_per_year: int, n: int) -> np.ndarray:
+    first = np.datetime64(first_date, "D")
+    i = np.arange(n, dtype=np.int64)
+    day = first_date.day
+
+    if payments_per_year in DAY_STEPS:
+        return first + i * DAY_STEPS[payments_per_year]
+
+    if payments_per_year == SEMI_MONTHLY:
+        # two payments a month, 15 days apart: the 1st and 16th, the 10th
+        # and 25th, ...; a first date after the 15th pairs with day - 15 of
+        # the following month
+        second = i % 2 == 1
+        if day <= 15:
+            offsets = i // 2
+            days = np.where(second, day + 15, day)
+        else:
+            offsets = i // 2 + second
+            days = np.where(second, day - 15, day)
+        return _add_months(first, offsets, days)
+
+    if payments_per_year > 0 and 12 % payments_per_year == 0:
+        offsets = i * (12 // payments_per_year)
+        return _add_months(first, offsets, np.full(n, day))
+
+    raise ValueError(
+        f"Unsupported payment frequency for dates: {payments_per_year} per year"
+    )
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def payment_dates(first_date: datetime.date, payments_per_year: int, n: int) -> np.ndarray:
+    """
+    Payment dates for n periods as a read-only datetime64[D] array.
+
+    Supports any frequency dividing 12 (monthly, bi-monthly, quarterly,
+    semi-annual, annual), semi-monthly (24), bi-weekly (26), weekly (52)
+    and daily (365). Month-based dates keep the first date's day of month,
+    clamped to the end of shorter months. Results are memoized on
+    (first_date, payments_per_year, n), so loans sharing a calendar share
+    one array.
+    """
+    dates = _build_dates(first_date, payments_per_year, n)
+    dates.flags.writeable = False
+    return dates
@@ -1,18 +1,22 @@
 # loan_amort/plots.py
 
-from typing import List, Dict, Any
-import itertools
+from typing import List, Dict, Any, Optional, Union
 import datetime
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import matplotlib.ticker as mtick
 import numpy as np
 
+from loan_amort.profiling import traced
+from loan_amort.schedule import Schedule, as_schedule
+
 # Styling constants
 MINT_BBOX = dict(facecolor="#AAF0D1", edgecolor="black")
 DARK_BLUE = "#1f77b4"
 DARK_RED = "#d62728"
 YEAR_INTERVAL = 5  # show tick every 5 years
+NON_GUI_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
 
 
 def _configure_year_axis(ax, dates: List[datetime.date]) -> None:
@@ -26,15 +30,151 @@ def _configure_year_axis(ax, dates: List[datetime.date]) -> None:
     plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 
 
-def plot_balance_line(schedule: List[Dict[str, Any]]) -> plt.Figure:
+def is_headless() -> bool:
+    """
+    True when the active matplotlib backend cannot show windows.
+    """
+    return matplotlib.get_backend().lower() in NON_GUI_BACKENDS
+
+
+def _figure(ax=None):
+    """
+    A fresh figure and axes, or the given axes cleared for reuse.
+    """
+    if ax is None:
+        return plt.subplots()
+    ax.clear()
+    return ax.figure, ax
+
+
+def _dates(schedule: Schedule) -> np.ndarray:
+    """
+    Payment dates of a schedule as datetime64[D]; plots require dates.
+    """
+    if schedule.dates is None:
+        raise ValueError("schedule has no payment dates; pass a first payment date")
+    return schedule.dates
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-triangle-three-buckets downsampling.
+
+    Returns the indices of n_out points (always including the first and
+    last) that preserve the visual shape of the (x, y) series.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[nlo:nhi].mean()
+        cy = y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _downsample(xs: np.ndarray, series, max_points: Optional[int]) -> np.ndarray:
+    """
+    Indices to draw: the union of LTTB picks for each series.
+    """
+    if not max_points or len(xs) <= max_points:
+        return np.arange(len(xs))
+    per_series = max(max_points // len(series), 3)
+    return np.unique(np.concatenate([lttb_indices(xs, y, per_series) for y in series]))
+
+
+def _nearest_index(xs: np.ndarray, x: float) -> int:
+    """
+    Index of the value in sorted xs closest to x, by bisection.
+    """
+    i = int(np.searchsorted(xs, x))
+    if i <= 0:
+        return 0
+    if i >= len(xs):
+        return len(xs) - 1
+    return i if xs[i] - x < x - xs[i - 1] else i - 1
+
+
+def _connect_hover(fig, ax, xs: np.ndarray, artists, update) -> None:
+    """
+    Wire a motion handler that snaps to the nearest point of xs.
+
+    update(idx) repositions the hover artists. When the canvas supports
+    blitting, the static chart is cached after each full draw and only the
+    hover artists are redrawn on mouse motion.
+    """
+    canvas = fig.canvas
+    blit = getattr(canvas, "supports_blit", False)
+    state = {"background": None, "idx": None}
+    for a in artists:
+        a.set_animated(blit)
+
+    def on_draw(event):
+        state["background"] = canvas.copy_from_bbox(fig.bbox)
+        for a in artists:
+            if a.get_visible():
+                ax.draw_artist(a)
+
+    def on_move(event):
+        if event.inaxes != ax or event.xdata is None:
+            return
+        idx = _nearest_index(xs, event.xdata)
+        if idx == state["idx"]:
+            return
+        state["idx"] = idx
+        update(idx)
+        for a in artists:
+            a.set_visible(True)
+        if blit and state["background"] is not None:
+            canvas.restore_region(state["background"])
+            for a in artists:
+                ax.draw_artist(a)
+            canvas.blit(fig.bbox)
+        else:
+            canvas.draw_idle()
+
+    if blit:
+        canvas.mpl_connect('draw_event', on_draw)
+    canvas.mpl_connect('motion_notify_event', on_move)
+
+
+@traced("plot.balance_line")
+def plot_balance_line(
+    schedule: Union[Schedule, List[Dict[str, Any]]],
+    max_points: Optional[int] = None,
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
     """
     Line chart of remaining loan balance over time with currency formatting.
+
+    With max_points, the drawn line is LTTB-downsampled; hover values
+    always come from the full-resolution schedule. Pass ax to draw into an
+    existing (cleared) axes; hover wiring is skipped when interactive is
+    False, or by default on non-GUI backends.
     """
-    dates = [datetime.date.fromisoformat(p['date']) if isinstance(p.get('date'), str) else p.get('date') for p in schedule]
-    balances = [p['balance'] for p in schedule]
+    schedule = as_schedule(schedule)
+    dates = _dates(schedule)
+    xs = mdates.date2num(dates)
+    balances = schedule.balance
+    drawn = _downsample(xs, [balances], max_points)
 
-    fig, ax = plt.subplots()
-    ax.plot(dates, balances, color=DARK_BLUE, label='Balance')
+    fig, ax = _figure(ax)
+    ax.plot(dates[drawn], balances[drawn], color=DARK_BLUE, label='Balance')
     ax.set_xlabel('Year')
     ax.set_ylabel('Remaining Balance (USD)')
     ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:,.2f}'))
@@ -42,40 +182,45 @@ def plot_balance_line(schedule: List[Dict[str, Any]]) -> plt.Figure:
     ax.grid(True)
     ax.legend()
     _configure_year_axis(ax, dates)
+    if interactive is False or (interactive is None and is_headless()):
+        return fig
 
     marker, = ax.plot([], [], 'o', color='black', markersize=8)
     annot = ax.annotate('', xy=(0,0), xytext=(15,15), textcoords='offset points', bbox=MINT_BBOX)
     annot.set_visible(False)
 
-    def on_move(event):
-        if event.inaxes != ax or event.xdata is None:
-            return
-        xdate = mdates.num2date(event.xdata).date()
-        idx = min(range(len(dates)), key=lambda i: abs((dates[i] - xdate).days))
-        xpt = dates[idx]
+    def update(idx):
+        xpt = xs[idx]
         ypt = balances[idx]
-        marker.set_data([xpt], [ypt]); marker.set_visible(True)
+        marker.set_data([xpt], [ypt])
         annot.xy = (xpt, ypt)
         # Full date shown
-        annot.set_text(f"Date: {xpt.isoformat()}\nBalance: ${ypt:,.2f}")
-        annot.set_visible(True)
-        fig.canvas.draw_idle()
+        annot.set_text(f"Date: {dates[idx]}\nBalance: ${ypt:,.2f}")
 
-    fig.canvas.mpl_connect('motion_notify_event', on_move)
+    _connect_hover(fig, ax, xs, [marker, annot], update)
     return fig
 
 
-def plot_interest_principal_line(schedule: List[Dict[str, Any]]) -> plt.Figure:
+@traced("plot.interest_line")
+def plot_interest_principal_line(
+    schedule: Union[Schedule, List[Dict[str, Any]]],
+    max_points: Optional[int] = None,
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
     """
     Line chart of interest vs principal with currency formatting.
     """
-    dates = [datetime.date.fromisoformat(p['date']) if isinstance(p.get('date'), str) else p.get('date') for p in schedule]
-    interests = [p['interest'] for p in schedule]
-    principals = [p['principal'] for p in schedule]
+    schedule = as_schedule(schedule)
+    dates = _dates(schedule)
+    xs = mdates.date2num(dates)
+    interests = schedule.interest
+    principals = schedule.principal
+    drawn = _downsample(xs, [interests, principals], max_points)
 
-    fig, ax = plt.subplots()
-    ax.plot(dates, interests, color=DARK_RED, label='Interest')
-    ax.plot(dates, principals, color=DARK_BLUE, label='Principal')
+    fig, ax = _figure(ax)
+    ax.plot(dates[drawn], interests[drawn], color=DARK_RED, label='Interest')
+    ax.plot(dates[drawn], principals[drawn], color=DARK_BLUE, label='Principal')
     ax.set_xlabel('Year')
     ax.set_ylabel('Amount (USD)')
     ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:,.2f}'))
@@ -83,44 +228,49 @@ def plot_interest_principal_line(schedule: List[Dict[str, Any]]) -> plt.Figure:
     ax.grid(True)
     ax.legend()
     _configure_year_axis(ax, dates)
+    if interactive is False or (interactive is None and is_headless()):
+        return fig
 
     marker_i, = ax.plot([], [], 'o', color=DARK_RED, markersize=6)
     marker_p, = ax.plot([], [], 'o', color=DARK_BLUE, markersize=6)
     annot = ax.annotate('', xy=(0,0), xytext=(15,15), textcoords='offset points', bbox=MINT_BBOX)
     annot.set_visible(False)
 
-    def on_move(event):
-        if event.inaxes != ax or event.xdata is None:
-            return
-        xdate = mdates.num2date(event.xdata).date()
-        idx = min(range(len(dates)), key=lambda i: abs((dates[i] - xdate).days))
-        xpt = dates[idx]
+    def update(idx):
+        xpt = xs[idx]
         yi = interests[idx]
         yp = principals[idx]
-        marker_i.set_data([xpt], [yi]); marker_i.set_visible(True)
-        marker_p.set_data([xpt], [yp]); marker_p.set_visible(True)
+        marker_i.set_data([xpt], [yi])
+        marker_p.set_data([xpt], [yp])
         ytop = max(yi, yp)
         annot.xy = (xpt, ytop)
         # Full date shown
-        annot.set_text(f"Date: {xpt.isoformat()}\nInterest: ${yi:,.2f}\nPrincipal: ${yp:,.2f}")
-        annot.set_visible(True)
-        fig.canvas.draw_idle()
+        annot.set_text(f"Date: {dates[idx]}\nInterest: ${yi:,.2f}\nPrincipal: ${yp:,.2f}")
 
-    fig.canvas.mpl_connect('motion_notify_event', on_move)
+    _connect_hover(fig, ax, xs, [marker_i, marker_p, annot], update)
     return fig
 
 
-def plot_cumulative_line(schedule: List[Dict[str, Any]]) -> plt.Figure:
+@traced("plot.cumulative_line")
+def plot_cumulative_line(
+    schedule: Union[Schedule, List[Dict[str, Any]]],
+    max_points: Optional[int] = None,
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
     """
     Line chart of cumulative interest vs principal with currency formatting, matching interest/principal style.
     """
-    dates = [datetime.date.fromisoformat(p['date']) if isinstance(p.get('date'), str) else p.get('date') for p in schedule]
-    cum_int = list(itertools.accumulate(p['interest'] for p in schedule))
-    cum_pr = list(itertools.accumulate(p['principal'] for p in schedule))
+    schedule = as_schedule(schedule)
+    dates = _dates(schedule)
+    xs = mdates.date2num(dates)
+    cum_int = np.cumsum(schedule.interest)
+    cum_pr = np.cumsum(schedule.principal)
+    drawn = _downsample(xs, [cum_int, cum_pr], max_points)
 
-    fig, ax = plt.subplots()
-    ax.plot(dates, cum_int, color=DARK_RED, label='Cumulative Interest')
-    ax.plot(dates, cum_pr, color=DARK_BLUE, label='Cumulative Principal')
+    fig, ax = _figure(ax)
+    ax.plot(dates[drawn], cum_int[drawn], color=DARK_RED, label='Cumulative Interest')
+    ax.plot(dates[drawn], cum_pr[drawn], color=DARK_BLUE, label='Cumulative Principal')
     ax.set_xlabel('Year')
     ax.set_ylabel('Cumulative Amount (USD)')
     ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:,.2f}'))
@@ -128,38 +278,40 @@ def plot_cumulative_line(schedule: List[Dict[str, Any]]) -> plt.Figure:
     ax.grid(True)
     ax.legend()
     _configure_year_axis(ax, dates)
+    if interactive is False or (interactive is None and is_headless()):
+        return fig
 
     marker_i, = ax.plot([], [], 'o', color=DARK_RED, markersize=6)
     marker_p, = ax.plot([], [], 'o', color=DARK_BLUE, markersize=6)
     annot = ax.annotate('', xy=(0,0), xytext=(15,15), textcoords='offset points', bbox=MINT_BBOX)
     annot.set_visible(False)
 
-    def on_move(event):
-        if event.inaxes != ax or event.xdata is None:
-            return
-        xdate = mdates.num2date(event.xdata).date()
-        idx = min(range(len(dates)), key=lambda i: abs((dates[i] - xdate).days))
-        xpt = dates[idx]
+    def update(idx):
+        xpt = xs[idx]
         yi = cum_int[idx]
         yp = cum_pr[idx]
-        marker_i.set_data([xpt], [yi]); marker_i.set_visible(True)
-        marker_p.set_data([xpt], [yp]); marker_p.set_visible(True)
+        marker_i.set_data([xpt], [yi])
+        marker_p.set_data([xpt], [yp])
         ytop = max(yi, yp)
         annot.xy = (xpt, ytop)
         # Full date shown
-        annot.set_text(f"Date: {xpt.isoformat()}\nCumulative Interest: ${yi:,.2f}\nCumulative Principal: ${yp:,.2f}")
-        annot.set_visible(True)
-        fig.canvas.draw_idle()
+        annot.set_text(f"Date: {dates[idx]}\nCumulative Interest: ${yi:,.2f}\nCumulative Principal: ${yp:,.2f}")
 
-    fig.canvas.mpl_connect('motion_notify_event', on_move)
+    _connect_hover(fig, ax, xs, [marker_i, marker_p, annot], update)
     return fig
 
 # Remaining bar plots unchanged
 
-def plot_balance_bar(schedule: List[Dict[str, Any]]) -> plt.Figure:
-    dates = [datetime.date.fromisoformat(p['date']) if isinstance(p.get('date'), str) else p.get('date') for p in schedule]
-    balances = [p['balance'] for p in schedule]
-    fig, ax = plt.subplots()
+@traced("plot.balance_bar")
+def plot_balance_bar(
+    schedule: Union[Schedule, List[Dict[str, Any]]],
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
+    schedule = as_schedule(schedule)
+    dates = _dates(schedule)
+    balances = schedule.balance
+    fig, ax = _figure(ax)
     ax.bar(dates, balances, color=DARK_BLUE)
     ax.set_xlabel('Year')
     ax.set_ylabel('Balance (USD)')
@@ -170,11 +322,17 @@ def plot_balance_bar(schedule: List[Dict[str, Any]]) -> plt.Figure:
     return fig
 
 
-def plot_interest_principal_stacked(schedule: List[Dict[str, Any]]) -> plt.Figure:
-    dates = [datetime.date.fromisoformat(p['date']) if isinstance(p.get('date'), str) else p.get('date') for p in schedule]
-    interests = [p['interest'] for p in schedule]
-    principals = [p['principal'] for p in schedule]
-    fig, ax = plt.subplots()
+@traced("plot.interest_stacked")
+def plot_interest_principal_stacked(
+    schedule: Union[Schedule, List[Dict[str, Any]]],
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
+    schedule = as_schedule(schedule)
+    dates = _dates(schedule)
+    interests = schedule.interest
+    principals = schedule.principal
+    fig, ax = _figure(ax)
     dates_num = mdates.date2num(dates)
     width = float(np.min(np.diff(dates_num))) * 0.8 if len(dates_num) > 1 else 0.8
     ax.bar(dates, interests, label='Interest', color=DARK_RED, width=width)
@@ -189,3 +347,82 @@ def plot_interest_principal_stacked(schedule: List[Dict[str, Any]]) -> plt.Figur
     fig.tight_layout()
     return fig
 
+
+@traced("plot.pool_cash_flows")
+def plot_pool_cash_flows(
+    schedule: Union[Schedule, List[Dict[str, Any]]],
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
+    """
+    Stacked monthly interest and principal bars with the outstanding
+    balance on a second axis, for aggregated pool cash flows
+    (PoolCashFlows.to_schedule()); works for a single loan too.
+    """
+    schedule = as_schedule(schedule)
+    dates = _dates(schedule)
+    interests = schedule.interest
+    principals = schedule.principal
+    fig, ax = _figure(ax)
+    dates_num = mdates.date2num(dates)
+    width = float(np.min(np.diff(dates_num))) * 0.8 if len(dates_num) > 1 else 0.8
+    ax.bar(dates, interests, label='Interest', color=DARK_RED, width=width)
+    ax.bar(dates, principals, bottom=interests, label='Principal', color=DARK_BLUE, width=width)
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Cash Flow (USD)')
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:,.2f}'))
+    ax.set_title('Pool Cash Flows')
+    ax.grid(True, axis='y')
+
+    ax_bal = ax.twinx()
+    ax_bal.plot(dates, schedule.balance, color='black', label='Pool Balance')
+    ax_bal.set_ylabel('Pool Balance (USD)')
+    ax_bal.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:,.0f}'))
+    handles, labels = ax.get_legend_handles_labels()
+    handles_b, labels_b = ax_bal.get_legend_handles_labels()
+    ax.legend(handles + handles_b, labels + labels_b)
+    _configure_year_axis(ax, dates)
+    fig.tight_layout()
+    return fig
+
+
+@traced("plot.grid_heatmap")
+def plot_grid_heatmap(
+    grid: Dict[str, np.ndarray],
+    metric: str = "payment",
+    years: Optional[int] = None,
+    ax=None,
+    interactive: Optional[bool] = None
+) -> plt.Figure:
+    """
+    Heatmap of one metric from evaluate_grid over rate (x) and principal
+    (y) for a single term (default: the first term in the grid).
+    """
+    terms = list(np.asarray(grid["years"]).tolist())
+    if years is None:
+        years = terms[0]
+    if years not in terms:
+        raise ValueError(f"term {years} is not in the grid (have {terms})")
+    values = np.asarray(grid[metric])[:, :, terms.index(years)]
+
+    fig, ax = _figure(ax)
+    mesh = ax.pcolormesh(grid["rate"], grid["principal"], values, shading="nearest", cmap="viridis")
+    label = metric.replace("_", " ").title()
+    money = metric != "interest_ratio"
+    bar = fig.colorbar(mesh, ax=ax, format=mtick.StrMethodFormatter('${x:,.0f}') if money else None)
+    bar.set_label(f"{label} (USD)" if money else label)
+    ax.set_xlabel('Annual Rate')
+    ax.set_ylabel('Principal (USD)')
+    ax.xaxis.set_major_formatter(mtick.PercentFormatter(1.0))
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:,.0f}'))
+    ax.set_title(f'{label} by Rate and Principal ({years}-Year Term)')
+    fig.tight_layout()
+    return fig
+
+
+CHARTS = {
+    "balance_line": plot_balance_line,
+    "interest_line": plot_interest_principal_line,
+    "interest_stacked": plot_interest_principal_stacked,
+    "cumulative_line": plot_cumulative_line,
+}
@@ -0,0 +1,251 @@
+# loan_amort/pool.py
+
+import datetime
+from typing import Any, Dict, Iterable, Optional
+import numpy as np
+
+from loan_amort.amort import amortize_portfolio
+from loan_amort.batch import _chunks
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count, span, traced
+from loan_amort.schedule import Schedule, as_schedule
+
+
+def _month_index(dates: np.ndarray) -> np.ndarray:
+    """
+    Months since 1970-01 for datetime64 dates.
+    """
+    return np.asarray(dates).astype("datetime64[M]").astype(np.int64)
+
+
+class PoolCashFlows:
+    """
+    Projected cash flows of a loan pool, bucketed by calendar month.
+
+    Loans are added one schedule at a time (add_schedule), as columnar
+    portfolio arrays (add_portfolio) or streamed from a tape (add_loans).
+    Each call scatter-adds its interest and principal into the monthly
+    buckets with np.bincount, and only a few running sums are kept per
+    loan, so memory grows with the number of months spanned, not with the
+    number of loans.
+    """
+
+    __slots__ = (
+        "interest", "principal", "num_loans",
+        "_origin", "_total_principal", "_rate_weighted", "_term_weighted",
+    )
+
+    def __init__(self):
+        self.interest = np.zeros(0)
+        self.principal = np.zeros(0)
+        self.num_loans = 0
+        self._origin = 0            # month index of the first bucket
+        self._total_principal = 0.0
+        self._rate_weighted = 0.0   # sum of principal * annual rate
+        self._term_weighted = 0.0   # sum of principal * term in months
+
+    def _accumulate(self, months: np.ndarray, interest: np.ndarray, principal: np.ndarray) -> None:
+        """
+        Scatter-add flat (month, interest, principal) triples into the buckets.
+        """
+        if not len(months):
+            return
+        lo, hi = int(months.min()), int(months.max())
+        if not len(self.interest):
+            self._origin = lo
+        # widen the bucket range to cover [lo, hi]
+        front = max(self._origin - lo, 0)
+        back = max(hi - (self._origin + len(self.interest) - 1), 0)
+        if front or back:
+            self.interest = np.pad(self.interest, (front, back))
+            self.principal = np.pad(self.principal, (front, back))
+            self._origin -= front
+
+        idx = months - self._origin
+        size = len(self.interest)
+        self.interest += np.bincount(idx, weights=interest, minlength=size)
+        self.principal += np.bincount(idx, weights=principal, minlength=size)
+
+    def _add_terms(self, principal, rate, term_months) -> None:
+        principal = np.asarray(principal, dtype=float)
+        self.num_loans += principal.size
+        self._total_principal += float(principal.sum())
+        self._rate_weighted += float((principal * rate).sum())
+        self._term_weighted += float((principal * term_months).sum())
+
+    def add_schedule(
+        self,
+        schedule,
+        annual_rate: float,
+        payments_per_year: int = 12,
+        principal: Optional[float] = None
+    ) -> None:
+        """
+        Add one loan's dated schedule (a Schedule or list of row dicts).
+
+        The loan's original principal defaults to the opening balance
+        rebuilt from the first row; pass `principal` when it is known.
+        """
+        schedule = as_schedule(schedule)
+        if schedule.dates is None:
+            raise ValueError("schedule has no payment dates; pass a first payment date")
+        months = _month_index(schedule.dates)
+        self._accumulate(months, schedule.interest, schedule.principal)
+        term = len(schedule) * 12 / payments_per_year
+        if principal is None:
+            principal = schedule.balance[0] + schedule.principal[0] if len(schedule) else 0.0
+        self._add_terms(principal, annual_rate, term)
+
+    @traced("pool.add_portfolio")
+    def add_portfolio(
+        self,
+        portfolio: Dict[str, np.ndarray],
+        principals,
+        rates,
+        first_dates,
+        payments_per_year=12
+    ) -> None:
+        """
+        Add the columnar output of amortize_portfolio.
+
+        Args:
+            portfolio: dict returned by amortize_portfolio
+            principals: original principal of each loan
+            rates: annual rate of each loan
+            first_dates: first payment date of each loan
+            payments_per_year: payments per year, scalar or one per loan
+        """
+        mask = portfolio["mask"]
+        num_loans, max_periods = mask.shape
+        first_dates = np.broadcast_to(np.asarray(first_dates, dtype="datetime64[D]"), (num_loans,))
+        per_year = np.broadcast_to(np.asarray(payments_per_year, dtype=np.int64), (num_loans,))
+
+        # one calendar per distinct (first date, frequency); loans in a tape
+        # share a handful of them, and payment_dates memoizes each
+        keys = np.stack((first_dates.astype(np.int64), per_year), axis=1)
+        calendars, which = np.unique(keys, axis=0, return_inverse=True)
+        which = which.reshape(-1)
+        months = np.empty(mask.shape, dtype=np.int64)
+        for k, (day, ppy) in enumerate(calendars):
+            first = np.datetime64(int(day), "D").astype(datetime.date)
+            months[which == k] = _month_index(payment_dates(first, int(ppy), max_periods))
+
+        with span("pool.scatter_add"):
+            self._accumulate(months[mask], portfolio["interest"][mask], portfolio["principal"][mask])
+        term_months = portfolio["num_payments"] * 12 / per_year
+        principals = np.broadcast_to(np.asarray(principals, dtype=float), (num_loans,))
+        self._add_terms(principals, rates, term_months)
+
+    @traced("pool.add_loans")
+    def add_loans(self, loans: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Stream loan dicts (e.g. from batch.read_tape) into the pool.
+
+        Loans are amortized chunk_size at a time with amortize_portfolio,
+        so peak memory is one chunk's schedules. Every loan needs a
+        first_date.
+
+        Returns:
+            Number of loans added.
+        """
+        added = 0
+        for chunk in _chunks(loans, chunk_size):
+            if any(loan["first_date"] is None for loan in chunk):
+                raise ValueError("pool aggregation needs a first_date for every loan")
+            principals = np.array([l["principal"] for l in chunk])
+            rates = np.array([l["rate"] for l in chunk])
+            per_year = np.array([l["per_year"] for l in chunk])
+            portfolio = amortize_portfolio(
+                principals,
+                rates,
+                np.array([l["years"] for l in chunk]),
+                per_year,
+            )
+            self.add_portfolio(portfolio, principals, rates, [l["first_date"] for l in chunk], per_year)
+            added += len(chunk)
+        count("pool.loans", added)
+        return added
+
+    @property
+    def months(self) -> np.ndarray:
+        """
+        Bucket months as datetime64[M].
+        """
+        return (self._origin + np.arange(len(self.interest))).astype("datetime64[M]")
+
+    @property
+    def payment(self) -> np.ndarray:
+        return self.interest + self.principal
+
+    @property
+    def balance(self) -> np.ndarray:
+        """
+        Pool balance outstanding at the end of each month.
+        """
+        return np.maximum(self._total_principal - np.cumsum(self.principal), 0)
+
+    def to_schedule(self) -> Schedule:
+        """
+        The pool's monthly cash flows as a Schedule dated on the first of
+        each month, so the single-loan exporters and charts apply.
+        """
+        m = len(self.interest)
+        return Schedule(
+            period=np.arange(1, m + 1),
+            payment=np.round(self.payment, 2),
+            interest=np.round(self.interest, 2),
+            principal=np.round(self.principal, 2),
+            balance=np.round(self.balance, 2),
+            dates=self.months.astype("datetime64[D]"),
+        )
+
+    def metrics(self, yield_rate: Optional[float] = None) -> Dict[str, float]:
+        """
+        Pool analytics.
+
+        Times are measured in years from the start of the month before the
+        first bucket, so a cash flow in the first month is 1/12 year out.
+
+        Args:
+            yield_rate: annual yield for discounting, compounded monthly
+                        (default: the WAC)
+
+        Returns:
+            A dict with:
+              - num_loans, total_principal, total_interest
+              - wac: principal-weighted average annual rate
+              - wam: principal-weighted average term in months
+              - wal: weighted-average life in years (principal-weighted time)
+              - macaulay_duration, modified_duration: in years, of the total
+                cash flows at yield_rate
+        """
+        total = self._total_principal
+        wac = self._rate_weighted / total if total else 0.0
+        y = wac if yield_rate is None else yield_rate
+
+        t = np.arange(1, len(self.interest) + 1) / 12
+        cash = self.payment
+        pv = cash * (1 + y / 12) ** (-12 * t)
+        repaid = self.principal.sum()
+        wal = float((t * self.principal).sum() / repaid) if repaid else 0.0
+        macaulay = float((t * pv).sum() / pv.sum()) if pv.sum() else 0.0
+
+        return {
+            "num_loans":         self.num_loans,
+            "total_principal":   round(total, 2),
+            "total_interest":    round(float(self.interest.sum()), 2),
+            "wac":               round(wac, 6),
+            "wam":               round(self._term_weighted / total, 2) if total else 0.0,
+            "wal":               round(wal, 4),
+            "macaulay_duration": round(macaulay, 4),
+            "modified_duration": round(macaulay / (1 + y / 12), 4),
+        }
+
+
+def aggregate_tape(loans: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> PoolCashFlows:
+    """
+    Pool cash flows for a stream of loan dicts (e.g. from batch.read_tape).
+    """
+    pool = PoolCashFlows()
+    pool.add_loans(loans, chunk_size)
+    return pool
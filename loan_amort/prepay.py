@@ -0,0 +1,210 @@
+# loan_amort/prepay.py
+
+import datetime
+from typing import Dict, Optional
+import numpy as np
+
+from loan_amort.analytic import level_payment
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count, traced
+from loan_amort.schedule import Schedule
+
+# a balance below half a cent after a payment counts as paid off
+PAYOFF_EPSILON = 0.005
+
+
+def build_extra(
+    num_periods: int,
+    recurring: float = 0.0,
+    start: int = 1,
+    end: Optional[int] = None,
+    lump_sums: Optional[Dict[int, float]] = None
+) -> np.ndarray:
+    """
+    Per-period extra principal as an array of length num_periods.
+
+    Args:
+        recurring: extra principal added every period from start to end
+        start: first period (1-based) of the recurring extra
+        end: last period of the recurring extra (default: end of term)
+        lump_sums: {period: amount} one-off prepayments
+
+    Raises:
+        ValueError: for a negative amount, or periods outside 1..num_periods
+                    (end may not come before start)
+    """
+    extra = np.zeros(num_periods)
+    if recurring:
+        if recurring < 0:
+            raise ValueError(f"Recurring extra {recurring} is negative")
+        last = num_periods if end is None else end
+        if not 1 <= start <= last <= num_periods:
+            raise ValueError(f"Recurring extra periods {start}..{last} must lie within 1..{num_periods}")
+        extra[start - 1:last] += recurring
+    for period, amount in (lump_sums or {}).items():
+        if not 1 <= period <= num_periods:
+            raise ValueError(f"Lump sum period {period} is outside the term")
+        if amount < 0:
+            raise ValueError(f"Lump sum {amount} in period {period} is negative")
+        extra[period - 1] += amount
+    return extra
+
+
+class PrepaymentScenario:
+    """
+    Level-payment schedule with extra principal payments.
+
+    The scheduled payment stays fixed, so extra principal shortens the
+    term. Unrounded per-period values are kept so that a changed scenario
+    (with_extra, add_recurring, add_lump_sum) reuses the unchanged prefix
+    and only recomputes the periods from the first changed one onward.
+    """
+
+    __slots__ = (
+        "principal", "annual_rate", "years", "payments_per_year",
+        "first_payment_date", "payment", "extra",
+        "_interest", "_scheduled", "_extra_paid", "_balance",
+    )
+
+    def __init__(
+        self,
+        principal: float,
+        annual_rate: float,
+        years: int,
+        payments_per_year: int = 12,
+        first_payment_date: datetime.date = None,
+        extra: Optional[np.ndarray] = None,
+        _prefix: Optional["PrepaymentScenario"] = None,
+        _start: int = 1
+    ):
+        n = years * payments_per_year
+        self.principal = principal
+        self.annual_rate = annual_rate
+        self.years = years
+        self.payments_per_year = payments_per_year
+        self.first_payment_date = first_payment_date
+        self.payment = level_payment(principal, annual_rate, years, payments_per_year)
+        self.extra = np.zeros(n) if extra is None else np.asarray(extra, dtype=float)
+        if len(self.extra) != n:
+            raise ValueError(f"extra must have one entry per period ({n})")
+        self._compute(_prefix, _start)
+
+    @traced("prepay.recompute")
+    def _compute(self, prefix: Optional["PrepaymentScenario"], start: int) -> None:
+        """
+        Fill the columns, copying periods before `start` from prefix.
+        """
+        keep = min(start - 1, len(prefix._balance)) if prefix is not None else 0
+
+        r = self.annual_rate / self.payments_per_year
+        n = len(self.extra)
+        payment = self.payment
+        balance = prefix._balance[keep - 1] if keep else self.principal
+
+        interest_col, scheduled_col, extra_col, balance_col = [], [], [], []
+        period = keep + 1
+        # a prefix that already paid the loan off leaves nothing to recompute
+        while period <= n and balance > 0:
+            interest = balance * r
+            scheduled = payment - interest
+
+            # final period, or the level payment would overpay
+            if period == n or scheduled >= balance:
+                scheduled = balance
+            extra = min(self.extra[period - 1], balance - scheduled)
+            balance -= scheduled + extra
+            if balance < PAYOFF_EPSILON:
+                extra += balance
+                balance = 0.0
+
+            interest_col.append(interest)
+            scheduled_col.append(scheduled)
+            extra_col.append(extra)
+            balance_col.append(balance)
+            period += 1
+        count("prepay.periods_recomputed", len(balance_col))
+
+        def column(name, values):
+            head = getattr(prefix, name)[:keep] if keep else np.empty(0)
+            return np.concatenate((head, values))
+
+        self._interest = column("_interest", interest_col)
+        self._scheduled = column("_scheduled", scheduled_col)
+        self._extra_paid = column("_extra_paid", extra_col)
+        self._balance = column("_balance", balance_col)
+
+    def with_extra(self, extra: np.ndarray) -> "PrepaymentScenario":
+        """
+        Scenario with a new extra-payment vector, recomputing only the
+        periods from the first one whose extra payment changed.
+        """
+        extra = np.asarray(extra, dtype=float)
+        changed = np.flatnonzero(extra != self.extra)
+        if not len(changed):
+            return self
+        return PrepaymentScenario(
+            self.principal, self.annual_rate, self.years, self.payments_per_year,
+            self.first_payment_date, extra, _prefix=self, _start=int(changed[0]) + 1,
+        )
+
+    def add_recurring(self, amount: float, start: int, end: Optional[int] = None) -> "PrepaymentScenario":
+        """
+        What if the borrower adds `amount` every period from `start`?
+        """
+        return self.with_extra(self.extra + build_extra(len(self.extra), amount, start, end))
+
+    def add_lump_sum(self, period: int, amount: float) -> "PrepaymentScenario":
+        """
+        What if the borrower prepays `amount` in `period`?
+        """
+        return self.with_extra(self.extra + build_extra(len(self.extra), lump_sums={period: amount}))
+
+    @property
+    def num_payments(self) -> int:
+        return len(self._balance)
+
+    @property
+    def total_interest(self) -> float:
+        return float(self._interest.sum())
+
+    def schedule(self) -> Schedule:
+        """
+        Rounded schedule; payment and principal include the extra principal.
+        """
+        m = self.num_payments
+        principal = self._scheduled + self._extra_paid
+        dates = None
+        if self.first_payment_date:
+            dates = payment_dates(self.first_payment_date, self.payments_per_year,
+                                  len(self.extra))[:m]
+        return Schedule(
+            period=np.arange(1, m + 1),
+            payment=np.round(self._interest + principal, 2),
+            interest=np.round(self._interest, 2),
+            principal=np.round(principal, 2),
+            balance=np.round(np.maximum(self._balance, 0), 2),
+            dates=dates,
+        )
+
+
+def amortize_with_extra(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None,
+    recurring: float = 0.0,
+    start: int = 1,
+    end: Optional[int] = None,
+    lump_sums: Optional[Dict[int, float]] = None
+) -> Schedule:
+    """
+    Amortization schedule with recurring and/or lump-sum extra principal.
+
+    The level payment is unchanged, so extra principal shortens the term;
+    the returned schedule ends at payoff.
+    """
+    n = years * payments_per_year
+    extra = build_extra(n, recurring, start, end, lump_sums)
+    return PrepaymentScenario(principal, annual_rate, years, payments_per_year,
+                              first_payment_date, extra).schedule()
@@ -0,0 +1,172 @@
+# loan_amort/profiling.py
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Tuple
+
+# Instrumentation is off unless enable() is called. While disabled, span()
+# hands back one shared no-op context manager and count() returns at once,
+# so the hot paths pay only a flag check.
+#
+# Per-name totals are kept exactly; only the most recent MAX_TRACE_SPANS
+# spans are kept for the Chrome trace, so profiling a long batch or pool
+# run uses bounded memory.
+MAX_TRACE_SPANS = 100_000
+_enabled = False
+_totals: "OrderedDict[str, List[int]]" = OrderedDict()   # name -> [calls, total ns]
+_totals_lock = threading.Lock()
+_spans: Deque[Tuple[str, int, int, int]] = deque(maxlen=MAX_TRACE_SPANS)   # name, start ns, duration ns, thread id
+_counters: "OrderedDict[str, int]" = OrderedDict()
+_origin_ns = time.perf_counter_ns()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        dur = time.perf_counter_ns() - self.start
+        _spans.append((self.name, self.start, dur, threading.get_ident()))
+        with _totals_lock:
+            totals = _totals.get(self.name)
+            if totals is None:
+                totals = _totals[self.name] = [0, 0]
+            totals[0] += 1
+            totals[1] += dur
+        return False
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """
+    Discard all recorded spans and counters.
+    """
+    global _origin_ns
+    _spans.clear()
+    _totals.clear()
+    _counters.clear()
+    _origin_ns = time.perf_counter_ns()
+
+
+def span(name: str):
+    """
+    Context manager timing the enclosed block under `name` when enabled.
+    """
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def count(name: str, n: int = 1) -> None:
+    """
+    Add n to the counter `name` when enabled.
+    """
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def traced(name: str):
+    """
+    Decorator wrapping every call of a function in span(name).
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def summary() -> "OrderedDict[str, Dict[str, float]]":
+    """
+    Per-span totals in order of first appearance: calls, total_ms, mean_ms.
+    """
+    stats: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+    for name, (calls, total_ns) in _totals.items():
+        stats[name] = {"calls": calls, "total_ms": total_ns / 1e6, "mean_ms": total_ns / 1e6 / calls}
+    return stats
+
+
+def report() -> str:
+    """
+    Human-readable per-stage breakdown of the recorded spans and counters.
+    """
+    stats = summary()
+    wall = max((s["total_ms"] for s in stats.values()), default=0.0)
+    lines = [f"{'Stage':36s} {'Calls':>7} {'Total ms':>11} {'Mean ms':>10} {'%':>6}"]
+    for name, s in stats.items():
+        share = 100.0 * s["total_ms"] / wall if wall else 0.0
+        lines.append(f"{name:36s} {s['calls']:7d} {s['total_ms']:11.3f} "
+                     f"{s['mean_ms']:10.3f} {share:6.1f}")
+    if _counters:
+        lines.append("")
+        lines.append(f"{'Counter':36s} {'Value':>7}")
+        for name, value in _counters.items():
+            lines.append(f"{name:36s} {value:7d}")
+    return "\n".join(lines)
+
+
+def export_chrome_trace(path: str) -> None:
+    """
+    Write recorded spans as a Chrome trace (chrome://tracing, Perfetto).
+
+    Only the last MAX_TRACE_SPANS spans are kept, so the trace of a very
+    long run starts part-way through; summary() and report() still cover
+    every call.
+    """
+    pid = os.getpid()
+    events = [
+        {
+            "name": name,
+            "ph": "X",
+            "ts": (start - _origin_ns) / 1e3,
+            "dur": dur / 1e3,
+            "pid": pid,
+            "tid": tid,
+        }
+        for name, start, dur, tid in _spans
+    ]
+    end_ts = (time.perf_counter_ns() - _origin_ns) / 1e3
+    events.extend(
+        {"name": name, "ph": "C", "ts": end_ts, "pid": pid, "args": {"value": value}}
+        for name, value in _counters.items()
+    )
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,211 @@
+# loan_amort/refi.py
+
+import csv
+import json
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+from loan_amort.analytic import periodic_payment
+from loan_amort.profiling import count, traced
+
+NEVER = -1   # break_even value when the closing costs are never recovered
+
+
+def _balance(k, balance, r, n):
+    """
+    Balance after k level payments on a loan of `balance` over n periods.
+    """
+    k = np.clip(k, 0, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_n = (1 + r) ** n
+        return np.where(
+            r == 0,
+            balance * (n - k) / n,
+            balance * (growth_n - (1 + r) ** k) / (growth_n - 1),
+        )
+
+
+def _interest_through(t, balance, r, n, payment):
+    """
+    Interest paid in the first t periods (all of it once t >= n).
+    """
+    t = np.minimum(t, n)
+    return payment * t - (balance - _balance(t, balance, r, n))
+
+
+def _first_true(pred, lo, hi):
+    """
+    Vectorized binary search: the smallest t in [lo, hi] with pred(t) true,
+    or hi + 1 where there is none. pred must be monotone (false, then
+    true) over each element's range.
+    """
+    lo = lo.copy()
+    hi = hi + 1
+    while True:
+        active = lo < hi
+        if not active.any():
+            return lo
+        mid = (lo + hi) // 2
+        ok = pred(mid)
+        hi = np.where(active & ok, mid, hi)
+        lo = np.where(active & ~ok, mid + 1, lo)
+
+
+def read_offers(path: str) -> List[Dict[str, Any]]:
+    """
+    Read refinance offers from a CSV or JSONL file.
+
+    Each record needs rate and years; closing_costs (default 0) and
+    offer_id (default: record number) are optional.
+    """
+    offers = []
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".ndjson", ".json")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for index, rec in enumerate(records, start=1):
+            try:
+                offers.append({
+                    "offer_id": str(rec.get("offer_id") or index),
+                    "rate": float(rec["rate"]),
+                    "years": float(rec["years"]),
+                    "closing_costs": float(rec.get("closing_costs") or 0.0),
+                })
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"Bad offer record {index}: {e!r}") from e
+    return offers
+
+
+@traced("analyze_refi")
+def analyze_refi(
+    balances,
+    rates,
+    remaining,
+    offer_rates,
+    offer_years,
+    closing_costs=0.0,
+    payments_per_year=12
+) -> Dict[str, np.ndarray]:
+    """
+    Compare every existing loan with every refinance offer at once.
+
+    Existing loans are described by their current balance, rate and
+    remaining number of payments; each offer refinances that balance at
+    its own rate and term, with closing costs paid up front. All loan x
+    offer pairs are evaluated as (loans, offers) arrays from closed-form
+    balances and cumulative interest; no schedule rows are generated.
+
+    The break-even payment is the first one after which the interest
+    saved so far covers the closing costs (interest saved is also the
+    payment savings plus the difference in balances, so this is the true
+    break-even, not costs / periodic savings). It is searched within the
+    old loan's remaining term with a vectorized binary search: the per-
+    period interest difference changes sign at most once, so a first
+    search finds where the cumulative savings peak and a second finds the
+    first payment at or above the costs before that point.
+
+    Args:
+        balances, rates, remaining: current balance, annual rate and
+            payments left for each loan (scalars or 1-D arrays)
+        offer_rates, offer_years: annual rate and term of each offer
+        closing_costs: up-front cost of each offer (scalar or per offer)
+        payments_per_year: payments per year, shared or per loan
+
+    Returns:
+        Dict with per-loan arrays payment and remaining_interest, and
+        (loans, offers) arrays:
+          - new_payment, periodic_savings (current minus new payment, per
+            payment period rather than per month)
+          - new_interest: total interest over the new loan
+          - interest_saved: remaining_interest - new_interest
+          - net_savings: interest_saved - closing costs
+          - break_even: payment number of break-even, or NEVER (-1)
+    """
+    balances, rates, remaining = (
+        np.atleast_1d(np.asarray(v, dtype=float)) for v in np.broadcast_arrays(balances, rates, remaining)
+    )
+    offer_rates, offer_years, closing_costs = (
+        np.atleast_1d(np.asarray(v, dtype=float))
+        for v in np.broadcast_arrays(offer_rates, offer_years, closing_costs)
+    )
+    per_year = np.asarray(payments_per_year)
+    per_year = per_year[:, None] if per_year.ndim else per_year
+    count("refi.pairs", balances.size * offer_rates.size)
+
+    b = balances[:, None]
+    r_old = rates[:, None] / per_year
+    n_old = remaining.astype(np.int64)[:, None]
+    r_new = offer_rates[None, :] / per_year
+    n_new = np.rint(offer_years[None, :] * per_year).astype(np.int64)
+    costs = closing_costs[None, :]
+
+    payment = periodic_payment(b, r_old, n_old)
+    new_payment = periodic_payment(b, r_new, n_new)
+    remaining_interest = payment * n_old - b
+    new_interest = new_payment * n_new - b
+    shape = new_payment.shape
+
+    def saved_through(t):
+        return (_interest_through(t, b, r_old, n_old, payment)
+                - _interest_through(t, b, r_new, n_new, new_payment))
+
+    def saving_in(t):
+        return (r_old * _balance(t - 1, b, r_old, n_old)
+                - r_new * _balance(t - 1, b, r_new, n_new))
+
+    ones = np.ones(shape, dtype=np.int64)
+    horizon = np.broadcast_to(n_old, shape)
+    # when the first period saves interest, savings only rise until the
+    # per-period saving turns negative; otherwise they fall and then rise
+    peak = _first_true(lambda t: saving_in(t) < 0, ones, horizon) - 1
+    hi = np.where(saving_in(ones) >= 0, peak, horizon)
+    be = _first_true(lambda t: saved_through(t) >= costs - 1e-9, ones, hi)
+    break_even = np.where(be <= hi, be, NEVER)
+
+    interest_saved = remaining_interest - new_interest
+    return {
+        "payment": payment[:, 0],
+        "remaining_interest": remaining_interest[:, 0],
+        "new_payment": new_payment,
+        "periodic_savings": payment - new_payment,
+        "new_interest": new_interest,
+        "interest_saved": interest_saved,
+        "net_savings": interest_saved - costs,
+        "break_even": break_even,
+    }
+
+
+def rank_offers(
+    analysis: Dict[str, np.ndarray],
+    loan_ids: Sequence = None,
+    offer_ids: Sequence = None,
+    top: int = None
+) -> List[Dict]:
+    """
+    Rank each loan's offers by net savings (best first).
+
+    Ties go to the earlier break-even. Returns one record per (loan,
+    offer) pair, up to `top` per loan, with loan_id, rank, offer_id and
+    the pair's values from analyze_refi.
+    """
+    net = analysis["net_savings"]
+    num_loans, num_offers = net.shape
+    loan_ids = list(loan_ids) if loan_ids is not None else list(range(1, num_loans + 1))
+    offer_ids = list(offer_ids) if offer_ids is not None else list(range(1, num_offers + 1))
+    be = analysis["break_even"]
+    # NEVER sorts after every real break-even payment
+    be_key = np.where(be == NEVER, np.iinfo(np.int64).max, be)
+    order = np.lexsort((be_key, -net), axis=-1)[:, :top]
+
+    fields = ("new_payment", "periodic_savings", "new_interest", "interest_saved", "net_savings")
+    records = []
+    for i in range(num_loans):
+        for rank, j in enumerate(order[i].tolist(), start=1):
+            rec = {"loan_id": loan_ids[i], "rank": rank, "offer_id": offer_ids[j],
+                   "payment": float(analysis["payment"][i])}
+            for name in fields:
+                rec[name] = float(analysis[name][i, j])
+            rec["break_even"] = int(be[i, j])
+            records.append(rec)
+    return records
@@ -0,0 +1,156 @@
+# loan_amort/render.py
+
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from loan_amort.amort import amortize_loan
+from loan_amort.batch import _chunks
+from loan_amort.profiling import span
+
+# one reusable (figure, axes) per chart type in each worker process
+_FIGURES: Dict[str, Any] = {}
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def safe_file_id(loan_id: Any) -> str:
+    """
+    loan_id reduced to characters that are safe in a file name: anything
+    outside [A-Za-z0-9._-] becomes '_', so ids cannot leave out_dir.
+
+    Raises:
+        ValueError: if the id is empty
+    """
+    safe = _UNSAFE.sub("_", str(loan_id))
+    if not safe:
+        raise ValueError("Loan with an empty loan_id cannot be rendered")
+    return safe
+
+
+def _with_file_ids(loans: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Attach each loan's file_id, rejecting ids that collide once sanitized.
+    """
+    seen: Dict[str, str] = {}
+    for loan in loans:
+        file_id = safe_file_id(loan["loan_id"])
+        if file_id in seen:
+            raise ValueError(f"Loan ids {seen[file_id]!r} and {loan['loan_id']!r} "
+                             f"both map to file name {file_id!r}")
+        seen[file_id] = loan["loan_id"]
+        yield dict(loan, file_id=file_id)
+
+
+def _init_worker() -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def render_loan(
+    loan: Dict[str, Any],
+    out_dir: str,
+    charts: Sequence[str],
+    fmt: str = "png"
+) -> List[str]:
+    """
+    Render the chart set for one loan, reusing this process's figures.
+
+    Returns the paths written, named <file_id>_<chart>.<fmt> where file_id
+    is the loan_id made safe by safe_file_id.
+    """
+    import matplotlib.pyplot as plt
+    from loan_amort.plots import CHARTS
+
+    if loan["first_date"] is None:
+        raise ValueError(f"Loan {loan['loan_id']} has no first_date; charts need payment dates")
+    schedule = amortize_loan(loan["principal"], loan["rate"], loan["years"],
+                             loan["per_year"], first_payment_date=loan["first_date"])
+    paths = []
+    for chart in charts:
+        if chart not in _FIGURES:
+            _FIGURES[chart] = plt.subplots()
+        fig, ax = _FIGURES[chart]
+        CHARTS[chart](schedule, ax=ax, interactive=False)
+        file_id = loan.get("file_id") or safe_file_id(loan["loan_id"])
+        path = os.path.join(out_dir, f"{file_id}_{chart}.{fmt}")
+        with span("render.save"):
+            fig.savefig(path, format=fmt)
+        paths.append(path)
+    return paths
+
+
+def render_chunk(
+    chunk: List[Dict[str, Any]],
+    out_dir: str,
+    charts: Sequence[str],
+    fmt: str
+) -> int:
+    return sum(len(render_loan(loan, out_dir, charts, fmt)) for loan in chunk)
+
+
+def render_charts(
+    loans: Iterable[Dict[str, Any]],
+    out_dir: str,
+    charts: Optional[Sequence[str]] = None,
+    fmt: str = "png",
+    workers: int = None,
+    chunk_size: int = 50,
+    progress: bool = True
+) -> int:
+    """
+    Render chart packs for many loans across a process pool.
+
+    Workers use the Agg backend, skip hover wiring and reuse one figure per
+    chart type between loans.
+
+    Args:
+        loans: iterable of loan dicts (e.g. from loan_amort.batch.read_tape)
+        out_dir: directory for the rendered files (created if missing)
+        charts: chart names from loan_amort.plots.CHARTS (default: all)
+        fmt: 'png', 'svg' or 'pdf'
+        workers: number of processes (default: os.cpu_count()); 1 runs inline
+        chunk_size: loans per task
+        progress: report renders per second on stderr
+
+    Returns:
+        Number of files written.
+
+    Raises:
+        ValueError: for a loan without first_date, or loan ids that are
+            empty or collide after safe_file_id
+    """
+    if charts is None:
+        charts = ("balance_line", "interest_line", "interest_stacked", "cumulative_line")
+    charts = tuple(charts)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+
+    done = 0
+    start = time.perf_counter()
+
+    def emit(count: int) -> None:
+        nonlocal done
+        done += count
+        if progress:
+            rate = done / max(time.perf_counter() - start, 1e-9)
+            print(f"rendered {done} charts ({rate:,.1f} renders/s)", file=sys.stderr)
+
+    chunks = _chunks(_with_file_ids(loans), chunk_size)
+    if workers == 1:
+        _init_worker()
+        for chunk in chunks:
+            emit(render_chunk(chunk, out_dir, charts, fmt))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(render_chunk, chunk, out_dir, charts, fmt))
+                if len(pending) >= 2 * workers:
+                    emit(pending.popleft().result())
+            while pending:
+                emit(pending.popleft().result())
+    return done
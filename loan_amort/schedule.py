@@ -0,0 +1,114 @@
+# loan_amort/schedule.py
+
+import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+import numpy as np
+
+COLUMNS = ("payment", "interest", "principal", "balance")
+
+
+class Schedule:
+    """
+    Columnar amortization schedule.
+
+    Each field is stored as one contiguous NumPy array (float64 amounts,
+    int64 periods, datetime64[D] dates) instead of one dict per period.
+    For backward compatibility a Schedule also behaves like the old list
+    of row dicts: len(), indexing and iteration yield dicts with keys
+    period, payment, interest, principal, balance[, date].
+    """
+
+    __slots__ = ("period", "payment", "interest", "principal", "balance", "dates")
+
+    def __init__(
+        self,
+        period: np.ndarray,
+        payment: np.ndarray,
+        interest: np.ndarray,
+        principal: np.ndarray,
+        balance: np.ndarray,
+        dates: Optional[np.ndarray] = None
+    ):
+        self.period = np.asarray(period, dtype=np.int64)
+        self.payment = np.asarray(payment, dtype=float)
+        self.interest = np.asarray(interest, dtype=float)
+        self.principal = np.asarray(principal, dtype=float)
+        self.balance = np.asarray(balance, dtype=float)
+        self.dates = None if dates is None else np.asarray(dates, dtype="datetime64[D]")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "Schedule":
+        """
+        Build a Schedule from an iterable of row dicts (the legacy format).
+        """
+        rows = list(rows)
+        columns = {
+            key: np.fromiter((p[key] for p in rows), dtype=float, count=len(rows))
+            for key in COLUMNS
+        }
+        period = np.fromiter((p["period"] for p in rows), dtype=np.int64, count=len(rows))
+        dates = None
+        if rows and rows[0].get("date") is not None:
+            dates = np.array([p["date"] for p in rows], dtype="datetime64[D]")
+        return cls(period, dates=dates, **columns)
+
+    def __len__(self) -> int:
+        return len(self.period)
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """
+        Return period i (0-based) as a legacy row dict.
+        """
+        row: Dict[str, Any] = {
+            "period": int(self.period[i]),
+            "payment": float(self.payment[i]),
+            "interest": float(self.interest[i]),
+            "principal": float(self.principal[i]),
+            "balance": float(self.balance[i]),
+        }
+        if self.dates is not None:
+            row["date"] = str(self.dates[i])
+        return row
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Schedule(
+                self.period[i], self.payment[i], self.interest[i],
+                self.principal[i], self.balance[i],
+                None if self.dates is None else self.dates[i],
+            )
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("schedule index out of range")
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def to_dicts(self):
+        """
+        Materialize the schedule as a list of legacy row dicts.
+        """
+        return list(self)
+
+    def date_objects(self) -> np.ndarray:
+        """
+        Payment dates as an object array of datetime.date.
+        """
+        if self.dates is None:
+            raise ValueError("schedule has no payment dates")
+        return self.dates.astype(datetime.date)
+
+    def __repr__(self) -> str:
+        return f"Schedule(num_payments={len(self)}, dated={self.dates is not None})"
+
+
+def as_schedule(schedule) -> Schedule:
+    """
+    Return schedule as a Schedule, converting a list of row dicts if needed.
+    """
+    if isinstance(schedule, Schedule):
+        return schedule
+    return Schedule.from_rows(schedule)
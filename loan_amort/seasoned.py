@@ -0,0 +1,177 @@
+# loan_amort/seasoned.py
+
+import datetime
+from typing import Any, Dict, Tuple
+import numpy as np
+
+from loan_amort.analytic import balance_at, periodic_payment
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count, traced
+from loan_amort.schedule import Schedule
+
+
+def payments_made(
+    first_payment_date: datetime.date,
+    as_of: datetime.date,
+    payments_per_year: int,
+    num_payments: int
+) -> int:
+    """
+    Number of payments due before `as_of`; a payment due on the as-of
+    date itself is still outstanding.
+    """
+    dates = payment_dates(first_payment_date, payments_per_year, num_payments)
+    return int(np.searchsorted(dates, np.datetime64(as_of, "D"), side="left"))
+
+
+def _seasoned_loan(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int,
+    first_payment_date: datetime.date,
+    as_of: datetime.date,
+    paid: int,
+    current_balance: float
+) -> Tuple[int, int, float]:
+    """
+    Resolve (payments made, payments remaining, current balance).
+    """
+    n = years * payments_per_year
+    if paid is None:
+        if as_of is None:
+            paid = 0
+        elif first_payment_date is None:
+            raise ValueError("as_of needs the loan's first_payment_date")
+        else:
+            paid = payments_made(first_payment_date, as_of, payments_per_year, n)
+    if not 0 <= paid <= n:
+        raise ValueError(f"paid must be between 0 and {n}, got {paid}")
+    if current_balance is None:
+        current_balance = float(balance_at(paid, principal, annual_rate, years, payments_per_year))
+    elif current_balance < 0:
+        raise ValueError("current_balance must be non-negative")
+    elif paid == n and current_balance > 0:
+        raise ValueError("current_balance is outstanding but no payments remain after the as-of date")
+    return paid, n - paid, current_balance
+
+
+@traced("amortize_as_of")
+def amortize_as_of(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None,
+    as_of: datetime.date = None,
+    paid: int = None,
+    current_balance: float = None
+) -> Schedule:
+    """
+    Remaining schedule of a seasoned loan, from its next payment onward.
+
+    The loan is described by its original terms. The payments already
+    made come from `paid`, or from `as_of` and the payment calendar; the
+    balance after them comes from the closed-form balance_at unless a
+    servicer's `current_balance` is given, in which case that balance is
+    re-amortized over the remaining payments. Only the remaining rows are
+    built, in one vectorized pass, and they keep their original period
+    numbers and dates.
+
+    Args:
+        principal, annual_rate, years, payments_per_year: original terms
+        first_payment_date: date of the loan's first payment, or None
+        as_of: date to start from; payments due before it are made
+        paid: payments made so far (overrides as_of)
+        current_balance: outstanding balance, if known
+
+    Returns:
+        Schedule for periods paid + 1 .. n (empty once the loan is repaid).
+    """
+    paid, remaining, balance = _seasoned_loan(
+        principal, annual_rate, years, payments_per_year,
+        first_payment_date, as_of, paid, current_balance,
+    )
+    count("amortize_as_of.periods", remaining)
+    count("amortize_as_of.skipped", paid)
+
+    # balances before and after each remaining payment, in closed form
+    r = annual_rate / payments_per_year
+    j = np.arange(remaining + 1)
+    if remaining == 0:
+        balances = np.array([balance])
+    elif r == 0:
+        balances = balance * (remaining - j) / remaining
+    else:
+        growth = (1 + r) ** remaining
+        balances = balance * (growth - (1 + r) ** j) / (growth - 1)
+    interest = balances[:-1] * r
+    principal_paid = balances[:-1] - balances[1:]
+
+    dates = None
+    if first_payment_date:
+        dates = payment_dates(first_payment_date, payments_per_year, paid + remaining)[paid:]
+    return Schedule(
+        period=np.arange(paid + 1, paid + remaining + 1),
+        payment=np.round(interest + principal_paid, 2),
+        interest=np.round(interest, 2),
+        principal=np.round(principal_paid, 2),
+        balance=np.round(np.maximum(balances[1:], 0), 2),
+        dates=dates,
+    )
+
+
+@traced("remaining_metrics")
+def remaining_metrics(
+    principal: float,
+    annual_rate: float,
+    years: int,
+    payments_per_year: int = 12,
+    first_payment_date: datetime.date = None,
+    as_of: datetime.date = None,
+    paid: int = None,
+    current_balance: float = None
+) -> Dict[str, Any]:
+    """
+    Remaining-life metrics of a seasoned loan in constant time.
+
+    Takes the same arguments as amortize_as_of and returns the keys of
+    compute_loan_metrics for the remaining payments, plus payments_made,
+    current_balance, wal (weighted average life of the remaining
+    principal, in years from the as-of point) and, with dates,
+    next_payment_date and maturity_date.
+    """
+    paid, remaining, balance = _seasoned_loan(
+        principal, annual_rate, years, payments_per_year,
+        first_payment_date, as_of, paid, current_balance,
+    )
+    r = annual_rate / payments_per_year
+    payment = float(periodic_payment(balance, r, remaining)) if remaining else 0.0
+    total_payment = payment * remaining
+
+    # sum of j * principal_j telescopes to the sum of the balances
+    # outstanding before each payment
+    if remaining == 0 or balance == 0:
+        balance_sum = 0.0
+    elif r == 0:
+        balance_sum = balance * (remaining + 1) / 2
+    else:
+        growth = (1 + r) ** remaining
+        balance_sum = balance * (remaining * growth / (growth - 1) - 1 / r)
+    wal = balance_sum / balance / payments_per_year if balance else 0.0
+
+    metrics = {
+        "num_payments":    remaining,
+        "total_payment":   round(total_payment, 2),
+        "total_interest":  round(total_payment - balance, 2),
+        "total_principal": round(balance, 2),
+        "average_payment": round(payment, 2),
+        "payments_made":   paid,
+        "current_balance": round(balance, 2),
+        "wal":             round(wal, 4),
+    }
+    if first_payment_date and remaining:
+        dates = payment_dates(first_payment_date, payments_per_year, paid + remaining)
+        metrics["next_payment_date"] = str(dates[paid])
+        metrics["maturity_date"] = str(dates[-1])
+    return metrics
@@ -0,0 +1,358 @@
+# loan_amort/serve.py
+
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from loan_amort.amort import amortize_portfolio
+from loan_amort.batch import _parse_loan, metrics_records
+from loan_amort.paydates import payment_dates
+from loan_amort.profiling import count
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 256          # loans evaluated per vectorized pass
+MAX_DELAY = 0.002        # seconds a batch waits to fill up
+LATENCY_WINDOW = 10000   # recent requests kept for latency percentiles
+MAX_BODY = 1 << 20
+KINDS = ("metrics", "amortize")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+def _schedule_records(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Schedules for a chunk of loans from one amortize_portfolio pass.
+    """
+    result = amortize_portfolio(
+        np.array([l["principal"] for l in chunk]),
+        np.array([l["rate"] for l in chunk]),
+        np.array([l["years"] for l in chunk]),
+        np.array([l["per_year"] for l in chunk]),
+    )
+    records = []
+    for i, loan in enumerate(chunk):
+        n = int(result["num_payments"][i])
+        columns = [result[k][i, :n].tolist() for k in ("payment", "interest", "principal", "balance")]
+        dates = None
+        if loan["first_date"]:
+            dates = payment_dates(loan["first_date"], loan["per_year"], n).astype(str).tolist()
+        rows = []
+        for j, (pay, interest, principal, balance) in enumerate(zip(*columns)):
+            row = {"period": j + 1, "payment": pay, "interest": interest,
+                   "principal": principal, "balance": balance}
+            if dates:
+                row["date"] = dates[j]
+            rows.append(row)
+        records.append({"loan_id": loan["loan_id"], "schedule": rows})
+    return records
+
+
+def evaluate_batch(kind: str, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Evaluate one micro-batch of parsed loans; runs inside pool workers.
+    """
+    if kind == "metrics":
+        return metrics_records(chunk)
+    return _schedule_records(chunk)
+
+
+class ServiceStats:
+    """
+    Request, batch and latency counters for the /stats endpoint.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.loans = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.requests += 1
+        self.errors += not ok
+        self.latencies.append(seconds)
+        count("serve.requests")
+
+    def snapshot(self) -> Dict[str, float]:
+        uptime = time.perf_counter() - self.started
+        lat = np.array(self.latencies) * 1e3
+        p50, p99 = np.percentile(lat, (50, 99)) if len(lat) else (0.0, 0.0)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "loans": self.loans,
+            "batches": self.batches,
+            "mean_batch_size": round(self.loans / self.batches, 2) if self.batches else 0.0,
+            "uptime_s": round(uptime, 3),
+            "requests_per_s": round(self.requests / uptime, 1) if uptime else 0.0,
+            "latency_p50_ms": round(float(p50), 3),
+            "latency_p99_ms": round(float(p99), 3),
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests of one kind into vectorized batches.
+
+    submit() queues parsed loans and awaits their results. A collector
+    task takes the first waiting request, keeps pulling requests until
+    MAX_BATCH loans are gathered or max_delay has passed, and hands the
+    batch to the executor, so the event loop never runs the numerics.
+    """
+
+    def __init__(self, kind: str, executor, stats: ServiceStats,
+                 max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY):
+        self.kind = kind
+        self.executor = executor
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+        self._running = set()   # strong references to in-flight batch tasks
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._collect())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, loans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((loans, future))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_delay
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            task = asyncio.ensure_future(self._run(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, pending: List[Tuple[List[Dict[str, Any]], asyncio.Future]]) -> None:
+        chunk = [loan for loans, _ in pending for loan in loans]
+        self.stats.batches += 1
+        self.stats.loans += len(chunk)
+        count("serve.batches")
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, evaluate_batch, self.kind, chunk)
+        except Exception:
+            # retry each request on its own so only the failing one errors
+            count("serve.batch_retries")
+            for loans, future in pending:
+                try:
+                    result = await loop.run_in_executor(self.executor, evaluate_batch, self.kind, loans)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+            return
+        start = 0
+        for loans, future in pending:
+            if not future.done():
+                future.set_result(results[start:start + len(loans)])
+            start += len(loans)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """
+    One HTTP/1.1 request as (method, path, headers, body), or None at EOF.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ValueError("malformed request line") from None
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise ValueError("payload too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    try:
+        body = json.dumps(payload, separators=(",", ":"), allow_nan=False).encode()
+    except ValueError:
+        # NaN/inf would make the body invalid JSON
+        status = 500
+        body = json.dumps({"error": "result is not finite"}).encode()
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class LoanService:
+    """
+    HTTP/JSON pricing service.
+
+    Endpoints:
+        POST /metrics   loan object or list -> closed-form metrics
+        POST /amortize  loan object or list -> schedules
+        GET  /stats     request, batch and latency counters
+        GET  /health    liveness check
+
+    Loan objects use the tape fields: principal, rate, years and optional
+    per_year, first_date, loan_id.
+    """
+
+    def __init__(self, workers: int = 1, max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = ServiceStats()
+        self.executor = None
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self.server = None
+        self._handlers = set()   # open connections, closed on stop()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> int:
+        """
+        Start listening; returns the bound port (useful with port=0).
+        """
+        # workers come from a fork server rather than forking this process,
+        # which would hand them copies of open client sockets
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, evaluate_batch, "metrics", [])
+            for _ in range(self.workers)
+        ))
+        for kind in KINDS:
+            self.batchers[kind] = MicroBatcher(kind, self.executor, self.stats,
+                                               self.max_batch, self.max_delay)
+            self.batchers[kind].start()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        self.executor.shutdown()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        route = path.split("?", 1)[0].rstrip("/")
+        if route == "/health":
+            return 200, {"status": "ok"}
+        if route == "/stats":
+            return 200, self.stats.snapshot()
+        kind = route.lstrip("/")
+        if kind not in KINDS:
+            return 404, {"error": f"unknown endpoint {route}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            data = json.loads(body or b"null")
+            single = isinstance(data, dict)
+            records = [data] if single else data
+            if not isinstance(records, list) or not all(isinstance(rec, dict) for rec in records):
+                raise ValueError("body must be a loan object or a list of loan objects")
+            loans = [_parse_loan(rec, i) for i, rec in enumerate(records, start=1)]
+        except (TypeError, ValueError) as e:
+            return 400, {"error": str(e)}
+        try:
+            results = await self.batchers[kind].submit(loans)
+        except Exception as e:
+            return 500, {"error": repr(e)}
+        return 200, results[0] if single else results
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    writer.write(_response(400, {"error": str(e)}, False))
+                    break
+                if request is None:
+                    break
+                start = time.perf_counter()
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                self.stats.record(time.perf_counter() - start, status == 200)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 1,
+    max_batch: int = MAX_BATCH,
+    max_delay: float = MAX_DELAY
+) -> None:
+    """
+    Run the service until interrupted.
+    """
+    async def main():
+        service = LoanService(workers, max_batch, max_delay)
+        bound = await service.start(host, port)
+        print(f"loan_amort serving on http://{host}:{bound} ({workers} workers)", file=sys.stderr)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,186 @@
+# loan_amort/simulate.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Sequence
+import numpy as np
+
+from loan_amort.profiling import count, span, traced
+
+PATHS_PER_TASK = 1000   # paths per seeded block; fixes results for any worker count
+PERCENTILES = (5, 25, 50, 75, 95)
+METRICS = ("total_interest", "wal", "losses")
+
+
+def _periodic(annual, payments_per_year):
+    """
+    Annual CPR/CDR as the equivalent per-period rate (SMM/MDR).
+    """
+    return 1 - (1 - np.minimum(annual, 1.0)) ** (1 / payments_per_year)
+
+
+def _simulate_block(
+    seed: np.random.SeedSequence,
+    num_paths: int,
+    principals: np.ndarray,
+    rates: np.ndarray,
+    num_periods: np.ndarray,
+    payments_per_year: int,
+    cpr: float,
+    cdr: float,
+    severity: float,
+    cpr_vol: float,
+    cdr_vol: float
+) -> Dict[str, np.ndarray]:
+    """
+    Evolve one block of paths; every array is (paths, loans).
+    """
+    rng = np.random.default_rng(seed)
+    shape = (num_paths, len(principals))
+    r = rates / payments_per_year
+    balance = np.broadcast_to(principals, shape).copy()
+    interest_total = np.zeros(num_paths)
+    returned = np.zeros(num_paths)       # principal paid back (excl. defaults)
+    timed = np.zeros(num_paths)          # sum of t * principal returned
+    losses = np.zeros(num_paths)
+
+    # log CPR/CDR multipliers follow a driftless random walk per path,
+    # shared by the loans on a path (a common economic scenario)
+    step_cpr = cpr_vol / np.sqrt(payments_per_year)
+    step_cdr = cdr_vol / np.sqrt(payments_per_year)
+    log_cpr = np.zeros(num_paths)
+    log_cdr = np.zeros(num_paths)
+
+    for col in range(int(num_periods.max())):
+        t = (col + 1) / payments_per_year
+        remaining = num_periods - col
+        active = remaining > 0
+
+        log_cpr += step_cpr * rng.standard_normal(num_paths) - step_cpr ** 2 / 2
+        log_cdr += step_cdr * rng.standard_normal(num_paths) - step_cdr ** 2 / 2
+        smm = _periodic(cpr * np.exp(log_cpr), payments_per_year)[:, None]
+        mdr = _periodic(cdr * np.exp(log_cdr), payments_per_year)[:, None]
+
+        # defaults leave the pool at the start of the period, recovering
+        # (1 - severity) of the defaulted balance
+        defaulted = np.where(active, balance * mdr, 0.0)
+        balance -= defaulted
+        losses += (defaulted * severity).sum(axis=1)
+
+        # the surviving balance re-amortizes over the remaining term
+        interest = np.where(active, balance * r, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (1 + r) ** remaining
+            scheduled = np.where(r == 0, balance / remaining, balance * r / (growth - 1))
+        scheduled = np.where(active, np.minimum(scheduled, balance), 0.0)
+        prepaid = (balance - scheduled) * smm
+        balance -= scheduled + prepaid
+
+        paid_back = (scheduled + prepaid + defaulted * (1 - severity)).sum(axis=1)
+        interest_total += interest.sum(axis=1)
+        returned += paid_back
+        timed += t * paid_back
+
+    return {
+        "total_interest": interest_total,
+        "wal": np.divide(timed, returned, out=np.zeros(num_paths), where=returned > 0),
+        "losses": losses,
+    }
+
+
+@traced("simulate_paths")
+def simulate_paths(
+    principals,
+    rates,
+    years,
+    payments_per_year: int = 12,
+    num_paths: int = 1000,
+    cpr: float = 0.06,
+    cdr: float = 0.005,
+    severity: float = 0.35,
+    cpr_vol: float = 0.3,
+    cdr_vol: float = 0.3,
+    seed: int = None,
+    workers: int = 1
+) -> Dict[str, np.ndarray]:
+    """
+    Monte Carlo prepayment and default paths for a loan or a pool.
+
+    Each path draws its own CPR and CDR scenario: the base annual rates
+    scaled by a mean-one lognormal random walk with the given annual
+    volatilities. Per period, defaults (CDR as a monthly default rate)
+    leave first and lose `severity` of their balance; the survivors pay
+    interest and the scheduled principal re-amortized over the remaining
+    term, and then prepay a fraction (CPR as SMM) of what is left. All
+    paths and loans advance together as (paths, loans) arrays.
+
+    Paths are simulated in blocks of PATHS_PER_TASK, each with its own
+    child of np.random.SeedSequence(seed), so a given seed reproduces the
+    same paths for any worker count.
+
+    Args:
+        principals, rates, years: one loan, or arrays describing a pool
+        payments_per_year: payments per year, shared by every loan
+        num_paths: number of simulated paths
+        cpr, cdr: base annual prepayment and default rates (decimals)
+        severity: fraction of a defaulted balance that is lost
+        cpr_vol, cdr_vol: annual volatility of the log CPR/CDR multipliers
+        seed: seed for reproducible paths (default: fresh entropy)
+        workers: processes to split the blocks across; 1 runs inline
+
+    Returns:
+        Dict of arrays with one value per path, summed over the pool:
+          total_interest, wal (years, of principal returned), losses
+
+    Raises:
+        ValueError: if num_paths < 1 or there are no loans
+    """
+    principals, rates, years = (
+        np.atleast_1d(np.asarray(v, dtype=float)) for v in np.broadcast_arrays(principals, rates, years)
+    )
+    if num_paths < 1 or not principals.size:
+        raise ValueError("simulate needs at least one path and one loan")
+    num_periods = (years * payments_per_year).astype(np.int64)
+    count("simulate.paths", num_paths)
+
+    sizes = [PATHS_PER_TASK] * (num_paths // PATHS_PER_TASK)
+    if num_paths % PATHS_PER_TASK:
+        sizes.append(num_paths % PATHS_PER_TASK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (principals, rates, num_periods, payments_per_year,
+            cpr, cdr, severity, cpr_vol, cdr_vol)
+
+    workers = workers or os.cpu_count() or 1
+    with span("simulate.blocks"):
+        if workers == 1 or len(sizes) == 1:
+            blocks = [_simulate_block(s, size, *args) for s, size in zip(seeds, sizes)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_simulate_block, s, size, *args)
+                           for s, size in zip(seeds, sizes)]
+                blocks = [f.result() for f in futures]
+
+    return {
+        name: np.concatenate([b[name] for b in blocks]) if blocks else np.zeros(0)
+        for name in METRICS
+    }
+
+
+def summarize(
+    paths: Dict[str, np.ndarray],
+    percentiles: Sequence[float] = PERCENTILES
+) -> Dict[str, Dict[str, float]]:
+    """
+    Mean and percentiles of each simulated metric.
+
+    Returns:
+        {metric: {"mean": ..., "p5": ..., "p50": ..., ...}}
+    """
+    out = {}
+    for name in METRICS:
+        values = paths[name]
+        stats = {"mean": float(values.mean())}
+        for p, v in zip(percentiles, np.percentile(values, percentiles)):
+            stats[f"p{p:g}"] = float(v)
+        out[name] = stats
+    return out
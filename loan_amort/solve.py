@@ -0,0 +1,142 @@
+# loan_amort/solve.py
+
+import numpy as np
+
+from loan_amort.analytic import _out
+from loan_amort.profiling import count, traced
+
+RATE_TOLERANCE = 1e-12   # periodic-rate convergence threshold
+MAX_HALLEY_STEPS = 50
+MAX_BISECTION_STEPS = 200
+
+
+def _annuity_factor(r, n):
+    """
+    Present value of 1 per period for n periods, with its first two
+    derivatives in r: a = (1 - (1 + r)^-n) / r.
+    """
+    g = 1 - (1 + r) ** -n
+    g1 = n * (1 + r) ** (-n - 1)
+    g2 = -n * (n + 1) * (1 + r) ** (-n - 2)
+    a = g / r
+    a1 = g1 / r - g / r ** 2
+    a2 = g2 / r - 2 * g1 / r ** 2 + 2 * g / r ** 3
+    return a, a1, a2
+
+
+def _bisect_rate(target, n, lo, hi):
+    """
+    Vectorized bisection for a(r) = target on [lo, hi]; a is decreasing.
+    """
+    for _ in range(MAX_BISECTION_STEPS):
+        mid = (lo + hi) / 2
+        too_low = _annuity_factor(mid, n)[0] > target   # rate too low
+        lo = np.where(too_low, mid, lo)
+        hi = np.where(too_low, hi, mid)
+        if np.all(hi - lo < RATE_TOLERANCE):
+            break
+    return (lo + hi) / 2
+
+
+@traced("solve_rate")
+def solve_rate(
+    payment,
+    principal,
+    years,
+    payments_per_year=12,
+    fees=0.0
+):
+    """
+    Annual rate implied by a level payment (an APR when fees are given).
+
+    Solves payment * (1 - (1 + r)^-n) / r = principal - fees for the
+    periodic rate r with Halley's method (analytic first and second
+    derivatives), for every loan in the arrays at once. Loans where Halley
+    fails to converge to a positive rate fall back to bisection.
+
+    Returns:
+        Annual rate(s), r * payments_per_year. 0 where the payments exactly
+        repay the net amount, and NaN where they repay less (no
+        non-negative rate exists).
+    """
+    payment, principal, years, payments_per_year, fees = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (payment, principal, years, payments_per_year, fees))
+    )
+    n = years * payments_per_year
+    target = (principal - fees) / payment       # required annuity factor
+    count("solve_rate.loans", target.size)
+
+    zero = np.isclose(target, n, rtol=0, atol=1e-12)
+    solvable = (target < n) & (target > 0) & ~zero
+
+    # flat-rate starting point, good for typical loan rates
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(solvable, np.maximum(2 * (n - target) / (target * (n + 1)), 1e-6), 1.0)
+        converged = ~solvable
+        for _ in range(MAX_HALLEY_STEPS):
+            a, a1, a2 = _annuity_factor(r, n)
+            f = a - target
+            step = 2 * f * a1 / (2 * a1 ** 2 - f * a2)
+            r_next = np.where(converged, r, r - step)
+            converged |= np.abs(r_next - r) < RATE_TOLERANCE
+            r = r_next
+            if converged.all():
+                break
+
+        bad = solvable & (~converged | ~np.isfinite(r) | (r <= 0))
+        if bad.any():
+            count("solve_rate.bisection_fallbacks", int(bad.sum()))
+            hi = np.ones_like(r)
+            # widen until the bracket holds the root
+            while np.any(bad & (_annuity_factor(hi, n)[0] > target)):
+                hi = np.where(_annuity_factor(hi, n)[0] > target, hi * 2, hi)
+            r = np.where(bad, _bisect_rate(target, n, np.full_like(r, 1e-15), hi), r)
+
+    annual = np.where(zero, 0.0, np.where(solvable, r * payments_per_year, np.nan))
+    return _out(annual)
+
+
+@traced("solve_principal")
+def solve_principal(
+    payment,
+    annual_rate,
+    years,
+    payments_per_year=12
+):
+    """
+    Largest principal a level payment can amortize (the annuity present
+    value). This inverse is closed form, so no iteration is needed.
+    """
+    r = np.asarray(annual_rate, dtype=float) / payments_per_year
+    n = np.asarray(years) * payments_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(r == 0, n, (1 - (1 + r) ** -n) / r)
+    return _out(payment * factor)
+
+
+@traced("solve_term")
+def solve_term(
+    payment,
+    principal,
+    annual_rate,
+    payments_per_year=12
+):
+    """
+    Number of periods a level payment needs to repay principal.
+
+    Closed form n = -log(1 - P r / payment) / log(1 + r) (P / payment at a
+    zero rate). The result is fractional: the last payment is partial, so
+    round up for a payment count. Infinite where the payment does not
+    cover the first period's interest.
+    """
+    r = np.asarray(annual_rate, dtype=float) / payments_per_year
+    payment = np.asarray(payment, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covered = payment > principal * r
+        n = np.where(
+            r == 0,
+            principal / payment,
+            -np.log1p(-principal * r / payment) / np.log1p(r),
+        )
+        n = np.where(covered, n, np.inf)
+    return _out(n)
@@ -7,7 +7,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         "matplotlib",
-        "python-dateutil",
+        "numpy",
         "mplcursors",
     ],
     entry_points={
@@ -1,5 +1,6 @@
 # tests/test_amort.py
 
+import numpy as np
 import pytest
 from loan_amort.amort import amortize_loan
 
@@ -22,3 +23,63 @@ def test_standard_loan_principal_sum():
     # should fully amortize the $100 principal
     assert total_principal == pytest.approx(100.0, rel=1e-6)
 
+
+def test_portfolio_matches_single_loans():
+    from loan_amort.amort import amortize_portfolio
+
+    principals = [100.0, 250000.0, 1000.0]
+    rates = [0.10, 0.0499, 0.0]
+    years = [1, 30, 2]
+    result = amortize_portfolio(principals, rates, years, payments_per_year=12)
+    assert result["payment"].shape == (3, 360)
+
+    for i in range(3):
+        schedule = amortize_loan(principals[i], rates[i], years[i], payments_per_year=12)
+        n = len(schedule)
+        assert result["num_payments"][i] == n
+        assert result["mask"][i].sum() == n
+        for key in ("payment", "interest", "principal", "balance"):
+            # identical to the cent, not merely close
+            assert np.array_equal(result[key][i, :n], getattr(schedule, key))
+            # padding beyond the term is zero
+            assert not result[key][i, n:].any()
+
+def test_iter_amortization_matches_schedule():
+    import datetime
+    from loan_amort.amort import iter_amortization
+
+    first = datetime.date(2025, 1, 31)
+    schedule = amortize_loan(250000.0, 0.0499, 30, first_payment_date=first)
+    rows = iter_amortization(250000.0, 0.0499, 30, first_payment_date=first)
+    assert not isinstance(rows, list)
+    assert list(rows) == schedule.to_dicts()
+
+
+@pytest.mark.parametrize("rollup, per_year, per_bucket", [
+    ("year", 12, 12), ("quarter", 12, 3), ("year", 365, 365), ("quarter", 52, 13),
+])
+def test_rollup_matches_summed_schedule(rollup, per_year, per_bucket):
+    import datetime
+
+    first = datetime.date(2025, 1, 31)
+    rolled = amortize_loan(250000.0, 0.05, 30, per_year, first, rollup=rollup)
+    full = amortize_loan(250000.0, 0.05, 30, per_year, first)
+    assert len(rolled) == len(full) // per_bucket
+
+    # bucket totals are sums of the printed rows, to the cent
+    for key in ("payment", "interest", "principal"):
+        sums = getattr(full, key).reshape(-1, per_bucket).sum(axis=1)
+        assert np.abs(getattr(rolled, key) - sums).max() < 0.005
+    assert np.array_equal(rolled.balance, full.balance[per_bucket - 1::per_bucket])
+    assert rolled.balance[-1] == 0.0
+    assert (rolled.dates == full.dates[per_bucket - 1::per_bucket]).all()
+
+
+def test_rollup_uneven_buckets_and_errors():
+    # 26 biweekly payments split 7/6/7/6 across quarters
+    rolled = amortize_loan(10000.0, 0.06, 2, 26, rollup="quarter")
+    assert len(rolled) == 8
+    assert sum(rolled.principal) == pytest.approx(10000.0, abs=0.05)
+    assert rolled.balance[-1] == 0.0
+    with pytest.raises(ValueError):
+        amortize_loan(10000.0, 0.06, 2, 12, rollup="week")
@@ -0,0 +1,47 @@
+# tests/test_analytic.py
+
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.analytic import (
+    CENT_TOLERANCE,
+    balance_at,
+    interest_between,
+    loan_metrics_closed_form,
+    cross_check_metrics,
+)
+
+def test_balance_and_interest_match_schedule():
+    schedule = amortize_loan(250000.0, 0.0499, 30, payments_per_year=12)
+    assert balance_at(0, 250000.0, 0.0499, 30) == pytest.approx(250000.0)
+    assert balance_at(120, 250000.0, 0.0499, 30) == pytest.approx(schedule[119]["balance"], abs=0.01)
+    assert balance_at(360, 250000.0, 0.0499, 30) == pytest.approx(0.0, abs=1e-6)
+
+    expected = sum(p["interest"] for p in schedule[12:24])
+    assert interest_between(13, 24, 250000.0, 0.0499, 30) == pytest.approx(expected, abs=0.06)
+
+def test_zero_rate_closed_form():
+    m = loan_metrics_closed_form(1000.0, 0.0, 1, payments_per_year=4)
+    assert m["total_interest"] == 0.0
+    assert m["average_payment"] == 250.0
+    assert balance_at(2, 1000.0, 0.0, 1, payments_per_year=4) == pytest.approx(500.0)
+
+@pytest.mark.parametrize("principal,rate,years,per_year", [
+    (100.0, 0.10, 1, 12),
+    (265000.0, 0.0499, 30, 12),
+    (50000.0, 0.0, 5, 4),
+    (900000.0, 0.0725, 30, 52),
+    (250000.0, 0.05, 30, 365),
+])
+def test_cross_check_within_tolerance(principal, rate, years, per_year):
+    diffs = cross_check_metrics(principal, rate, years, per_year)
+    assert diffs["num_payments"] == 0
+    # the bound is fixed, whatever the number of payments
+    assert max(diffs.values()) <= CENT_TOLERANCE
+
+def test_cross_check_catches_drift(monkeypatch):
+    from loan_amort import analytic
+
+    level = analytic.level_payment
+    monkeypatch.setattr(analytic, "level_payment", lambda *a: level(*a) + 0.0001)
+    with pytest.raises(ValueError, match="total_payment"):
+        cross_check_metrics(265000.0, 0.0499, 30)
@@ -0,0 +1,67 @@
+# tests/test_arm.py
+
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.arm import (
+    amortize_arm,
+    amortize_arm_portfolio,
+    arm_rate_paths,
+    rate_path_from_resets,
+)
+
+def test_constant_rate_matches_fixed_schedule():
+    fixed = amortize_loan(250000.0, 0.05, 30)
+    arm = amortize_arm(250000.0, 30, [(1, 0.05)])
+    for key in ("payment", "interest", "principal", "balance"):
+        assert getattr(arm, key) == pytest.approx(getattr(fixed, key), abs=0.011)
+
+def test_reset_reamortizes_remaining_balance():
+    arm = amortize_arm(250000.0, 30, [(1, 0.05), (61, 0.07)])
+    fixed = amortize_loan(250000.0, 0.05, 30)
+    assert arm[59] == pytest.approx(fixed[59], abs=0.011)
+    assert arm[60]["payment"] > fixed[60]["payment"]
+    assert arm.principal.sum() == pytest.approx(250000.0, abs=0.5)
+    assert arm[-1]["balance"] == 0.0
+
+def test_rate_path_caps_and_floor():
+    index = np.full(120, 0.10)
+    path = arm_rate_paths(120, 0.04, 0.0275, index, fixed_periods=60, reset_every=12,
+                          initial_cap=0.02, periodic_cap=0.01, lifetime_cap=0.05)
+    assert path[59] == 0.04
+    assert path[60] == pytest.approx(0.06)   # initial cap
+    assert path[72] == pytest.approx(0.07)   # periodic cap
+    assert path[108] == pytest.approx(0.09)  # lifetime cap
+    low = arm_rate_paths(72, 0.04, 0.0, np.full(72, -0.01), 60, 12, floor=0.02)
+    assert low[60] == 0.02
+
+def test_portfolio_matches_single_loans():
+    index = np.linspace(0.03, 0.06, 360)
+    margins = np.array([0.0225, 0.0275, 0.03])
+    paths = arm_rate_paths(360, np.array([0.045, 0.05, 0.055]), margins, index,
+                           fixed_periods=60, reset_every=6, periodic_cap=0.01)
+    assert paths.shape == (3, 360)
+    result = amortize_arm_portfolio([100000.0, 250000.0, 400000.0], paths, 30)
+    for i, principal in enumerate([100000.0, 250000.0, 400000.0]):
+        single = amortize_arm(principal, 30, paths[i])
+        for key in ("payment", "interest", "principal", "balance"):
+            assert result[key][i] == pytest.approx(getattr(single, key), abs=0.011)
+
+def test_resets_must_start_at_first_period():
+    with pytest.raises(ValueError):
+        rate_path_from_resets([(13, 0.05)], 360)
+
+def test_ambiguous_rates_rejected():
+    # per-period rates must come as an array, never as a plain list
+    with pytest.raises(ValueError):
+        amortize_arm(1000.0, 1, [0.05] * 12)
+    with pytest.raises(ValueError):
+        amortize_arm(1000.0, 1, [(1.0, 0.05)])
+    with pytest.raises(ValueError):
+        amortize_arm(1000.0, 1, np.array([(1, 0.05), (7, 0.06)]))
+    with pytest.raises(ValueError):
+        rate_path_from_resets([(1, 0.05), (1, 0.06)], 12)
+    with pytest.raises(ValueError):
+        rate_path_from_resets([(1, 0.05), (13, 0.06)], 12)
+    assert np.array_equal(amortize_arm(1000.0, 1, np.full(12, 0.05)).payment,
+                          amortize_arm(1000.0, 1, [(1, 0.05)]).payment)
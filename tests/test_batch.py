@@ -0,0 +1,73 @@
+# tests/test_batch.py
+
+import io
+import pytest
+from loan_amort.analytic import loan_metrics_closed_form
+from loan_amort.batch import read_tape, run_batch
+
+TAPE = """loan_id,principal,rate,years,per_year,first_date
+A,100000,0.05,10,12,2025-01-01
+B,250000,0.0499,30,12,
+C,5000,0,1,4,2025-03-31
+"""
+
+@pytest.fixture
+def tape(tmp_path):
+    path = tmp_path / "tape.csv"
+    path.write_text(TAPE)
+    return str(path)
+
+def test_metrics_output_is_deterministic_across_workers(tape):
+    serial, pooled = io.StringIO(), io.StringIO()
+    assert run_batch(read_tape(tape), serial, workers=1, chunk_size=1) == 3
+    assert run_batch(read_tape(tape), pooled, workers=2, chunk_size=1) == 3
+    assert serial.getvalue() == pooled.getvalue()
+
+    lines = serial.getvalue().splitlines()
+    assert lines[0].startswith("loan_id,num_payments")
+    expected = loan_metrics_closed_form(250000.0, 0.0499, 30)
+    assert lines[2] == "B," + ",".join(str(v) for v in expected.values())
+
+def test_schedule_mode_jsonl(tmp_path):
+    path = tmp_path / "tape.jsonl"
+    path.write_text('{"loan_id": "X", "principal": 1000, "rate": 0.05, "years": 1, "per_year": 4}\n')
+    out = io.StringIO()
+    run_batch(read_tape(str(path)), out, mode="schedule", fmt="ndjson", workers=1)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 4
+    assert all('"loan_id":"X"' in l for l in lines)
+
+def test_bad_record(tmp_path):
+    path = tmp_path / "tape.csv"
+    path.write_text("principal,rate\n1000,0.05\n")
+    with pytest.raises(ValueError):
+        list(read_tape(str(path)))
+
+    path.write_text("principal,rate,years,per_year,first_date\n1000,0.05,1,5,2025-01-01\n")
+    with pytest.raises(ValueError, match="frequency"):
+        list(read_tape(str(path)))
+
+@pytest.mark.parametrize("row", ["1000,0.05,0,12", "1000,0.05,1,0", "1000,0.05,-1,12",
+                                 "nan,0.05,1,12", "-5,0.05,1,12", "1000,inf,1,12"])
+def test_unpriceable_record(tmp_path, row):
+    path = tmp_path / "tape.csv"
+    path.write_text("principal,rate,years,per_year\n" + row + "\n")
+    with pytest.raises(ValueError, match="Bad tape record 1"):
+        list(read_tape(str(path)))
+
+def test_export_batch_formats(tape, tmp_path):
+    from loan_amort.amort import amortize_loan
+    from loan_amort.batch import export_batch
+    from loan_amort.columnar import ColumnarFile
+
+    for workers in (1, 2):
+        path = str(tmp_path / f"book{workers}.lac")
+        assert export_batch(read_tape(tape), path, fmt="columnar", workers=workers, chunk_size=1) == 3
+        book = ColumnarFile(path)
+        assert book.loan_ids == ["A", "B", "C"]
+        assert book.schedule("B").to_dicts() == amortize_loan(250000, 0.0499, 30).to_dicts()
+
+    assert export_batch(read_tape(tape), str(tmp_path / "m.xlsx"), mode="metrics", workers=1) == 3
+    assert export_batch(read_tape(tape), str(tmp_path / "s.xlsx"), workers=1) == 3
+    with pytest.raises(ValueError):
+        export_batch(read_tape(tape), str(tmp_path / "m.lac"), mode="metrics", fmt="columnar")
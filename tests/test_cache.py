@@ -0,0 +1,75 @@
+# tests/test_cache.py
+
+import datetime
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.cache import ScheduleCache
+
+def test_hits_misses_and_lru_eviction():
+    cache = ScheduleCache(maxsize=2)
+    a = cache.get(1000.0, 0.05, 1)
+    assert cache.get(1000.0, 0.05, 1) is a
+    cache.get(2000.0, 0.05, 1)
+    cache.get(1000.0, 0.05, 1)          # refresh a
+    cache.get(3000.0, 0.05, 1)          # evicts the 2000 loan
+    assert cache.stats() == {"hits": 2, "disk_hits": 0, "misses": 3, "size": 2, "maxsize": 2}
+    cache.get(2000.0, 0.05, 1)
+    assert cache.misses == 4
+
+def test_cached_schedule_is_read_only():
+    schedule = ScheduleCache().get(1000.0, 0.05, 1)
+    with pytest.raises(ValueError):
+        schedule.balance[0] = 0.0
+
+def test_disk_store_survives_new_cache(tmp_path):
+    first = datetime.date(2025, 1, 31)
+    ScheduleCache(cache_dir=str(tmp_path)).get(250000.0, 0.05, 30, 12, first)
+
+    cache = ScheduleCache(cache_dir=str(tmp_path))
+    schedule = cache.get(250000.0, 0.05, 30, 12, first)
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.misses == 0
+    assert schedule.to_dicts() == amortize_loan(250000.0, 0.05, 30, 12, first).to_dicts()
+
+def test_holds(tmp_path):
+    cache = ScheduleCache()
+    assert not cache.holds(1000.0, 0.05, 1)
+    cache.get(1000.0, 0.05, 1)
+    assert cache.holds(1000.0, 0.05, 1)
+    ScheduleCache(cache_dir=str(tmp_path)).get(1000.0, 0.05, 1)
+    assert ScheduleCache(cache_dir=str(tmp_path)).holds(1000.0, 0.05, 1)
+
+def test_disk_entries_from_other_versions_are_ignored(tmp_path, monkeypatch):
+    from loan_amort import cache as cache_module
+
+    ScheduleCache(cache_dir=str(tmp_path)).get(1000.0, 0.05, 1)
+    monkeypatch.setattr(cache_module, "CACHE_VERSION", cache_module.CACHE_VERSION + 1)
+    cache = ScheduleCache(cache_dir=str(tmp_path))
+    assert not cache.holds(1000.0, 0.05, 1)
+    cache.get(1000.0, 0.05, 1)
+    assert cache.misses == 1 and cache.disk_hits == 0
+
+    # a file at the current path but written by another version is a miss
+    path = cache._path(cache.key(1000.0, 0.05, 1))
+    with np.load(path) as data:
+        stale = {name: data[name] for name in data.files}
+    stale["version"] = np.array(0)
+    np.savez(path, **stale)
+    assert cache._load(cache.key(1000.0, 0.05, 1)) is None
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage", "empty"])
+def test_corrupt_disk_entries_are_misses(tmp_path, damage):
+    ScheduleCache(cache_dir=str(tmp_path)).get(1000.0, 0.05, 1)
+    cache = ScheduleCache(cache_dir=str(tmp_path))
+    path = cache._path(cache.key(1000.0, 0.05, 1))
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write({"truncate": data[:len(data) // 2], "garbage": b"\x93NUMPY garbage", "empty": b""}[damage])
+
+    schedule = cache.get(1000.0, 0.05, 1)
+    assert cache.misses == 1 and cache.disk_hits == 0
+    assert schedule.to_dicts() == amortize_loan(1000.0, 0.05, 1).to_dicts()
+    # the recomputed schedule replaced the damaged file
+    assert ScheduleCache(cache_dir=str(tmp_path)).get(1000.0, 0.05, 1).to_dicts() == schedule.to_dicts()
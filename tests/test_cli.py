@@ -21,6 +21,16 @@ def run_cmd(args, extra_env=None):
     )
     return result
 
+def run_module(args):
+    # the installed entry point (loan_amort.cli) rather than the legacy script
+    return subprocess.run(
+        [sys.executable, "-m", "loan_amort.cli"] + args,
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        timeout=30,
+    )
+
 def test_amortize_exit_zero():
     res = run_cmd(["amortize", "-P", "1000", "-r", "0.05", "-y", "1", "-k", "4"])
     assert res.returncode == 0
@@ -46,3 +56,81 @@ def test_plot_exit_zero():
     # And stderr should be empty
     assert res.stderr == ""
 
+
+def test_exact_rejects_extra_payments():
+    for extra in (["--extra", "500"], ["--lump-sum", "3:1000"]):
+        res = run_module(["amortize", "-P", "10000", "-r", "0.05", "-y", "1", "--exact"] + extra)
+        assert res.returncode == 2
+        assert "--exact cannot be combined" in res.stderr
+        assert res.stdout == ""
+
+def test_unsupported_frequency_with_dates():
+    for cmd in (["amortize"], ["metrics"], ["plot", "balance_line"]):
+        res = run_module(cmd + ["-P", "1000", "-r", "0.05", "-y", "1", "-k", "5",
+                                "--first-date", "2025-01-01"])
+        assert res.returncode == 2
+        assert "Traceback" not in res.stderr
+        assert len(res.stderr.strip().splitlines()) == 1
+
+def test_plot_needs_first_date(tmp_path):
+    out = tmp_path / "b.png"
+    res = run_module(["plot", "balance_line", "-P", "1000", "-r", "0.05", "-y", "1", "-o", str(out)])
+    assert res.returncode == 2
+    assert "Traceback" not in res.stderr
+    assert len(res.stderr.strip().splitlines()) == 1
+    assert not out.exists()
+
+def test_uncached_amortize_streams_rows(tmp_path):
+    args = ["amortize", "-P", "1000", "-r", "0.05", "-y", "1", "-k", "4"]
+    res = run_module(["--cache-stats"] + args)
+    assert res.returncode == 0
+    assert len(res.stdout.strip().splitlines()) == 1 + 4
+    assert "misses=0" in res.stderr  # rows never went through the cache
+
+    res = run_module(["--cache-dir", str(tmp_path), "--cache-stats"] + args)
+    assert res.returncode == 0
+    assert len(res.stdout.strip().splitlines()) == 1 + 4
+    assert "misses=1" in res.stderr
+
+def test_grid_validates_before_writing(tmp_path):
+    out = tmp_path / "g.csv"
+    res = run_module(["grid", "-P", "1000", "-r", "0.05", "-y", "15,30", "-o", str(out),
+                      "--heatmap", str(tmp_path / "h.png"), "--heatmap-years", "20"])
+    assert res.returncode == 2
+    assert "not in the grid" in res.stderr
+    assert not out.exists()
+
+    res = run_module(["grid", "-P", "1000", "-r", "0.05", "-y", "0,30"])
+    assert res.returncode == 2
+    assert res.stdout == ""
+
+def test_solve_rate_without_solution():
+    res = run_module(["solve", "rate", "--payment", "10", "-P", "1000", "-y", "1"])
+    assert res.returncode == 1
+    assert res.stdout == ""
+    assert "No solution" in res.stderr
+
+def test_as_of_balance_past_maturity():
+    for cmd in ("metrics", "amortize"):
+        res = run_module([cmd, "-P", "300000", "-r", "0.065", "-y", "30", "--first-date", "2010-03-15",
+                          "--as-of", "2051-06-15", "--current-balance", "1000"])
+        assert res.returncode == 2
+        assert res.stdout == ""
+        assert len(res.stderr.strip().splitlines()) == 1
+
+def test_extra_start_outside_term():
+    for start in ("0", "13"):
+        res = run_module(["amortize", "-P", "1000", "-r", "0.05", "-y", "1",
+                          "--extra", "500", "--extra-start", start])
+        assert res.returncode == 2
+        assert res.stdout == ""
+        assert len(res.stderr.strip().splitlines()) == 1
+
+def test_simulate_without_paths_or_loans(tmp_path):
+    tape = tmp_path / "empty.csv"
+    tape.write_text("principal,rate,years\n")
+    for args in (["-P", "1000", "-r", "0.05", "-y", "1", "-n", "0"], ["--tape", str(tape)]):
+        res = run_module(["simulate"] + args)
+        assert res.returncode == 2
+        assert "Traceback" not in res.stderr
+        assert len(res.stderr.strip().splitlines()) == 1
@@ -0,0 +1,29 @@
+# tests/test_columnar.py
+
+import datetime
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.columnar import ColumnarFile, write_columnar
+
+def test_round_trip_with_zero_copy_views(tmp_path):
+    dated = amortize_loan(250000.0, 0.05, 30, 12, datetime.date(2025, 1, 31))
+    undated = amortize_loan(1000.0, 0.05, 1, 4)
+    path = str(tmp_path / "book.lac")
+    assert write_columnar([("A", dated), ("B", undated)], path) == 2
+
+    book = ColumnarFile(path)
+    assert book.loan_ids == ["A", "B"] and "B" in book and len(book) == 2
+    a = book.schedule("A")
+    for col in ("period", "payment", "interest", "principal", "balance", "dates"):
+        np.testing.assert_array_equal(getattr(a, col), getattr(dated, col))
+        assert np.shares_memory(getattr(a, col), book._map)
+    assert not a.balance.flags.writeable
+    assert book.schedule("B").dates is None
+    assert book.schedule("B").to_dicts() == undated.to_dicts()
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.lac"
+    path.write_bytes(b"x" * 128)
+    with pytest.raises(ValueError):
+        ColumnarFile(str(path))
@@ -0,0 +1,45 @@
+# tests/test_exact.py
+
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.exact import (
+    amortize_loan_cents,
+    amortize_portfolio_cents,
+    div_round,
+    to_cents,
+)
+
+def test_div_round_modes():
+    assert [div_round(n, 10, "half_even") for n in (14, 15, 25, 26)] == [1, 2, 2, 3]
+    assert [div_round(n, 10, "half_up") for n in (14, 15, 25, 26)] == [1, 2, 3, 3]
+    arr = div_round(np.array([15, 25], dtype=np.int64), 10, "half_even")
+    assert arr.tolist() == [2, 2]
+    with pytest.raises(ValueError):
+        div_round(1, 2, "up")
+
+@pytest.mark.parametrize("rounding", ["half_even", "half_up"])
+def test_principal_reconciles_exactly(rounding):
+    schedule = amortize_loan_cents(265000.0, 0.0499, 30, rounding=rounding)
+    principal = to_cents(schedule.principal)
+    assert principal.sum() == 26500000
+    balance = to_cents(schedule.balance)
+    assert (np.diff(balance) == -principal[1:]).all()
+    assert (to_cents(schedule.payment) == to_cents(schedule.interest) + principal).all()
+    # the cent-rounded level payment drifts from the float path by at most
+    # about a cent per period, absorbed by the final payment
+    floats = amortize_loan(265000.0, 0.0499, 30)
+    assert np.abs(schedule.balance - floats.balance).max() < 0.01 * len(schedule)
+
+def test_portfolio_matches_single_loans():
+    principals = [100.0, 265000.0, 5000.0]
+    rates = [0.10, 0.0499, 0.0]
+    years = [1, 30, 2]
+    result = amortize_portfolio_cents(principals, rates, years, rounding="half_up")
+    assert result["payment"].dtype == np.int64
+    for i in range(3):
+        single = amortize_loan_cents(principals[i], rates[i], years[i], rounding="half_up")
+        n = len(single)
+        for key in ("payment", "interest", "principal", "balance"):
+            assert result[key][i, :n].tolist() == to_cents(getattr(single, key)).tolist()
+        assert result["principal"][i].sum() == to_cents(principals[i])
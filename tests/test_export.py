@@ -0,0 +1,73 @@
+# tests/test_export.py
+
+import io
+import json
+import pytest
+from loan_amort.amort import iter_amortization
+from loan_amort import export
+from loan_amort.export import write_schedule
+
+def test_csv_and_ndjson_round_trip(monkeypatch):
+    # force several chunks so the buffering path is exercised
+    monkeypatch.setattr(export, "CHUNK_ROWS", 7)
+
+    out = io.StringIO()
+    count = write_schedule(iter_amortization(1000.0, 0.05, 2), out, fmt="csv")
+    lines = out.getvalue().splitlines()
+    assert count == 24
+    assert lines[0] == "period,payment,interest,principal,balance"
+    assert len(lines) == 1 + 24
+
+    out = io.StringIO()
+    write_schedule(iter_amortization(1000.0, 0.05, 2), out, fmt="ndjson")
+    rows = [json.loads(l) for l in out.getvalue().splitlines()]
+    assert [r["period"] for r in rows] == list(range(1, 25))
+    assert rows[-1]["balance"] == 0.0
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write_schedule([], io.StringIO(), fmt="xml")
+
+def _sheet_rows(path, sheet=1):
+    import xml.etree.ElementTree as ET
+    import zipfile
+    ns = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    with zipfile.ZipFile(path) as z:
+        root = ET.fromstring(z.read(f"xl/worksheets/sheet{sheet}.xml"))
+        names = z.namelist()
+    rows = [[c.findtext("m:v", namespaces=ns) or c.findtext("m:is/m:t", namespaces=ns)
+             for c in row] for row in root.iter(f"{{{ns['m']}}}row")]
+    return rows, names
+
+def test_xlsx_schedule(tmp_path):
+    import datetime
+    from loan_amort.amort import amortize_loan
+
+    schedule = amortize_loan(1000.0, 0.05, 1, 4, datetime.date(2025, 1, 31))
+    path = str(tmp_path / "s.xlsx")
+    assert export.export_schedule(schedule, path) == 4
+    rows, names = _sheet_rows(path)
+    assert "xl/styles.xml" in names and "[Content_Types].xml" in names
+    assert rows[0] == ["period", "date", "payment", "interest", "principal", "balance"]
+    assert len(rows) == 5
+    # Excel serial date for 2025-01-31
+    assert rows[1][:3] == ["1", "45688", "257.86"]
+    assert rows[-1][-1] == "0.0"
+
+def test_xlsx_rolls_over_to_new_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "XLSX_MAX_ROWS", 10)
+    path = str(tmp_path / "big.xlsx")
+    with export.XlsxWriter(path, ["id", "note"], ["int", "text"]) as xlsx:
+        assert xlsx.write_rows((i, "a<b" if i % 2 else None) for i in range(25)) == 25
+    first, names = _sheet_rows(path, 1)
+    third, _ = _sheet_rows(path, 3)
+    assert "xl/worksheets/sheet3.xml" in names
+    assert len(first) == 10 and first[0] == ["id", "note"] and first[2] == ["1", "a<b"]
+    assert third[-1] == ["24"]
+
+def test_format_for_path():
+    assert export.format_for_path("x/out.JSONL") == "ndjson"
+    assert export.format_for_path("out.lac") == "columnar"
+    assert export.format_for_path("out.txt", "csv") == "csv"
+    with pytest.raises(ValueError):
+        export.format_for_path("out.txt")
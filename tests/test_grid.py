@@ -0,0 +1,52 @@
+# tests/test_grid.py
+
+import io
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.analytic import loan_metrics_closed_form
+from loan_amort.grid import evaluate_grid, write_grid_csv
+from loan_amort.metrics import compute_loan_metrics
+
+def test_grid_cells_match_single_loan_metrics():
+    grid = evaluate_grid([100000.0, 250000.0], [0.0, 0.035, 0.0499], [10, 30])
+    assert grid["payment"].shape == (2, 3, 2)
+    for i, p in enumerate(grid["principal"]):
+        for j, r in enumerate(grid["rate"]):
+            for k, y in enumerate(grid["years"]):
+                m = loan_metrics_closed_form(p, r, int(y))
+                assert round(grid["total_interest"][i, j, k], 2) == m["total_interest"]
+                assert round(grid["payment"][i, j, k], 2) == m["average_payment"]
+
+def test_first_year_interest_matches_schedule():
+    grid = evaluate_grid(250000.0, 0.05, 30)
+    rows = amortize_loan(250000.0, 0.05, 30)[:12]
+    assert grid["first_year_interest"][0, 0, 0] == pytest.approx(compute_loan_metrics(rows)["total_interest"], abs=0.06)
+
+def test_csv_rows():
+    grid = evaluate_grid([1000.0, 2000.0], [0.05], [1, 2, 3])
+    out = io.StringIO()
+    assert write_grid_csv(grid, out) == 6
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("principal,rate,years,payment")
+    assert lines[1].startswith("1000.00,0.05,1,85.61,")
+    assert lines[-1].startswith("2000.00,0.05,3,")
+
+def test_rejects_non_positive_terms():
+    with pytest.raises(ValueError):
+        evaluate_grid(1000.0, 0.05, [0, 30])
+    with pytest.raises(ValueError):
+        evaluate_grid(1000.0, 0.05, 30, payments_per_year=0)
+
+def test_heatmap():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from loan_amort.plots import plot_grid_heatmap
+
+    grid = evaluate_grid(np.linspace(1e5, 5e5, 5), np.linspace(0.02, 0.08, 7), [15, 30])
+    fig = plot_grid_heatmap(grid, "total_interest", years=30)
+    assert "30-Year" in fig.axes[0].get_title()
+    plt.close(fig)
+    with pytest.raises(ValueError):
+        plot_grid_heatmap(grid, years=20)
@@ -0,0 +1,13 @@
+# tests/test_metrics.py
+
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.metrics import compute_loan_metrics
+
+def test_metrics_accept_schedule_and_rows():
+    schedule = amortize_loan(250000.0, 0.05, 30, payments_per_year=12)
+    from_columns = compute_loan_metrics(schedule)
+    from_rows = compute_loan_metrics(schedule.to_dicts())
+    assert from_columns == from_rows
+    assert from_columns["num_payments"] == 360
+    assert from_columns["total_principal"] == pytest.approx(250000.0, abs=0.5)
@@ -0,0 +1,47 @@
+# tests/test_paydates.py
+
+import datetime
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort.paydates import payment_dates, supports_frequency
+
+def _iso(dates):
+    return [str(d) for d in dates]
+
+def test_monthly_clamps_to_month_end():
+    dates = payment_dates(datetime.date(2024, 1, 31), 12, 4)
+    assert _iso(dates) == ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"]
+
+def test_quarterly():
+    dates = payment_dates(datetime.date(2025, 11, 30), 4, 3)
+    assert _iso(dates) == ["2025-11-30", "2026-02-28", "2026-05-30"]
+
+@pytest.mark.parametrize("per_year,step", [(26, 14), (52, 7)])
+def test_weekly_frequencies_do_not_collapse(per_year, step):
+    dates = payment_dates(datetime.date(2025, 1, 3), per_year, per_year)
+    assert len(set(dates.tolist())) == per_year
+    assert (np.diff(dates).astype(int) == step).all()
+
+def test_semi_monthly():
+    dates = payment_dates(datetime.date(2025, 1, 15), 24, 4)
+    assert _iso(dates) == ["2025-01-15", "2025-01-30", "2025-02-15", "2025-02-28"]
+    dates = payment_dates(datetime.date(2025, 1, 20), 24, 3)
+    assert _iso(dates) == ["2025-01-20", "2025-02-05", "2025-02-20"]
+
+def test_calendar_is_memoized_and_read_only():
+    a = payment_dates(datetime.date(2025, 1, 1), 12, 360)
+    b = payment_dates(datetime.date(2025, 1, 1), 12, 360)
+    assert a is b
+    assert not a.flags.writeable
+
+def test_unsupported_frequency():
+    with pytest.raises(ValueError):
+        payment_dates(datetime.date(2025, 1, 1), 5, 5)
+    assert not supports_frequency(5)
+    assert all(supports_frequency(k) for k in (1, 2, 4, 12, 24, 26, 52, 365))
+
+def test_biweekly_schedule_dates():
+    schedule = amortize_loan(10000.0, 0.05, 1, payments_per_year=26,
+                             first_payment_date=datetime.date(2025, 1, 3))
+    assert schedule[1]["date"] == "2025-01-17"
@@ -0,0 +1,106 @@
+# tests/test_plots.py
+
+import datetime
+import matplotlib
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan
+from loan_amort import plots
+
+@pytest.fixture
+def schedule():
+    return amortize_loan(100000.0, 0.05, 10, payments_per_year=12,
+                         first_payment_date=datetime.date(2025, 1, 1))
+
+@pytest.mark.parametrize("builder", [
+    plots.plot_balance_line,
+    plots.plot_interest_principal_line,
+    plots.plot_interest_principal_stacked,
+    plots.plot_cumulative_line,
+    plots.plot_balance_bar,
+])
+def test_builders_accept_schedule_and_rows(schedule, builder):
+    for data in (schedule, schedule.to_dicts()):
+        fig = builder(data)
+        assert fig.axes
+        plt.close(fig)
+
+def test_nearest_index_bisects():
+    xs = np.array([0.0, 10.0, 20.0, 30.0])
+    assert [plots._nearest_index(xs, x) for x in (-5, 4, 6, 29, 99)] == [0, 0, 1, 3, 3]
+
+def test_lttb_keeps_endpoints_and_peak():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[517] = 50.0
+    idx = plots.lttb_indices(x, y, 20)
+    assert len(idx) == 20
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 517 in idx
+    assert (np.diff(idx) > 0).all()
+
+def test_downsampled_hover_uses_full_resolution(schedule):
+    from matplotlib.backend_bases import MouseEvent
+
+    fig = plots.plot_balance_line(schedule, max_points=20, interactive=True)
+    ax = fig.axes[0]
+    assert len(ax.lines[0].get_xdata()) <= 20
+
+    fig.canvas.draw()
+    xs = plots.mdates.date2num(schedule.dates)
+    x, y = ax.transData.transform((xs[37], schedule.balance[37]))
+    fig.canvas.callbacks.process(
+        "motion_notify_event", MouseEvent("motion_notify_event", fig.canvas, x, y)
+    )
+    annot = ax.texts[0]
+    assert annot.get_visible()
+    assert str(schedule.dates[37]) in annot.get_text()
+    assert f"{schedule.balance[37]:,.2f}" in annot.get_text()
+    plt.close(fig)
+
+def test_reused_axes_and_headless_builders(schedule):
+    fig, ax = plt.subplots()
+    for _ in range(3):
+        assert plots.plot_cumulative_line(schedule, ax=ax) is fig
+    # no hover markers are added on a non-GUI backend
+    assert len(ax.lines) == 2
+    assert not ax.texts
+    plt.close(fig)
+
+def test_render_charts_reuses_figures(tmp_path):
+    from loan_amort.render import render_charts
+
+    loans = [
+        {"loan_id": f"L{i}", "principal": 1000.0 * (i + 1), "rate": 0.05, "years": 2,
+         "per_year": 12, "first_date": datetime.date(2025, 1, 1)}
+        for i in range(3)
+    ]
+    before = len(plt.get_fignums())
+    count = render_charts(loans, str(tmp_path), charts=["balance_line"], fmt="svg",
+                          workers=1, progress=False)
+    assert count == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "L0_balance_line.svg", "L1_balance_line.svg", "L2_balance_line.svg"]
+    assert len(plt.get_fignums()) - before <= 1
+
+def test_render_sanitizes_loan_ids(tmp_path):
+    from loan_amort.render import render_charts
+
+    def loan(loan_id):
+        return {"loan_id": loan_id, "principal": 1000.0, "rate": 0.05, "years": 1,
+                "per_year": 12, "first_date": datetime.date(2025, 1, 1)}
+
+    out = tmp_path / "out"
+    render_charts([loan("../evil"), loan("a/b")], str(out), charts=["balance_line"],
+                  fmt="svg", workers=1, progress=False)
+    assert sorted(p.name for p in out.iterdir()) == [
+        ".._evil_balance_line.svg", "a_b_balance_line.svg"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out"]
+
+    for loans in ([loan("")], [loan("a/b"), loan("a_b")]):
+        with pytest.raises(ValueError):
+            render_charts(loans, str(out), charts=["balance_line"], fmt="svg",
+                          workers=1, progress=False)
@@ -0,0 +1,80 @@
+# tests/test_pool.py
+
+import datetime
+import numpy as np
+import pytest
+from loan_amort.amort import amortize_loan, amortize_portfolio
+from loan_amort.pool import PoolCashFlows, aggregate_tape
+
+LOANS = [
+    {"loan_id": "a", "principal": 250000.0, "rate": 0.05, "years": 30, "per_year": 12,
+     "first_date": datetime.date(2025, 1, 1)},
+    {"loan_id": "b", "principal": 100000.0, "rate": 0.04, "years": 15, "per_year": 12,
+     "first_date": datetime.date(2024, 11, 15)},
+    {"loan_id": "c", "principal": 50000.0, "rate": 0.07, "years": 5, "per_year": 4,
+     "first_date": datetime.date(2025, 2, 1)},
+    {"loan_id": "d", "principal": 20000.0, "rate": 0.06, "years": 2, "per_year": 26,
+     "first_date": datetime.date(2025, 1, 10)},
+]
+
+def _schedule(loan):
+    return amortize_loan(loan["principal"], loan["rate"], loan["years"],
+                         loan["per_year"], loan["first_date"])
+
+def test_streamed_pool_matches_per_schedule_pool():
+    by_schedule = PoolCashFlows()
+    for loan in LOANS:
+        by_schedule.add_schedule(_schedule(loan), loan["rate"], loan["per_year"], loan["principal"])
+
+    for chunk_size in (1, 3, 1000):
+        streamed = aggregate_tape(iter(LOANS), chunk_size=chunk_size)
+        assert streamed.months[0] == np.datetime64("2024-11")
+        assert np.array_equal(streamed.months, by_schedule.months)
+        np.testing.assert_allclose(streamed.interest, by_schedule.interest, atol=1e-6)
+        np.testing.assert_allclose(streamed.principal, by_schedule.principal, atol=1e-6)
+        assert streamed.metrics() == by_schedule.metrics()
+
+def test_buckets_conserve_cash_flows():
+    pool = aggregate_tape(LOANS)
+    total_interest = sum(_schedule(l).interest.sum() for l in LOANS)
+    assert pool.interest.sum() == pytest.approx(total_interest, abs=0.01)
+    # rounded principal columns drift from the face amount by under a cent a period
+    assert pool.principal.sum() == pytest.approx(420000.0, abs=1.0)
+    assert pool.balance[-1] == pytest.approx(0.0, abs=1.0)
+    schedule = pool.to_schedule()
+    assert len(schedule) == len(pool.months)
+
+def test_portfolio_keeps_original_principals():
+    principals = np.array([1000.01, 333.33, 500.0])
+    rates = np.array([0.0499, 0.07, 0.05])
+    years = np.array([1, 3, 0])   # the last loan has no periods
+    pool = PoolCashFlows()
+    pool.add_portfolio(amortize_portfolio(principals, rates, years), principals, rates,
+                       datetime.date(2025, 1, 1))
+    m = pool.metrics()
+    assert m["num_loans"] == 3
+    assert m["total_principal"] == round(principals.sum(), 2)
+    assert m["wac"] == round(float((principals * rates).sum() / principals.sum()), 6)
+
+def test_single_loan_metrics():
+    m = aggregate_tape(LOANS[:1]).metrics()
+    assert m["num_loans"] == 1
+    assert m["wac"] == 0.05
+    assert m["wam"] == 360
+    # principal is back-loaded: WAL sits past the midpoint of the term
+    assert 15 < m["wal"] < 30
+    assert 0 < m["modified_duration"] < m["macaulay_duration"] < m["wal"]
+
+def test_missing_first_date_rejected():
+    with pytest.raises(ValueError):
+        aggregate_tape([dict(LOANS[0], first_date=None)])
+
+def test_pool_chart():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from loan_amort.plots import plot_pool_cash_flows
+
+    fig = plot_pool_cash_flows(aggregate_tape(LOANS).to_schedule())
+    assert len(fig.axes) == 2
+    plt.close(fig)
@@ -0,0 +1,68 @@
+# tests/test_prepay.py
+
+import datetime
+import numpy as np
+import pytest
+from loan_amort import profiling
+from loan_amort.amort import amortize_loan
+from loan_amort.prepay import PrepaymentScenario, amortize_with_extra, build_extra
+
+def test_no_extra_matches_amortize_loan():
+    first = datetime.date(2025, 1, 1)
+    base = amortize_loan(250000.0, 0.05, 30, first_payment_date=first)
+    scenario = PrepaymentScenario(250000.0, 0.05, 30, first_payment_date=first).schedule()
+    assert len(scenario) == len(base)
+    for key in ("payment", "interest", "principal", "balance"):
+        assert getattr(scenario, key) == pytest.approx(getattr(base, key), abs=0.011)
+    assert (scenario.dates == base.dates).all()
+
+def test_recurring_extra_shortens_term():
+    schedule = amortize_with_extra(250000.0, 0.05, 30, recurring=500.0, start=37)
+    assert len(schedule) < 360
+    assert schedule.principal.sum() == pytest.approx(250000.0, abs=0.5)
+    assert schedule[-1]["balance"] == 0.0
+    assert schedule[36]["payment"] == pytest.approx(schedule[35]["payment"] + 500.0, abs=0.01)
+
+def test_incremental_matches_full_recompute():
+    base = PrepaymentScenario(250000.0, 0.05, 30)
+    profiling.enable()
+    try:
+        profiling.reset()
+        changed = base.add_recurring(500.0, start=37).add_lump_sum(120, 20000.0)
+        recomputed = profiling.summary()
+    finally:
+        profiling.disable()
+        profiling.reset()
+
+    full = PrepaymentScenario(250000.0, 0.05, 30, extra=changed.extra)
+    assert changed.num_payments == full.num_payments
+    assert np.allclose(changed._balance, full._balance)
+    assert changed.total_interest == pytest.approx(full.total_interest)
+    # the prefix before each change was reused, not recomputed
+    assert recomputed["prepay.recompute"]["calls"] == 2
+
+def test_lump_sum_can_pay_off_loan():
+    scenario = PrepaymentScenario(10000.0, 0.05, 5).add_lump_sum(12, 1e9)
+    assert scenario.num_payments == 12
+    assert scenario.schedule().principal.sum() == pytest.approx(10000.0, abs=0.01)
+
+def test_lump_sum_outside_term():
+    with pytest.raises(ValueError):
+        PrepaymentScenario(10000.0, 0.05, 1).add_lump_sum(13, 100.0)
+
+@pytest.mark.parametrize("kwargs", [
+    {"recurring": 100.0, "start": 0},
+    {"recurring": 100.0, "start": 13},
+    {"recurring": 100.0, "start": 6, "end": 5},
+    {"recurring": 100.0, "end": 13},
+    {"recurring": -100.0},
+    {"lump_sums": {3: -500.0}},
+])
+def test_build_extra_rejects_bad_input(kwargs):
+    with pytest.raises(ValueError):
+        build_extra(12, **kwargs)
+
+def test_recurring_extra_covers_its_periods():
+    extra = build_extra(12, 100.0, start=3, end=5)
+    assert extra.tolist() == [0, 0, 100, 100, 100] + [0] * 7
+    assert build_extra(12, 100.0).tolist() == [100.0] * 12
@@ -0,0 +1,45 @@
+# tests/test_profiling.py
+
+import json
+import pytest
+from loan_amort import profiling
+from loan_amort.amort import amortize_loan
+from loan_amort.metrics import compute_loan_metrics
+
+@pytest.fixture(autouse=True)
+def clean_profiler():
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+def test_disabled_records_nothing():
+    assert profiling.span("a") is profiling.span("b")
+    compute_loan_metrics(amortize_loan(1000.0, 0.05, 1))
+    assert not profiling.summary()
+
+def test_enabled_spans_counters_and_trace(tmp_path):
+    profiling.enable()
+    compute_loan_metrics(amortize_loan(1000.0, 0.05, 2))
+    stats = profiling.summary()
+    assert {"amortize_loan", "amortize_loan.recurrence", "compute_loan_metrics"} <= set(stats)
+    assert stats["amortize_loan"]["calls"] == 1
+    assert "amortize_loan.periods" in profiling.report()
+
+    path = tmp_path / "trace.json"
+    profiling.export_chrome_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert any(e["name"] == "amortize_loan" and e["ph"] == "X" for e in events)
+    assert any(e["name"] == "amortize_loan.periods" and e["args"]["value"] == 24 for e in events)
+
+def test_trace_spans_are_bounded(monkeypatch):
+    from collections import deque
+
+    monkeypatch.setattr(profiling, "_spans", deque(maxlen=5))
+    profiling.enable()
+    for _ in range(20):
+        with profiling.span("step"):
+            pass
+    assert len(profiling._spans) == 5
+    # totals still count every call
+    assert profiling.summary()["step"]["calls"] == 20
@@ -0,0 +1,73 @@
+# tests/test_refi.py
+
+import numpy as np
+import pytest
+
+from loan_amort.amort import amortize_loan
+from loan_amort.refi import NEVER, analyze_refi, rank_offers, read_offers
+
+
+def _first_crossing(balance, rate, remaining, offer_rate, offer_years, costs):
+    # reference: scan the cumulative interest saved on two full schedules
+    old = amortize_loan(balance, rate, remaining // 12)
+    new = amortize_loan(balance, offer_rate, offer_years)
+    periods = max(len(old), len(new))
+    saved = np.zeros(periods)
+    saved[:len(old)] += np.asarray(old.interest)
+    saved[:len(new)] -= np.asarray(new.interest)
+    hits = np.nonzero(np.cumsum(saved)[:remaining] >= costs)[0]
+    return hits[0] + 1 if len(hits) else NEVER
+
+
+def test_refi_matches_schedules():
+    balances = [250000.0, 90000.0]
+    rates = [0.07, 0.045]
+    remaining = [300, 120]
+    offer_rates = [0.055, 0.05, 0.075, 0.04]
+    offer_years = [30, 15, 10, 20]
+    costs = [6000.0, 4000.0, 0.0, 3000.0]
+    result = analyze_refi(balances, rates, remaining, offer_rates, offer_years, costs)
+    assert result["new_payment"].shape == (2, 4)
+
+    for i in range(2):
+        old = amortize_loan(balances[i], rates[i], remaining[i] // 12)
+        for j in range(4):
+            new = amortize_loan(balances[i], offer_rates[j], offer_years[j])
+            assert result["new_payment"][i, j] == pytest.approx(new.payment[0], abs=0.01)
+            assert result["interest_saved"][i, j] == pytest.approx(
+                sum(old.interest) - sum(new.interest), abs=0.01 * len(new))
+            expected = _first_crossing(balances[i], rates[i], remaining[i],
+                                       offer_rates[j], offer_years[j], costs[j])
+            # rounded schedule rows may move a near-tie by a period
+            assert abs(result["break_even"][i, j] - expected) <= (0 if expected == NEVER else 1)
+
+
+def test_break_even_after_savings_peak():
+    # a longer, cheaper loan saves interest at first, then costs more once
+    # the old loan would have been nearly paid off
+    result = analyze_refi(100000.0, 0.06, 60, [0.05, 0.05], [30, 30], [200.0, 1000.0])
+    assert result["interest_saved"][0, 0] < 0
+    assert result["break_even"][0, 0] == _first_crossing(100000.0, 0.06, 60, 0.05, 30, 200.0)
+    assert result["break_even"][0, 1] == NEVER
+
+
+def test_rank_offers(tmp_path):
+    path = tmp_path / "offers.csv"
+    path.write_text("rate,years,closing_costs,offer_id\n0.06,30,0,A\n0.04,15,5000,B\n0.05,30,2000,C\n")
+    offers = read_offers(str(path))
+    result = analyze_refi([200000.0], [0.065], [348],
+                          [o["rate"] for o in offers], [o["years"] for o in offers],
+                          [o["closing_costs"] for o in offers])
+    ranked = rank_offers(result, ["L1"], [o["offer_id"] for o in offers], top=2)
+    assert [r["offer_id"] for r in ranked] == ["B", "C"]
+    assert [r["rank"] for r in ranked] == [1, 2]
+    assert ranked[0]["net_savings"] >= ranked[1]["net_savings"]
+    assert ranked[0]["periodic_savings"] == pytest.approx(ranked[0]["payment"] - ranked[0]["new_payment"])
+
+def test_savings_are_per_payment_period():
+    # biweekly loan: the saving is per biweekly payment, not per month
+    result = analyze_refi(100000.0, 0.06, 26 * 20, 0.05, 20, payments_per_year=26)
+    old = amortize_loan(100000.0, 0.06, 20, 26)
+    new = amortize_loan(100000.0, 0.05, 20, 26)
+    assert "monthly_savings" not in result
+    assert result["periodic_savings"][0, 0] == pytest.approx(old.payment[0] - new.payment[0], abs=0.01)
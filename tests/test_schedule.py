@@ -0,0 +1,22 @@
+# tests/test_schedule.py
+
+import datetime
+from loan_amort.amort import amortize_loan
+from loan_amort.schedule import Schedule
+
+def test_row_view_is_backward_compatible():
+    schedule = amortize_loan(1000.0, 0.05, 1, payments_per_year=4,
+                             first_payment_date=datetime.date(2025, 1, 31))
+    rows = schedule.to_dicts()
+    assert len(rows) == len(schedule) == 4
+    assert rows[0] == schedule[0]
+    assert set(rows[0]) == {"period", "payment", "interest", "principal", "balance", "date"}
+    assert rows[-1]["date"] == "2025-10-31"
+    assert schedule[-1]["balance"] == 0.0
+
+def test_from_rows_round_trip():
+    schedule = amortize_loan(1000.0, 0.05, 1, payments_per_year=12,
+                             first_payment_date=datetime.date(2025, 1, 1))
+    rebuilt = Schedule.from_rows(schedule.to_dicts())
+    assert rebuilt.to_dicts() == schedule.to_dicts()
+    assert rebuilt.dates.dtype.kind == "M"
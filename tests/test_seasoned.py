@@ -0,0 +1,62 @@
+# tests/test_seasoned.py
+
+import datetime
+
+import numpy as np
+import pytest
+
+from loan_amort.amort import amortize_loan
+from loan_amort.metrics import compute_loan_metrics
+from loan_amort.seasoned import amortize_as_of, payments_made, remaining_metrics
+
+FIRST = datetime.date(2010, 3, 15)
+
+
+@pytest.mark.parametrize("rate, years, per_year", [(0.065, 30, 12), (0.0, 10, 12), (0.05, 20, 26)])
+def test_as_of_matches_tail_of_full_schedule(rate, years, per_year):
+    full = amortize_loan(300000.0, rate, years, per_year, FIRST)
+    seasoned = amortize_as_of(300000.0, rate, years, per_year, FIRST, as_of=datetime.date(2016, 7, 1))
+    paid = int(seasoned.period[0]) - 1
+    assert full.dates[paid - 1] < np.datetime64("2016-07-01") <= full.dates[paid]
+    assert len(seasoned) == len(full) - paid
+    assert (seasoned.dates == full.dates[paid:]).all()
+    for column in ("payment", "interest", "principal", "balance"):
+        np.testing.assert_allclose(getattr(seasoned, column), getattr(full, column)[paid:], atol=0.01)
+
+
+def test_payment_due_on_as_of_is_outstanding():
+    assert payments_made(FIRST, datetime.date(2010, 3, 15), 12, 360) == 0
+    assert payments_made(FIRST, datetime.date(2010, 3, 16), 12, 360) == 1
+    assert len(amortize_as_of(1000.0, 0.05, 1, 12, FIRST, as_of=datetime.date(2030, 1, 1))) == 0
+
+
+def test_current_balance_is_reamortized():
+    schedule = amortize_as_of(300000.0, 0.065, 30, paid=60, current_balance=250000.0)
+    assert schedule.period[0] == 61 and schedule.period[-1] == 360
+    assert schedule.balance[-1] == 0.0
+    assert sum(schedule.principal) == pytest.approx(250000.0, abs=0.05)
+    with pytest.raises(ValueError):
+        amortize_as_of(300000.0, 0.065, 30, as_of=datetime.date(2016, 7, 1))
+
+
+def test_remaining_metrics_match_rows():
+    as_of = datetime.date(2018, 1, 1)
+    metrics = remaining_metrics(300000.0, 0.065, 30, 12, FIRST, as_of=as_of)
+    schedule = amortize_as_of(300000.0, 0.065, 30, 12, FIRST, as_of=as_of)
+    summed = compute_loan_metrics(schedule)
+    assert metrics["num_payments"] == summed["num_payments"]
+    assert metrics["total_interest"] == pytest.approx(summed["total_interest"], abs=0.005 * len(schedule) + 0.01)
+    assert metrics["current_balance"] == pytest.approx(schedule.balance[0] + schedule.principal[0], abs=0.01)
+    wal = (np.arange(1, len(schedule) + 1) * schedule.principal).sum() / schedule.principal.sum() / 12
+    assert metrics["wal"] == pytest.approx(wal, abs=1e-3)
+    assert metrics["next_payment_date"] == str(schedule.dates[0])
+    assert metrics["maturity_date"] == "2040-02-15"
+
+
+def test_balance_past_maturity_rejected():
+    as_of = datetime.date(2041, 6, 15)
+    with pytest.raises(ValueError):
+        remaining_metrics(300000.0, 0.065, 30, 12, FIRST, as_of=as_of, current_balance=1000.0)
+    with pytest.raises(ValueError):
+        amortize_as_of(300000.0, 0.065, 30, 12, FIRST, as_of=as_of, current_balance=1000.0)
+    assert remaining_metrics(300000.0, 0.065, 30, 12, FIRST, as_of=as_of)["num_payments"] == 0
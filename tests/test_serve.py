@@ -0,0 +1,120 @@
+# tests/test_serve.py
+
+import asyncio
+import json
+from loan_amort.analytic import loan_metrics_closed_form
+from loan_amort.amort import amortize_loan
+from loan_amort.loadgen import _client, _payloads
+from loan_amort.serve import LoanService
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response = await reader.read()
+    writer.close()
+    return status, json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+def _with_service(scenario, **kwargs):
+    async def main():
+        service = LoanService(**kwargs)
+        port = await service.start("127.0.0.1", 0)
+        try:
+            return await scenario(service, port)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+def test_endpoints():
+    async def scenario(service, port):
+        status, metrics = await _request(port, "POST", "/metrics",
+                                         {"principal": 250000, "rate": 0.05, "years": 30})
+        assert status == 200
+        expected = loan_metrics_closed_form(250000, 0.05, 30)
+        assert {k: metrics[k] for k in expected} == expected
+
+        loan = {"loan_id": "x", "principal": 1000, "rate": 0.05, "years": 1,
+                "per_year": 4, "first_date": "2025-01-31"}
+        status, [result] = await _request(port, "POST", "/amortize", [loan])
+        assert status == 200 and result["loan_id"] == "x"
+        expected_rows = list(amortize_loan(1000, 0.05, 1, 4))
+        assert [r["balance"] for r in result["schedule"]] == [r["balance"] for r in expected_rows]
+        assert result["schedule"][1]["date"] == "2025-04-30"
+
+        assert (await _request(port, "POST", "/metrics", {"rate": 0.05}))[0] == 400
+        assert (await _request(port, "GET", "/metrics"))[0] == 405
+        assert (await _request(port, "GET", "/nope"))[0] == 404
+        status, stats = await _request(port, "GET", "/stats")
+        assert status == 200 and stats["requests"] == 5 and stats["errors"] == 3
+    _with_service(scenario)
+
+def test_concurrent_requests_are_micro_batched():
+    async def scenario(service, port):
+        latencies, errors = [], []
+        bodies = _payloads(400)
+        await asyncio.gather(*(
+            _client("127.0.0.1", port, "/metrics", bodies[i::20], latencies, errors)
+            for i in range(20)
+        ))
+        assert len(latencies) == 400 and not errors
+        assert service.stats.loans == 400
+        assert service.stats.batches < 400
+    _with_service(scenario, max_delay=0.01)
+
+def test_bad_requests_get_400():
+    async def scenario(service, port):
+        good = {"principal": 1000, "rate": 0.05, "years": 1, "first_date": "2025-01-01"}
+        bad_bodies = [
+            "abc",
+            [1, 2],
+            {"principal": 1000, "rate": 0.05, "years": 0},
+            {"principal": -5, "rate": 0.05, "years": 1},
+            dict(good, per_year=5),
+        ]
+        for body in bad_bodies:
+            status, payload = await _request(port, "POST", "/metrics", body)
+            assert status == 400 and "error" in payload
+        ok, bad = await asyncio.gather(
+            _request(port, "POST", "/amortize", good),
+            _request(port, "POST", "/amortize", dict(good, per_year=5)),
+        )
+        assert ok[0] == 200 and bad[0] == 400
+        status, stats = await _request(port, "GET", "/stats")
+        assert stats["errors"] == len(bad_bodies) + 1
+    _with_service(scenario)
+
+def test_failed_batch_only_fails_the_bad_request(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from loan_amort import serve
+
+    def evaluate(kind, chunk):
+        if any(loan.get("bad") for loan in chunk):
+            raise ValueError("bad loan")
+        return [loan["loan_id"] for loan in chunk]
+    monkeypatch.setattr(serve, "evaluate_batch", evaluate)
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            batcher = serve.MicroBatcher("metrics", executor, serve.ServiceStats(), max_delay=0.05)
+            batcher.start()
+            try:
+                return await asyncio.gather(
+                    batcher.submit([{"loan_id": "a"}]),
+                    batcher.submit([{"loan_id": "b", "bad": True}]),
+                    batcher.submit([{"loan_id": "c"}]),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.stop()
+    a, b, c = asyncio.run(main())
+    assert a == ["a"] and c == ["c"]
+    assert isinstance(b, ValueError)
+
+def test_non_finite_results_are_not_sent_as_json():
+    from loan_amort.serve import _response
+    raw = _response(200, {"payment": float("nan")}, False)
+    assert raw.startswith(b"HTTP/1.1 500")
+    json.loads(raw.split(b"\r\n\r\n", 1)[1])
@@ -0,0 +1,46 @@
+# tests/test_simulate.py
+
+import numpy as np
+import pytest
+from loan_amort.analytic import loan_metrics_closed_form
+from loan_amort import simulate
+from loan_amort.simulate import simulate_paths, summarize
+
+def test_no_prepayment_or_default_matches_static_schedule():
+    paths = simulate_paths(250000.0, 0.05, 30, num_paths=4, cpr=0.0, cdr=0.0, seed=1)
+    expected = loan_metrics_closed_form(250000.0, 0.05, 30)["total_interest"]
+    np.testing.assert_allclose(paths["total_interest"], expected, atol=0.01)
+    assert not paths["losses"].any()
+
+def test_seeded_paths_are_reproducible_across_workers(monkeypatch):
+    monkeypatch.setattr(simulate, "PATHS_PER_TASK", 50)
+    a = simulate_paths(100000.0, 0.06, 15, num_paths=120, seed=42)
+    b = simulate_paths(100000.0, 0.06, 15, num_paths=120, seed=42, workers=2)
+    c = simulate_paths(100000.0, 0.06, 15, num_paths=120, seed=43)
+    for name in simulate.METRICS:
+        assert len(a[name]) == 120
+        np.testing.assert_array_equal(a[name], b[name])
+    assert not np.array_equal(a["losses"], c["losses"])
+
+def test_prepayment_shortens_life_and_defaults_cost():
+    kwargs = dict(num_paths=200, seed=3)
+    slow = simulate_paths(200000.0, 0.05, 30, cpr=0.02, cdr=0.0, **kwargs)
+    fast = simulate_paths(200000.0, 0.05, 30, cpr=0.20, cdr=0.0, **kwargs)
+    risky = simulate_paths(200000.0, 0.05, 30, cpr=0.02, cdr=0.03, **kwargs)
+    assert np.median(fast["wal"]) < np.median(slow["wal"])
+    assert np.median(fast["total_interest"]) < np.median(slow["total_interest"])
+    assert (risky["losses"] > 0).all()
+
+def test_pool_and_summary():
+    paths = simulate_paths([100000.0, 50000.0], [0.05, 0.07], [30, 10], num_paths=100, seed=0)
+    stats = summarize(paths)
+    assert set(stats) == {"total_interest", "wal", "losses"}
+    s = stats["wal"]
+    assert s["p5"] <= s["p25"] <= s["p50"] <= s["p75"] <= s["p95"]
+    assert 0 < s["p50"] < 30
+
+def test_empty_input_rejected():
+    with pytest.raises(ValueError):
+        simulate_paths(100000.0, 0.05, 30, num_paths=0)
+    with pytest.raises(ValueError):
+        simulate_paths([], [], [], num_paths=10)
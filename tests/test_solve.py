@@ -0,0 +1,33 @@
+# tests/test_solve.py
+
+import numpy as np
+import pytest
+from loan_amort import solve
+from loan_amort.analytic import level_payment
+from loan_amort.solve import solve_principal, solve_rate, solve_term
+
+RATES = np.array([0.0025, 0.035, 0.0499, 0.12, 0.29])
+PRINCIPALS = np.array([5000.0, 120000.0, 265000.0, 40000.0, 9000.0])
+YEARS = np.array([1, 15, 30, 5, 40])
+
+def test_round_trips_over_arrays():
+    payments = level_payment(PRINCIPALS, RATES, YEARS)
+    assert solve_rate(payments, PRINCIPALS, YEARS) == pytest.approx(RATES, abs=1e-10)
+    assert solve_principal(payments, RATES, YEARS) == pytest.approx(PRINCIPALS, rel=1e-9)
+    assert solve_term(payments, PRINCIPALS, RATES) == pytest.approx(YEARS * 12, abs=1e-6)
+
+def test_bisection_fallback(monkeypatch):
+    monkeypatch.setattr(solve, "MAX_HALLEY_STEPS", 0)
+    payments = level_payment(PRINCIPALS, RATES, YEARS)
+    assert solve_rate(payments, PRINCIPALS, YEARS) == pytest.approx(RATES, abs=1e-10)
+
+def test_apr_exceeds_note_rate_with_fees():
+    payment = level_payment(250000.0, 0.05, 30)
+    assert solve_rate(payment, 250000.0, 30, fees=3000.0) > 0.05
+
+def test_edge_cases():
+    assert solve_rate(1000.0 / 12, 1000.0, 1) == 0.0
+    assert np.isnan(solve_rate(80.0, 1000.0, 1))
+    assert solve_term(100.0, 100000.0, 0.05) == float("inf")
+    assert solve_term(250.0, 1000.0, 0.0, payments_per_year=4) == pytest.approx(4.0)
+    assert solve_principal(250.0, 0.0, 1, payments_per_year=4) == pytest.approx(1000.0)
@@ -0,0 +1,53 @@
+# tests/test_startup.py
+
+import subprocess
+import sys
+import pytest
+
+# modules only some subcommands need; amortize and metrics must not load them
+HEAVY_MODULES = [
+    "matplotlib",
+    "multiprocessing",
+    "zipfile",
+    "loan_amort.batch",
+    "loan_amort.columnar",
+    "loan_amort.exact",
+    "loan_amort.grid",
+    "loan_amort.pool",
+    "loan_amort.refi",
+    "loan_amort.seasoned",
+    "loan_amort.simulate",
+    "loan_amort.solve",
+]
+
+# run a subcommand in a fresh interpreter and report which of the heavy
+# modules were imported
+PROBE = """
+import sys
+from loan_amort import cli
+sys.argv = ["loan_amort"] + sys.argv[2:]
+cli.main()
+loaded = [m for m in sys.argv[1].split(",") if m in sys.modules]
+print("LOADED:" + ",".join(loaded))
+"""
+
+@pytest.mark.parametrize("args", [
+    ["amortize", "-P", "1000", "-r", "0.05", "-y", "1"],
+    ["amortize", "-P", "1000", "-r", "0.05", "-y", "1", "--format", "csv"],
+    ["metrics", "-P", "1000", "-r", "0.05", "-y", "1"],
+    ["metrics", "--rows", "-P", "1000", "-r", "0.05", "-y", "1"],
+])
+def test_non_plot_commands_stay_light(args):
+    res = subprocess.run([sys.executable, "-c", PROBE, ",".join(HEAVY_MODULES)] + args,
+                         capture_output=True, text=True, timeout=30)
+    assert res.returncode == 0, res.stderr
+    assert res.stdout.strip().splitlines()[-1] == "LOADED:"
+
+def test_mirrored_choices_match_their_modules():
+    from loan_amort import batch, cli, exact, grid
+
+    assert cli.BATCH_MODES == batch.MODES
+    assert cli.BATCH_FORMATS == batch.FORMATS
+    assert cli.BATCH_BINARY_FORMATS == batch.BINARY_FORMATS
+    assert cli.ROUNDING_MODES == exact.ROUNDING_MODES
+    assert cli.GRID_METRICS == grid.GRID_METRICS